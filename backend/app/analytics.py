@@ -0,0 +1,332 @@
+"""Spaltenorientierte Analytik: Parquet-Export (je Account/Monat) + DuckDB-Abfragen für Dashboard-KPIs.
+
+    python -m app.cli.analytics export            # inkrementell, nur geänderte Partitionen
+    GET /api/kpi/return-rates|removals|reimbursements|trend?account_id=…
+
+Layout: {ANALYTICS_DIR}/{dataset}/account_id={id}/month={YYYY-MM}/data.parquet
+Ob eine Partition neu geschrieben werden muss, entscheidet ein Fingerprint
+(count, max(id), Summe der Zeilen-Hashes) je (Account, Monat) in analytics_exports.
+Gefingerprintet werden nur Partitionen, die seit der Hochwassermarke in analytics_export_marks
+berührt wurden (fba_*: id > last_id, Orders: updated_at > last_updated); alle ANALYTICS_FULL_SCAN_H
+Stunden ein voller Abgleich, der auch Löschungen und Nachzügler paralleler Transaktionen findet.
+KPI-Abfragen lesen nur die Parquet-Dateien des Accounts/Zeitraums – Postgres bleibt unberührt.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .core.config import get_settings
+
+log = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    columns: Tuple[Tuple[str, str], ...]  # (Name, Arrow-Typ)
+    select: str        # Zeilen einer Partition (:acc, :m0, :m1)
+    fingerprint: str   # je (account_id, month) ein Fingerprint ({acc} = Account-/Partitionsfilter)
+    changed: str       # (account_id, month) berührt seit der Marke (:last_id, :since; {acc})
+    mark: str          # aktuelle Marke: (max(id), Zeitstempel)
+    date_col: str
+    account_col: str = "account_id"
+
+_FBA_FP = """
+SELECT account_id, date_trunc('month', {col})::date AS month,
+       count(*) || ':' || max(id) || ':' || coalesce(sum(hashtext(row_hash)::bigint), 0)
+FROM {table} WHERE {col} IS NOT NULL {acc} GROUP BY 1, 2
+"""
+
+# fba_*-Tabellen sind insert-only: neue Zeilen = id über der Marke (Index auf dem PK)
+_FBA_CHANGED = """
+SELECT DISTINCT account_id, date_trunc('month', {col})::date FROM {table}
+WHERE id > :last_id AND {col} IS NOT NULL {acc}
+"""
+
+def _fba(name: str, table: str, col: str, cols: Sequence[Tuple[str, str]], select_cols: str) -> Dataset:
+    return Dataset(
+        name=name,
+        columns=((col, "timestamp"),) + tuple(cols),
+        select=f"SELECT {col}, {select_cols} FROM {table} "
+               f"WHERE account_id = :acc AND {col} >= :m0 AND {col} < :m1 ORDER BY {col}",
+        fingerprint=_FBA_FP.format(table=table, col=col, acc="{acc}"),
+        changed=_FBA_CHANGED.format(table=table, col=col, acc="{acc}"),
+        mark=f"SELECT coalesce(max(id), 0), localtimestamp FROM {table}",
+        date_col=col,
+    )
+
+DATASETS: Dict[str, Dataset] = {d.name: d for d in (
+    Dataset(
+        name="order_items",
+        columns=(("purchase_date", "timestamp"), ("order_id", "string"), ("order_item_id", "string"),
+                 ("status", "string"), ("marketplace", "string"), ("sku", "string"), ("asin", "string"),
+                 ("qty", "int32"), ("price_amount", "decimal"), ("currency", "string")),
+        select="""SELECT o.purchase_date, i.order_id, i.order_item_id, o.status, o.marketplace, i.sku, i.asin,
+                         i.qty, i.price_amount, i.currency
+                  FROM order_items i JOIN orders o ON o.account_id = i.account_id AND o.order_id = i.order_id
+                  WHERE i.account_id = :acc AND o.purchase_date >= :m0 AND o.purchase_date < :m1
+                  ORDER BY o.purchase_date""",
+        fingerprint="""
+SELECT i.account_id, date_trunc('month', o.purchase_date)::date AS month,
+       count(*) || ':' || max(i.id) || ':' || coalesce(sum(hashtext(
+           concat_ws('|', i.order_item_id, i.sku, i.qty, i.price_amount, o.status))::bigint), 0)
+FROM order_items i JOIN orders o ON o.account_id = i.account_id AND o.order_id = i.order_id
+WHERE o.purchase_date IS NOT NULL {acc} GROUP BY 1, 2
+""",
+        # Items ändern sich nur zusammen mit ihrer Order (services.store_orders setzt updated_at)
+        changed="""
+SELECT DISTINCT account_id, date_trunc('month', purchase_date)::date FROM orders
+WHERE updated_at > :since AND purchase_date IS NOT NULL {acc}
+""",
+        mark="SELECT 0, localtimestamp",
+        date_col="o.purchase_date",
+        account_col="i.account_id",
+    ),
+    _fba("returns", "fba_returns", "return_date",
+         (("order_id", "string"), ("sku", "string"), ("asin", "string"), ("quantity", "int32"),
+          ("disposition", "string"), ("reason", "string")),
+         "order_id, sku, asin, quantity, disposition, reason"),
+    _fba("removals", "fba_removals", "request_date",
+         (("removal_order_id", "string"), ("order_type", "string"), ("status", "string"), ("sku", "string"),
+          ("quantity", "int32"), ("disposition", "string")),
+         "removal_order_id, order_type, status, sku, quantity, disposition"),
+    _fba("reimbursements", "fba_reimbursements", "posted_date",
+         (("case_id", "string"), ("sku", "string"), ("quantity", "int32"), ("amount", "decimal"),
+          ("currency", "string"), ("reason", "string")),
+         "case_id, sku, quantity, amount, currency, reason"),
+    _fba("adjustments", "fba_inventory_adjustments", "adjustment_date",
+         (("sku", "string"), ("quantity", "int32"), ("reason", "string"), ("fc", "string")),
+         "sku, quantity, reason, fc"),
+)}
+
+def data_dir() -> Path:
+    return Path(get_settings().ANALYTICS_DIR)
+
+def _month_key(m: date) -> str:
+    return f"{m.year:04d}-{m.month:02d}"
+
+def _next_month(m: date) -> date:
+    return date(m.year + (m.month == 12), m.month % 12 + 1, 1)
+
+def _partition(ds: str, account_id: int, month: str) -> Path:
+    return data_dir() / ds / f"account_id={account_id}" / f"month={month}"
+
+# ---------- Export ----------
+
+def _arrow_schema(ds: Dataset):
+    import pyarrow as pa
+    types = {"string": pa.string(), "int32": pa.int32(), "timestamp": pa.timestamp("us"),
+             "decimal": pa.decimal128(12, 2)}
+    return pa.schema([(n, types[t]) for n, t in ds.columns])
+
+def _write_partition(db: Session, ds: Dataset, account_id: int, month: date) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    rows = db.execute(text(ds.select), {"acc": account_id, "m0": month, "m1": _next_month(month)}).all()
+    schema = _arrow_schema(ds)
+    table = pa.Table.from_arrays([pa.array([r[i] for r in rows], type=f.type) for i, f in enumerate(schema)],
+                                 schema=schema)
+    target = _partition(ds.name, account_id, _month_key(month))
+    target.mkdir(parents=True, exist_ok=True)
+    tmp = target / ".data.parquet.tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, target / "data.parquet")  # Leser sehen nie eine halbe Datei
+    return len(rows)
+
+# Marke für updated_at etwas zurücksetzen: länger laufende Transaktionen committen nach dem Lauf
+_MARK_SLACK = timedelta(minutes=5)
+
+def _fingerprints(db: Session, ds: Dataset, account_id: Optional[int],
+                  touched: Optional[set]) -> Dict[Tuple[int, date], str]:
+    """Fingerprints aller Partitionen (touched=None) bzw. nur der berührten – je Partition über die Indizes."""
+    if touched is None:
+        only = account_id is not None
+        sql = ds.fingerprint.replace("{acc}", f"AND {ds.account_col} = :acc" if only else "")
+        return {(a, m): fp for a, m, fp in db.execute(text(sql), {"acc": account_id}).all()}
+    sql = text(ds.fingerprint.replace(
+        "{acc}", f"AND {ds.account_col} = :acc AND {ds.date_col} >= :m0 AND {ds.date_col} < :m1"))
+    out: Dict[Tuple[int, date], str] = {}
+    for a, m in touched:
+        for _, _, fp in db.execute(sql, {"acc": a, "m0": m, "m1": _next_month(m)}).all():
+            out[(a, m)] = fp
+    return out
+
+def export(db: Session, account_id: Optional[int] = None, datasets: Optional[Sequence[str]] = None,
+           full: bool = False) -> Dict[str, int]:
+    """Geänderte (Account, Monat)-Partitionen neu schreiben, verschwundene löschen. Rückgabe: Partitionen je Dataset.
+
+    Ohne full nur die seit der Marke berührten Partitionen; full (bzw. fällig nach ANALYTICS_FULL_SCAN_H)
+    vergleicht alle.
+    """
+    out: Dict[str, int] = {}
+    scope = account_id or 0
+    for name in datasets or DATASETS:
+        ds = DATASETS[name]
+        only = account_id is not None
+        new_id, new_ts = db.execute(text(ds.mark)).one()  # vor dem Vergleich: spätere Writes zählen zum nächsten Lauf
+        mark = db.execute(text("SELECT last_id, last_updated, full_scan_at FROM analytics_export_marks "
+                               "WHERE dataset = :ds AND account_id = :scope"), {"ds": name, "scope": scope}).first()
+        scan_all = (full or mark is None or mark.full_scan_at is None
+                    or new_ts - mark.full_scan_at >= timedelta(hours=get_settings().ANALYTICS_FULL_SCAN_H))
+        touched = None
+        if not scan_all:
+            touched = {(a, m) for a, m in db.execute(
+                text(ds.changed.replace("{acc}", "AND account_id = :acc" if only else "")),
+                {"acc": account_id, "last_id": mark.last_id,
+                 "since": mark.last_updated - _MARK_SLACK}).all()}
+        current = _fingerprints(db, ds, account_id, touched)
+        # mit Routing-Session ggf. von der Replika: veraltete Einträge kosten höchstens einen erneuten Export
+        known = {(a, m): fp for a, m, fp in db.execute(
+            text("SELECT account_id, month, fingerprint FROM analytics_exports WHERE dataset = :ds"
+                 + (" AND account_id = :acc" if only else "")), {"ds": name, "acc": account_id}).all()}
+        written = 0
+        for (a, m), fp in sorted(current.items()):
+            if known.get((a, m)) == fp:
+                continue
+            n = _write_partition(db, ds, a, m)
+            db.execute(text("""
+                INSERT INTO analytics_exports (dataset, account_id, month, fingerprint, rows, exported_at)
+                VALUES (:ds, :a, :m, :fp, :n, now())
+                ON CONFLICT (dataset, account_id, month)
+                DO UPDATE SET fingerprint = excluded.fingerprint, rows = excluded.rows, exported_at = now()"""),
+                {"ds": name, "a": a, "m": m, "fp": fp, "n": n})
+            db.commit()
+            written += 1
+        gone = set(known) - set(current)
+        if touched is not None:
+            gone &= touched  # nicht berührte Partitionen wurden gar nicht gefingerprintet
+        for a, m in gone:
+            shutil.rmtree(_partition(name, a, _month_key(m)), ignore_errors=True)
+            db.execute(text("DELETE FROM analytics_exports WHERE dataset = :ds AND account_id = :a AND month = :m"),
+                       {"ds": name, "a": a, "m": m})
+            db.commit()
+        db.execute(text("""
+            INSERT INTO analytics_export_marks (dataset, account_id, last_id, last_updated, full_scan_at)
+            VALUES (:ds, :scope, :id, :ts, :ts)
+            ON CONFLICT (dataset, account_id)
+            DO UPDATE SET last_id = excluded.last_id, last_updated = excluded.last_updated,
+                          full_scan_at = CASE WHEN :all THEN excluded.full_scan_at
+                                              ELSE analytics_export_marks.full_scan_at END"""),
+            {"ds": name, "scope": scope, "id": new_id, "ts": new_ts, "all": scan_all})
+        db.commit()
+        out[name] = written
+        if written:
+            log.info("[analytics] %s: %d partition(s) exported", name, written)
+    return out
+
+# ---------- Abfragen (DuckDB) ----------
+
+_duck = None
+_duck_lock = threading.Lock()
+
+def _cursor():
+    """Eigener Cursor je Aufruf (DuckDB-Connections sind nicht thread-safe, Cursor schon getrennt)."""
+    global _duck
+    with _duck_lock:
+        if _duck is None:
+            import duckdb
+            _duck = duckdb.connect(config={"threads": get_settings().ANALYTICS_THREADS})
+        return _duck.cursor()
+
+_DUCK_TYPES = {"string": "VARCHAR", "int32": "INTEGER", "timestamp": "TIMESTAMP", "decimal": "DECIMAL(12,2)"}
+
+def _source(ds_name: str, account_id: int, d_from: date, d_to: date) -> str:
+    """FROM-Ausdruck: nur die Parquet-Dateien der Monate im Zeitraum; leer -> typisierte Leerrelation."""
+    ds = DATASETS[ds_name]
+    files, m = [], date(d_from.year, d_from.month, 1)
+    while m <= d_to:
+        f = _partition(ds_name, account_id, _month_key(m)) / "data.parquet"
+        if f.exists():
+            files.append(str(f).replace("'", "''"))
+        m = _next_month(m)
+    if files:
+        return "read_parquet([" + ", ".join(f"'{f}'" for f in files) + "])"
+    cols = ", ".join(f"NULL::{_DUCK_TYPES[t]} AS {n}" for n, t in ds.columns)
+    return f"(SELECT {cols} WHERE false)"
+
+def _query(sql: str, params: Sequence[Any]) -> List[Dict[str, Any]]:
+    cur = _cursor()
+    try:
+        res = cur.execute(sql, list(params))
+        names = [d[0] for d in res.description]
+        return [dict(zip(names, r)) for r in res.fetchall()]
+    finally:
+        cur.close()
+
+def _bounds(d_from: date, d_to: date) -> Tuple[datetime, datetime]:
+    return datetime.combine(d_from, datetime.min.time()), datetime.combine(d_to, datetime.max.time())
+
+def return_rates(account_id: int, d_from: date, d_to: date, limit: int = 50) -> List[Dict[str, Any]]:
+    """Verkaufte vs. retournierte Einheiten je SKU (höchste Retourenmenge zuerst)."""
+    t0, t1 = _bounds(d_from, d_to)
+    sql = f"""
+    WITH sold AS (SELECT sku, sum(qty) AS units FROM {_source('order_items', account_id, d_from, d_to)}
+                  WHERE purchase_date BETWEEN ? AND ? GROUP BY sku),
+         ret AS (SELECT sku, sum(quantity) AS returned FROM {_source('returns', account_id, d_from, d_to)}
+                 WHERE return_date BETWEEN ? AND ? GROUP BY sku)
+    SELECT coalesce(s.sku, r.sku) AS sku, coalesce(units, 0)::BIGINT AS units_sold,
+           coalesce(returned, 0)::BIGINT AS units_returned,
+           round(coalesce(returned, 0) / nullif(units, 0), 4) AS return_rate
+    FROM sold s FULL JOIN ret r ON r.sku = s.sku
+    ORDER BY units_returned DESC, return_rate DESC NULLS LAST LIMIT ?"""
+    return _query(sql, (t0, t1, t0, t1, limit))
+
+def removal_volumes(account_id: int, d_from: date, d_to: date) -> List[Dict[str, Any]]:
+    t0, t1 = _bounds(d_from, d_to)
+    sql = f"""
+    SELECT strftime(date_trunc('month', request_date), '%Y-%m') AS month, order_type,
+           count(*) AS removals, coalesce(sum(quantity), 0)::BIGINT AS units
+    FROM {_source('removals', account_id, d_from, d_to)}
+    WHERE request_date BETWEEN ? AND ? GROUP BY 1, 2 ORDER BY 1, 2"""
+    return _query(sql, (t0, t1))
+
+def reimbursements_by_reason(account_id: int, d_from: date, d_to: date) -> List[Dict[str, Any]]:
+    t0, t1 = _bounds(d_from, d_to)
+    sql = f"""
+    SELECT reason, currency, count(*) AS cases, coalesce(sum(quantity), 0)::BIGINT AS units,
+           coalesce(sum(amount), 0)::DOUBLE AS amount
+    FROM {_source('reimbursements', account_id, d_from, d_to)}
+    WHERE posted_date BETWEEN ? AND ? GROUP BY 1, 2 ORDER BY amount DESC"""
+    return _query(sql, (t0, t1))
+
+def trend(account_id: int, d_from: date, d_to: date, grain: str = "week") -> List[Dict[str, Any]]:
+    """Zeitreihe je Periode und Währung: verkaufte Einheiten, Umsatz, Erstattungen.
+
+    Beträge werden nie über Währungen summiert (EUR/GBP/SEK/PLN). Retouren haben keine
+    Währung: ihre Einheiten stehen in eigenen Zeilen mit currency = NULL.
+    """
+    if grain not in ("day", "week", "month"):
+        raise ValueError("grain must be day, week or month")
+    t0, t1 = _bounds(d_from, d_to)
+    sql = f"""
+    WITH s AS (SELECT date_trunc('{grain}', purchase_date) AS p, currency, sum(qty) AS units,
+                      sum(price_amount) AS revenue  -- ItemPrice = Positionssumme (Stückpreis × Menge)
+               FROM {_source('order_items', account_id, d_from, d_to)}
+               WHERE purchase_date BETWEEN ? AND ? GROUP BY 1, 2),
+         r AS (SELECT date_trunc('{grain}', return_date) AS p, NULL::VARCHAR AS currency, sum(quantity) AS returned
+               FROM {_source('returns', account_id, d_from, d_to)}
+               WHERE return_date BETWEEN ? AND ? GROUP BY 1),
+         b AS (SELECT date_trunc('{grain}', posted_date) AS p, currency, sum(amount) AS reimbursed
+               FROM {_source('reimbursements', account_id, d_from, d_to)}
+               WHERE posted_date BETWEEN ? AND ? GROUP BY 1, 2)
+    SELECT strftime(p, '%Y-%m-%d') AS period, currency,
+           coalesce(units, 0)::BIGINT AS units_sold, coalesce(revenue, 0)::DOUBLE AS revenue,
+           coalesce(returned, 0)::BIGINT AS units_returned, coalesce(reimbursed, 0)::DOUBLE AS reimbursed
+    FROM s FULL JOIN b USING (p, currency) FULL JOIN r USING (p, currency)  -- NULL-Währung trifft nie: eigene Zeilen
+    ORDER BY currency NULLS LAST, p"""
+    return _query(sql, (t0, t1, t0, t1, t0, t1))
+
+def timed(fn, *args, **kwargs) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    rows = fn(*args, **kwargs)
+    return {"rows": rows, "ms": round((time.perf_counter() - t0) * 1000, 2)}
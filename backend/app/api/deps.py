@@ -1,14 +1,6 @@
-from typing import Generator, Optional
+from typing import Optional
 from fastapi import Request, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
-
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+from app.db.session import get_db, get_batch_db, get_async_db, get_read_db  # noqa: F401 (re-export)
 
 def get_current_user_id(request: Request) -> Optional[int]:
     return request.session.get("uid")
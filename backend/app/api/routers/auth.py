@@ -1,13 +1,39 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, status
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.db.crud.users import get_by_email_or_username
-from app.core.security import verify_password
+from app.db.session import get_async_db
+from app.db.crud.users import get_by_email_or_username_async, update_password_hash_async
+from app.db.models import User
+from app.core.security import HashingBusy, login_throttle, verify_password_async
 
 router = APIRouter()
 
+async def authenticate(db: AsyncSession, identifier: str, password: str) -> User:
+    """Prüft Credentials ohne den Event-Loop zu blockieren (bcrypt läuft im Hash-Pool)."""
+    throttle = login_throttle()
+    retry_after = throttle.hit(identifier)
+    if retry_after:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="too many attempts",
+                            headers={"Retry-After": str(int(retry_after))})
+
+    user = await get_by_email_or_username_async(db, identifier)
+    if not user:
+        raise HTTPException(status_code=401, detail="invalid credentials")
+    try:
+        ok, new_hash = await verify_password_async(password, user.password_hash)
+    except HashingBusy:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="login busy",
+                            headers={"Retry-After": "1"})
+    if not ok:
+        raise HTTPException(status_code=401, detail="invalid credentials")
+
+    # Hash mit veralteten Kosten -> auf konfigurierte bcrypt-Rounds migrieren
+    if new_hash:
+        await update_password_hash_async(db, user, new_hash)
+    throttle.reset(identifier)
+    return user
+
 @router.get("/login", response_class=HTMLResponse)
 async def login_page() -> str:
     # schlankes HTML mit klassischem Form-Post -> Server redirectet selbst
@@ -23,7 +49,7 @@ async def login_page() -> str:
 </body></html>"""
 
 @router.post("/api/login")
-async def api_login(request: Request, db: Session = Depends(get_db)):
+async def api_login(request: Request, db: AsyncSession = Depends(get_async_db)):
     # Sowohl JSON als auch Form akzeptieren
     ctype = request.headers.get("content-type", "")
     if "application/json" in ctype:
@@ -41,9 +67,7 @@ async def api_login(request: Request, db: Session = Depends(get_db)):
     if not identifier or not password:
         raise HTTPException(status_code=400, detail="missing credentials")
 
-    user = get_by_email_or_username(db, identifier)
-    if not user or not verify_password(password, user.password_hash):
-        raise HTTPException(status_code=401, detail="invalid credentials")
+    user = await authenticate(db, identifier, password)
 
     # Session setzen -> SessionMiddleware schreibt Set-Cookie
     request.session["uid"] = int(user.id)
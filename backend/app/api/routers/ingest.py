@@ -0,0 +1,352 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from html import escape
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import backfill, cache_bus, circuit, models, order_sourcing, progress, report_sourcing, services, watermarks
+from app.core.config import get_settings
+from app.api.deps import get_batch_db, get_db, require_auth
+from app.sp_api_reports_patch import (
+    R_CUSTOMER_RETURNS, R_REMOVALS, R_ADJUSTMENTS, R_REIMBURSEMENTS,
+    iter_report_batches,
+)
+
+REPORT_TYPES = (R_CUSTOMER_RETURNS, R_REMOVALS, R_ADJUSTMENTS, R_REIMBURSEMENTS)
+_PULL_SINGLE_WINDOW_DAYS = 31  # darüber laufen Orders-Sync und Reports-Pull über die Backfill-Engine
+
+# Sync/Pull/Recon – lange Batch-Arbeit, daher Batch-Session (eigener Statement-Timeout)
+router = APIRouter(dependencies=[Depends(require_auth)])
+
+def _not_found() -> HTMLResponse:
+    return HTMLResponse("<div class='text-red-700'>Account nicht gefunden.</div>", status_code=200)
+
+# ==========================
+# A) SYNC ORDERS (SP-API)
+# ==========================
+def _plan_orders_backfill(db: Session, acc: models.SellerAccount, days: int,
+                          source: str | None = None) -> models.BackfillJob:
+    end = datetime.utcnow() - timedelta(minutes=2)
+    return backfill.plan_job(db, acc.id, ["orders"], end - timedelta(days=days), end, order_source=source)
+
+def _sync_orders(db: Session, acc: models.SellerAccount, days: int, source: str | None = None) -> dict:
+    if days > _PULL_SINGLE_WINDOW_DAYS:
+        # langes Fenster: 7-Tage-Chunks (bzw. 30-Tage-Reports) mit Checkpoints statt eines Laufs am Stück
+        job = _plan_orders_backfill(db, acc, days, source)
+        progress.emit("backfill_planned", job_id=job.id)
+        with progress.stage("backfill", job_id=job.id):
+            summary = backfill.run_job(job.id)
+        return {"synced": None, "changed": sum(summary["rows"].values()), "source": job.sources, "job_id": job.id}
+    # 2-Minuten-Puffer (Amazon-Anforderung)
+    date_to = datetime.utcnow() - timedelta(minutes=2)
+    date_from = date_to - timedelta(days=days)
+    # Quelle je Account/Fensterlänge: getOrders je Order oder ein Flatfile-Report je 30 Tage
+    return order_sourcing.sync(db, acc, date_from, date_to, source)
+
+def _sync_message(r: dict) -> str:
+    if r.get("job_id"):
+        return f"Orders: Backfill-Job {r['job_id']}, {r['changed']} neu/geändert."
+    return f"Orders: {r['synced']} geladen, {r['changed']} neu/geändert."
+
+@router.post("/api/orders/sync")
+def api_sync_orders(account_id: int, days: int = 7, source: str | None = None, db: Session = Depends(get_batch_db)):
+    """source=api|report|auto übersteuert seller_accounts.order_source / ORDER_SOURCE für diesen Lauf.
+
+    days > 31: Backfill-Job im Hintergrund (wie /api/reports/pull), Fortschritt über GET /api/backfill/{job_id}.
+    """
+    acc = db.get(models.SellerAccount, account_id)
+    if not acc:
+        return _not_found()
+    try:
+        if days > _PULL_SINGLE_WINDOW_DAYS:
+            job = _plan_orders_backfill(db, acc, days, source)
+            _start_backfill(job.id)
+            return {"job_id": job.id, "source": job.sources, "windows": backfill.progress(db, job.id)["total"],
+                    "progress": f"/api/backfill/{job.id}"}
+        return _sync_orders(db, acc, days, source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/api/orders/source")
+def api_set_order_source(account_id: int, source: str | None = None, db: Session = Depends(get_batch_db)):
+    """Order-Quelle des Accounts setzen (api|report|auto); ohne source zurück auf ORDER_SOURCE."""
+    acc = db.get(models.SellerAccount, account_id)
+    if not acc:
+        return _not_found()
+    if source is not None and source not in order_sourcing.MODES:
+        raise HTTPException(status_code=400, detail=f"source must be one of {', '.join(order_sourcing.MODES)}")
+    acc.order_source = source
+    db.commit()
+    cache_bus.publish("account", acc.id, "seller_accounts")
+    return {"account_id": acc.id, "order_source": acc.order_source or get_settings().ORDER_SOURCE}
+
+# ==========================
+# B) PULL REPORTS (SP-API)
+# ==========================
+def _plan_report_backfill(db: Session, acc: models.SellerAccount, days: int) -> models.BackfillJob:
+    end = datetime.utcnow() - timedelta(minutes=5)
+    return backfill.plan_job(db, acc.id, backfill.REPORT_SOURCES, end - timedelta(days=days), end)
+
+def _pull_reports(db: Session, acc: models.SellerAccount, days: int | None = None) -> dict:
+    """days=None: inkrementell je Report-Typ ab Wasserzeichen − Overlap; sonst festes Fenster."""
+    with cache_bus.batched():  # Cache-Invalidierung einmal je Pull statt je gespeichertem Batch
+        return _pull_report_types(db, acc, days)
+
+def _pull_report_types(db: Session, acc: models.SellerAccount, days: int | None) -> dict:
+    safe_end = datetime.utcnow() - timedelta(minutes=5)  # Reports brauchen etwas Puffer
+    safe_start = safe_end - timedelta(days=days) if days else None
+
+    counts = {}
+    if days and days > _PULL_SINGLE_WINDOW_DAYS:
+        # langes Fenster: in Teilfenster zerlegen (Checkpoints, parallel) statt eines Riesen-Reports
+        job = _plan_report_backfill(db, acc, days)
+        progress.emit("backfill_planned", job_id=job.id)
+        with progress.stage("backfill", job_id=job.id):
+            counts = backfill.run_job(job.id)["rows"]
+    else:
+        for label, report_type in (
+            ("returns", R_CUSTOMER_RETURNS),
+            ("removals", R_REMOVALS),
+            ("adjustments", R_ADJUSTMENTS),
+            ("reimbursements", R_REIMBURSEMENTS),
+        ):
+            start = safe_start or watermarks.window_start(db, acc.id, report_type, safe_end)
+            with progress.stage(label, since=start.isoformat(timespec="minutes")):
+                # batchweise speichern: große Dokumente liegen nie komplett gemappt im Speicher
+                counts[label] = total = 0
+                sourced: list = []
+                for batch in iter_report_batches(acc.id, acc.refresh_token, report_type, start, safe_end,
+                                                 sourced=sourced):
+                    counts[label] += services.store_report_rows(db, acc.id, report_type, batch)
+                    total += len(batch)
+                # nur bis zum Datenende tatsächlich geladener Dokumente (kein Report -> kein Vorrücken)
+                covered = report_sourcing.covered_until(start, sourced)
+                if covered:
+                    watermarks.advance(db, acc.id, report_type, start, covered, total)
+    return counts
+
+def _pull_message(counts: dict) -> str:
+    msg = "Reports: " + ", ".join(f"{k}={v}" for k, v in counts.items())
+    if sum(counts.values()) == 0:
+        msg += " — keine neuen Zeilen seit dem letzten Pull (sonst: Zeitraum/Permissions? Rollen für FBA/Lagerbestand?)"
+    return msg
+
+@router.post("/api/reports/pull", response_class=HTMLResponse)
+def api_pull_reports(account_id: int, days: int | None = None, db: Session = Depends(get_batch_db)):
+    """Ohne days: nur der neue Ausschnitt je Report-Typ (Wasserzeichen); days=N: festes N-Tage-Fenster."""
+    acc = db.get(models.SellerAccount, account_id)
+    if not acc:
+        return _not_found()
+    if days and days > _PULL_SINGLE_WINDOW_DAYS:
+        # wie /api/backfill: im Hintergrund, Fortschritt über GET /api/backfill/{job_id}
+        job = _plan_report_backfill(db, acc, days)
+        _start_backfill(job.id)
+        return HTMLResponse(f"<div class='text-green-700'>Backfill-Job {job.id} gestartet "
+                            f"({backfill.progress(db, job.id)['total']} Fenster) – Fortschritt: "
+                            f"/api/backfill/{job.id}</div>", status_code=200)
+    msg = _pull_message(_pull_reports(db, acc, days))
+    return HTMLResponse(f"<div class='text-green-700'>{msg}</div>", status_code=200)
+
+@router.get("/api/reports/watermarks")
+def api_report_watermarks(account_id: int, db: Session = Depends(get_batch_db)):
+    return {"watermarks": watermarks.all_for(db, account_id)}
+
+@router.get("/api/reports/schedules")
+def api_list_report_schedules(account_id: int, db: Session = Depends(get_batch_db)):
+    acc = db.get(models.SellerAccount, account_id)
+    if not acc:
+        return _not_found()
+    return {"schedules": report_sourcing.list_schedules(acc.id, acc.refresh_token, list(REPORT_TYPES))}
+
+@router.post("/api/reports/schedules")
+def api_ensure_report_schedules(account_id: int, period: str | None = None, db: Session = Depends(get_batch_db)):
+    """Schedules für alle Recon-Reports anlegen (idempotent) – Pulls nutzen dann deren fertige Reports."""
+    acc = db.get(models.SellerAccount, account_id)
+    if not acc:
+        return _not_found()
+    period = period or get_settings().REPORT_SCHEDULE_PERIOD
+    return {"schedules": {rt: report_sourcing.ensure_schedule(acc.id, acc.refresh_token, rt, period)
+                          for rt in REPORT_TYPES}}
+
+# ==========================
+# B2) BACKFILL (lange Zeiträume, fortsetzbar)
+# ==========================
+def _start_backfill(job_id: int, retry_failed: bool = False) -> None:
+    threading.Thread(target=backfill.run_job, args=(job_id, None, retry_failed),
+                     name=f"backfill-{job_id}", daemon=True).start()
+
+@router.post("/api/backfill")
+def api_start_backfill(account_id: int, days: int = 540, sources: str = "orders," + ",".join(backfill.REPORT_SOURCES),
+                       db: Session = Depends(get_batch_db)):
+    """Backfill planen und im Hintergrund starten. Fortschritt: GET /api/backfill/{job_id}."""
+    acc = db.get(models.SellerAccount, account_id)
+    if not acc:
+        return _not_found()
+    end = datetime.utcnow() - timedelta(minutes=5)
+    try:
+        job = backfill.plan_job(db, acc.id, [s.strip() for s in sources.split(",") if s.strip()],
+                                end - timedelta(days=days), end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _start_backfill(job.id)
+    return backfill.progress(db, job.id)
+
+@router.get("/api/backfill/{job_id}")
+def api_backfill_progress(job_id: int, db: Session = Depends(get_batch_db)):
+    try:
+        return backfill.progress(db, job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Job nicht gefunden")
+
+@router.post("/api/backfill/{job_id}/resume")
+def api_resume_backfill(job_id: int, db: Session = Depends(get_batch_db)):
+    """Nach Neustart/Fehlern: offene und fehlgeschlagene Chunks erneut abarbeiten."""
+    try:
+        summary = backfill.progress(db, job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Job nicht gefunden")
+    _start_backfill(job_id, retry_failed=True)
+    return summary
+
+# ==========================
+# C) RECON
+# ==========================
+def _recon(db: Session, acc: models.SellerAccount, days: int) -> int:
+    date_to = datetime.utcnow()
+    with progress.stage("recon"):
+        return services.reconcile_account(db, acc.id, date_to - timedelta(days=days), date_to)
+
+def _recon_message(n: int) -> str:
+    return f"Recon abgeschlossen: {n} SKUs ausgewertet."
+
+@router.post("/api/recon/run", response_class=HTMLResponse)
+def run_recon(account_id: int, days: int = 90, db: Session = Depends(get_batch_db)):
+    acc = db.get(models.SellerAccount, account_id)
+    if not acc:
+        return _not_found()
+    return HTMLResponse(f"<div class='text-green-700'>{_recon_message(_recon(db, acc, days))}</div>", status_code=200)
+
+# ==========================
+# D) OPERATIONEN MIT FORTSCHRITT (SSE)
+# ==========================
+# Art -> (Arbeit, Default-Tage, Label, Abschlussmeldung)
+_OPS = {
+    "orders-sync": (_sync_orders, 7, "Sync Orders", _sync_message),
+    "reports-pull": (_pull_reports, None, "Pull Reports", _pull_message),
+    "recon": (_recon, 90, "Recon", _recon_message),
+}
+
+def _run_op(kind: str, account_id: int, days: int | None):
+    from app.db.session import batch_session
+    work = _OPS[kind][0]
+    with batch_session() as db:
+        acc = db.get(models.SellerAccount, account_id)
+        db.expunge(acc)  # Commits in der Arbeit sollen den Account nicht neu laden
+        return work(db, acc, days)
+
+def _op_fragment(op: progress.Operation, attached: bool) -> str:
+    """Container, der per hx-ext="sse" den Event-Strom abonniert; 'end' ersetzt den Live-Teil und schließt ihn."""
+    label = _OPS[op.kind][2]
+    note = " <span class='text-amber-700'>(läuft bereits – verbunden)</span>" if attached else ""
+    return (
+        f"<div id='op-{op.id}' class='border rounded-lg p-2 my-2 text-sm'>"
+        f"<div class='font-semibold'>{escape(label)} · Account {op.account_id}{note}</div>"
+        f"<ol id='op-{op.id}-log' class='font-mono text-xs text-slate-600'></ol>"
+        f"<div id='op-{op.id}-live' hx-ext='sse' sse-connect='/api/ops/{op.id}/events'>"
+        f"<div sse-swap='progress' hx-target='#op-{op.id}-log' hx-swap='beforeend'></div>"
+        f"<div sse-swap='end' hx-target='#op-{op.id}-live' hx-swap='outerHTML' class='text-slate-500'>läuft…</div>"
+        f"</div></div>"
+    )
+
+def _event_html(ev: progress.Event) -> str:
+    if ev.name == "stage_started":
+        text = f"▶ {ev.data.get('stage')}"
+    elif ev.name == "stage_finished":
+        text = f"{'✓' if ev.data.get('ok') else '✗'} {ev.data.get('stage')} ({ev.data.get('seconds')} s)"
+    else:
+        text = ev.name + " " + " ".join(f"{k}={v}" for k, v in ev.data.items() if v is not None)
+    return f"<li>{ev.t:7.1f}s {escape(text)}</li>"
+
+def _end_html(op: progress.Operation, ev: progress.Event) -> str:
+    seconds = ev.data.get("seconds")
+    if ev.name == "done":
+        msg, css = _OPS[op.kind][3](op.result), "text-green-700"
+    else:
+        msg, css = f"Fehler: {ev.data.get('error')}", "text-red-700"
+    return f"<div id='op-{op.id}-live' class='{css}'>{escape(msg)} ({seconds} s)</div>"
+
+def _sse(event: str, data: str, event_id: int | None = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return head + f"event: {event}\n" + "".join(f"data: {line}\n" for line in data.splitlines() or [""]) + "\n"
+
+@router.post("/api/ops/{kind}")
+def api_start_op(kind: str, account_id: int, request: Request, days: int | None = None,
+                 db: Session = Depends(get_db)):
+    """Sync/Pull/Recon im Hintergrund starten (bzw. an laufende Operation anhängen).
+
+    HTMX bekommt einen SSE-Container, andere Clients JSON mit op_id und Stream-URL.
+    """
+    if kind not in _OPS:
+        raise HTTPException(status_code=404, detail="Unbekannte Operation")
+    if not db.get(models.SellerAccount, account_id):
+        return _not_found()
+    op, started = progress.start(kind, account_id, _run_op, kind, account_id, days or _OPS[kind][1])
+    if request.headers.get("HX-Request"):
+        return HTMLResponse(_op_fragment(op, attached=not started))
+    return dict(op.summary(), started=started, events=f"/api/ops/{op.id}/events")
+
+@router.get("/api/ops/{op_id}")
+def api_op_status(op_id: str):
+    op = progress.get(op_id)
+    if op is None:
+        raise HTTPException(status_code=404, detail="Operation nicht gefunden")
+    return dict(op.summary(), events=[dict(id=e.id, event=e.name, t=e.t, **e.data) for e in op.since(0)])
+
+@router.get("/api/ops/{op_id}/events")
+async def api_op_events(op_id: str, request: Request, format: str = "html"):
+    """text/event-stream: Replay ab Last-Event-ID, dann live bis done/failed.
+
+    format=html: 'progress' (<li>-Zeilen) und 'end' (Abschluss) für hx-ext="sse";
+    format=json: je Event ein SSE-Event mit seinem Namen und JSON-Daten.
+    """
+    op = progress.get(op_id)
+    if op is None:
+        raise HTTPException(status_code=404, detail="Operation nicht gefunden")
+    try:
+        last_id = int(request.headers.get("last-event-id") or 0)
+    except ValueError:
+        last_id = 0
+    if op.status != "running" and last_id >= op.last_id:
+        return Response(status_code=204)  # 204 beendet den Auto-Reconnect des EventSource
+
+    async def stream():
+        async for ev in op.follow(last_id):
+            if ev is None:
+                yield ": keepalive\n\n"
+            elif format == "json":
+                yield _sse(ev.name, json.dumps(dict(id=ev.id, t=ev.t, **ev.data), default=str), ev.id)
+            elif ev.name in progress.TERMINAL:
+                yield _sse("end", _end_html(op, ev), ev.id)
+            else:
+                yield _sse("progress", _event_html(ev), ev.id)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ==========================
+# E) SP-API-STATUS (Circuit-Breaker dieses Prozesses)
+# ==========================
+@router.get("/api/sp-api/status")
+def api_sp_api_status(format: str = "json"):
+    """Gestörte Regionen/Operationen; format=html: Badge fürs Dashboard (hx-trigger every 15s)."""
+    st = circuit.status()
+    if format != "html":
+        return st
+    if not st["degraded"]:
+        return HTMLResponse("<span class='text-sm text-green-700'>SP-API: ok</span>")
+    ops = ", ".join(f"{c['region']}/{c['operation']} ({c['state']}, {c['retry_in']:.0f}s)" for c in st["circuits"])
+    return HTMLResponse(f"<span class='text-sm font-semibold text-amber-700'>SP-API gestört: "
+                        f"{escape(', '.join(st['degraded']))}</span> <span class='text-xs text-slate-500'>{escape(ops)}</span>")
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app import analytics
+from app.api.deps import require_auth
+
+# Dashboard-KPIs aus dem Parquet-Export (DuckDB) – keine Last auf Postgres
+router = APIRouter(prefix="/api/kpi", dependencies=[Depends(require_auth)])
+
+def _range(date_from: date | None, date_to: date | None) -> tuple[date, date]:
+    d_to = date_to or date.today()
+    d_from = date_from or d_to - timedelta(days=365)
+    if d_from > d_to:
+        raise HTTPException(status_code=400, detail="date_from > date_to")
+    return d_from, d_to
+
+@router.get("/return-rates")
+def kpi_return_rates(account_id: int, date_from: date | None = None, date_to: date | None = None,
+                     limit: int = Query(50, ge=1, le=1000)):
+    return analytics.timed(analytics.return_rates, account_id, *_range(date_from, date_to), limit=limit)
+
+@router.get("/removals")
+def kpi_removals(account_id: int, date_from: date | None = None, date_to: date | None = None):
+    return analytics.timed(analytics.removal_volumes, account_id, *_range(date_from, date_to))
+
+@router.get("/reimbursements")
+def kpi_reimbursements(account_id: int, date_from: date | None = None, date_to: date | None = None):
+    return analytics.timed(analytics.reimbursements_by_reason, account_id, *_range(date_from, date_to))
+
+@router.get("/trend")
+def kpi_trend(account_id: int, date_from: date | None = None, date_to: date | None = None,
+              grain: str = Query("week", pattern="^(day|week|month)$")):
+    return analytics.timed(analytics.trend, account_id, *_range(date_from, date_to), grain=grain)
@@ -0,0 +1,22 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+from app.core.config import get_settings
+import app.core.metrics  # noqa: F401 (registriert Collector)
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request) -> Response:
+    token = get_settings().METRICS_TOKEN
+    if token and request.headers.get("authorization") != f"Bearer {token}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # mehrere Uvicorn-Worker: Werte aller Prozesse aggregieren
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,47 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from app import models, report_events
+from app.core.config import get_settings
+from app.api.deps import get_db, require_auth
+
+router = APIRouter()
+
+async def _body(request: Request) -> bytes:
+    return await request.body()
+
+# Empfang: SNS-/EventBridge-Weiterleitung oder Mock -> Bearer-Token statt Session.
+# Sync (Threadpool): record() schreibt über die sync Session, der Body kommt über die Dependency.
+@router.post("/api/notifications/sp-api", include_in_schema=False)
+def receive_notification(request: Request, raw: bytes = Depends(_body), db: Session = Depends(get_db)):
+    token = get_settings().NOTIFICATIONS_TOKEN
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if request.headers.get("authorization") != f"Bearer {token}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
+    if isinstance(body, dict) and body.get("Type") == "SubscriptionConfirmation":
+        # SNS-Topic-Bestätigung bewusst manuell (SubscribeURL aus dem Log)
+        report_events.log.warning("[notifications] SNS subscription confirmation: %s", body.get("SubscribeURL"))
+        return {"recorded": 0}
+    return {"recorded": report_events.record(db, body)}
+
+@router.get("/api/notifications/subscription", dependencies=[Depends(require_auth)])
+def api_get_subscription(account_id: int, db: Session = Depends(get_db)):
+    acc = db.get(models.SellerAccount, account_id)
+    if not acc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account nicht gefunden")
+    return {"subscription": report_events.get_subscription(acc.id, acc.refresh_token)}
+
+@router.post("/api/notifications/subscription", dependencies=[Depends(require_auth)])
+def api_ensure_subscription(account_id: int, destination_id: str | None = None, db: Session = Depends(get_db)):
+    """REPORT_PROCESSING_FINISHED abonnieren (idempotent)."""
+    acc = db.get(models.SellerAccount, account_id)
+    if not acc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account nicht gefunden")
+    return {"subscription": report_events.ensure_subscription(acc.id, acc.refresh_token, destination_id)}
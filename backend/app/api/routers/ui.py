@@ -1,8 +1,52 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from app.api.deps import require_auth
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import fragments, models
+from app.api.deps import get_read_db, require_auth
+from app.core.config import get_settings
+
+# Jinja erst beim ersten Gebrauch (Warm-up bzw. erster Render) laden – Kaltstart-Importzeit
+if TYPE_CHECKING:
+    from fastapi.templating import Jinja2Templates
 
 router = APIRouter()
+_templates: Optional[Jinja2Templates] = None
+_templates_lock = threading.Lock()
+
+def templates() -> Jinja2Templates:
+    global _templates
+    if _templates is None:
+        from fastapi.templating import Jinja2Templates
+        from jinja2 import FileSystemBytecodeCache
+        with _templates_lock:
+            if _templates is None:
+                t = Jinja2Templates(directory=str(Path(__file__).resolve().parents[3] / "templates"))
+                # Kompilierte Templates behalten (kein stat() je Render); Bytecode optional auf Platte für Neustarts
+                t.env.auto_reload = get_settings().UI_TEMPLATE_RELOAD
+                if get_settings().UI_TEMPLATE_CACHE_DIR:
+                    Path(get_settings().UI_TEMPLATE_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+                    t.env.bytecode_cache = FileSystemBytecodeCache(get_settings().UI_TEMPLATE_CACHE_DIR)
+                _templates = t
+    return _templates
+
+def precompile() -> int:
+    """Alle Templates einmal laden (Warm-up) – der erste Request zahlt kein Kompilieren."""
+    env = templates().env
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+def _render(name: str, **ctx) -> str:
+    return templates().env.get_template(name).render(**ctx)
 
 @router.get("/")
 def root():
@@ -10,7 +54,37 @@ def root():
 
 @router.get("/ui", response_class=HTMLResponse)
 def ui_page(request: Request, _=Depends(require_auth)):
-    return HTMLResponse("<!doctype html><html><body><h2>Dashboard</h2><p>Login OK. UI folgt…</p></body></html>")
+    # nur die Hülle: Accounts/Orders kommen als Fragmente (hx-trigger load/revealed)
+    return templates().TemplateResponse(request, "index.html", {})
+
+@router.get("/ui/fragments/accounts", response_class=HTMLResponse, dependencies=[Depends(require_auth)])
+def ui_accounts(db: Session = Depends(get_read_db)):
+    def render() -> str:
+        accounts = db.execute(select(models.SellerAccount).order_by(models.SellerAccount.id)).scalars().all()
+        return _render("fragments/accounts.html", accounts=accounts)
+    return HTMLResponse(fragments.cached("accounts", None, render))
+
+@router.get("/ui/fragments/orders", response_class=HTMLResponse, dependencies=[Depends(require_auth)])
+def ui_orders(db: Session = Depends(get_read_db)):
+    def render() -> str:
+        accounts = db.execute(select(models.SellerAccount.id, models.SellerAccount.name)
+                              .where(models.SellerAccount.is_active.is_(True))
+                              .order_by(models.SellerAccount.id)).all()
+        return _render("fragments/orders.html", accounts=accounts)
+    return HTMLResponse(fragments.cached("orders", None, render))
+
+@router.get("/ui/fragments/accounts/{account_id}/orders", response_class=HTMLResponse,
+            dependencies=[Depends(require_auth)])
+def ui_account_orders(account_id: int, db: Session = Depends(get_read_db)):
+    def render() -> str:
+        o = models.Order
+        orders = db.execute(select(o.order_id, o.purchase_date, o.status, o.marketplace)
+                            .where(o.account_id == account_id)
+                            .order_by(o.purchase_date.desc().nulls_last())
+                            .limit(get_settings().UI_RECENT_ORDERS)).all()
+        return _render("fragments/account_orders.html", orders=orders)
+    return HTMLResponse(fragments.cached("account_orders", account_id, render))
+
 @router.get("/login", response_class=HTMLResponse, include_in_schema=False)
 async def login_page():
     # Einfache Inline-Loginseite, POST geht als JSON an /api/login
@@ -1,14 +1,13 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.db.crud.users import get_by_email_or_username
-from app.core.security import verify_password
+from app.db.session import get_async_db
+from app.api.routers.auth import authenticate
 
 router = APIRouter(prefix="/api", tags=["auth"])
 
 @router.post("/login")
-async def login(request: Request, db: Session = Depends(get_db)):
+async def login(request: Request, db: AsyncSession = Depends(get_async_db)):
     identifier = None
     password = None
     ct = request.headers.get("content-type", "")
@@ -30,9 +29,7 @@ async def login(request: Request, db: Session = Depends(get_db)):
     if not identifier or not password:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="missing credentials")
 
-    user = get_by_email_or_username(db, identifier)
-    if not user or not verify_password(password, user.password_hash):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid credentials")
+    user = await authenticate(db, identifier, password)
 
     # Session setzen
     request.session["uid"] = user.id
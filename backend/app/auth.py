@@ -1,16 +1,8 @@
 from typing import Optional, Mapping
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-from passlib.hash import bcrypt
-
-def hash_password(password: str) -> str:
-    return bcrypt.hash(password)
-
-def verify_password(password: str, password_hash: str) -> bool:
-    try:
-        return bcrypt.verify(password, password_hash)
-    except Exception:
-        return False
+# Hashing liegt zentral in app.core.security (gleiche Kosten/Rehash-Regeln für alle User-Tabellen)
+from app.core.security import hash_password, verify_password  # noqa: F401
 
 def ensure_users_table(db: Session) -> None:
     db.execute(text("""
@@ -0,0 +1,227 @@
+"""Backfill langer Zeiträume: in Teilfenster je Quelle zerlegen, parallel abarbeiten, fortsetzbar.
+
+    job = plan_job(db, account_id, ["orders", "returns"], start, end)
+    run_job(job.id)            # nach Abbruch einfach erneut aufrufen (retry_failed=True: auch Fehlschläge)
+
+Jedes Teilfenster ist ein Checkpoint in backfill_chunks (pending -> running -> done/failed).
+Ein erneuter run_job() setzt hängengebliebene 'running'-Chunks zurück und arbeitet nur
+offene bzw. fehlgeschlagene (bis BACKFILL_MAX_ATTEMPTS) ab. Benachbarte Fenster überlappen
+um EDGE_OVERLAP; doppelte Zeilen fängt der Upsert (Orders) bzw. row_hash (fba_*) ab.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session
+
+from . import cache_bus, circuit, models
+from . import progress as ops  # Fortschritts-Events; progress() unten ist der Job-Stand
+from .core.config import get_settings
+from .sp_api_reports_patch import (
+    R_ADJUSTMENTS, R_CUSTOMER_RETURNS, R_ORDERS, R_REIMBURSEMENTS, R_REMOVALS, iter_report_batches,
+)
+
+log = logging.getLogger(__name__)
+
+EDGE_OVERLAP = timedelta(hours=1)
+_LOCK_BASE = 0x5C_1000  # Advisory-Lock je Job: nur ein Runner gleichzeitig
+
+@dataclass(frozen=True)
+class Source:
+    chunk: timedelta
+    run: Callable[[Session, models.SellerAccount, datetime, datetime], int]
+
+def _orders(db: Session, acc: models.SellerAccount, start: datetime, end: datetime) -> int:
+    from .services import store_orders
+    from .sp_api import pull_orders
+    orders = pull_orders({"marketplaces": acc.marketplaces or "DE"}, acc.id, acc.refresh_token, start, end)
+    return store_orders(db, acc.id, orders)
+
+def _orders_report(db: Session, acc: models.SellerAccount, start: datetime, end: datetime) -> int:
+    from .order_sourcing import fetch_report
+    from .services import store_orders
+    orders = fetch_report(acc, start, end)
+    return store_orders(db, acc.id, orders, source=R_ORDERS)
+
+def _report(report_type: str) -> Callable[..., int]:
+    def run(db: Session, acc: models.SellerAccount, start: datetime, end: datetime) -> int:
+        from .report_sourcing import covered_until
+        from .services import store_report_rows
+        from .watermarks import advance
+        n = total = 0
+        sourced: list = []
+        for batch in iter_report_batches(acc.id, acc.refresh_token, report_type, start, end, sourced=sourced):
+            n += store_report_rows(db, acc.id, report_type, batch)
+            total += len(batch)
+        covered = covered_until(start, sourced)
+        if covered:
+            advance(db, acc.id, report_type, start, covered, total)  # rückt nur bei lückenlosem Anschluss vor
+        return n
+    return run
+
+# Fenstergrößen je Quelle: so groß wie Amazon sie zuverlässig annimmt
+SOURCES: Dict[str, Source] = {
+    "orders": Source(timedelta(days=7), _orders),
+    # ein Flatfile-Report je 30 Tage statt getOrderItems je Order (Amazon-Limit je Report: 30 Tage)
+    "orders_report": Source(timedelta(days=30), _orders_report),
+    "returns": Source(timedelta(days=30), _report(R_CUSTOMER_RETURNS)),
+    "removals": Source(timedelta(days=30), _report(R_REMOVALS)),
+    "adjustments": Source(timedelta(days=30), _report(R_ADJUSTMENTS)),
+    "reimbursements": Source(timedelta(days=90), _report(R_REIMBURSEMENTS)),
+}
+REPORT_SOURCES = ("returns", "removals", "adjustments", "reimbursements")
+
+def split_windows(start: datetime, end: datetime, chunk: timedelta) -> List[tuple[datetime, datetime]]:
+    """[start, end] in Fenster der Länge `chunk`; jedes Fenster reicht EDGE_OVERLAP in das vorige."""
+    out = []
+    s = start
+    while s < end:
+        e = min(end, s + chunk)
+        out.append((max(start, s - EDGE_OVERLAP), e))
+        s = e
+    return out
+
+def plan_job(db: Session, account_id: int, sources: Sequence[str], start: datetime, end: datetime,
+             order_source: Optional[str] = None) -> models.BackfillJob:
+    """order_source übersteuert die Order-Quelle des Accounts (api|report|auto) für diesen Job."""
+    unknown = [s for s in sources if s not in SOURCES]
+    if unknown:
+        raise ValueError(f"unknown backfill source(s): {', '.join(unknown)}")
+    if "orders" in sources:
+        from . import order_sourcing
+        # Order-Quelle des Accounts (bzw. 'auto' nach Gesamtlänge) gilt auch für den Backfill
+        if order_sourcing.mode(db.get(models.SellerAccount, account_id), end - start, order_source) == "report":
+            sources = list(dict.fromkeys("orders_report" if s == "orders" else s for s in sources))
+    job = models.BackfillJob(account_id=account_id, sources=",".join(sources), range_from=start, range_to=end)
+    db.add(job)
+    db.flush()
+    db.add_all(models.BackfillChunk(job_id=job.id, source=src, window_start=ws, window_end=we)
+               for src in sources for ws, we in split_windows(start, end, SOURCES[src].chunk))
+    db.commit()
+    return job
+
+_CLAIM_SQL = text("""
+UPDATE backfill_chunks SET status = 'running', attempts = attempts + 1, started_at = now(), error = NULL
+WHERE id = (SELECT id FROM backfill_chunks
+            WHERE job_id = :job AND (status = 'pending' OR (status = 'failed' AND attempts < :max_attempts))
+            ORDER BY window_start DESC, id
+            LIMIT 1 FOR UPDATE SKIP LOCKED)
+RETURNING id, source, window_start, window_end
+""")
+
+def _worker(job_id: int, account_id: int, stop: threading.Event) -> None:
+    from .db.session import batch_session
+    max_attempts = get_settings().BACKFILL_MAX_ATTEMPTS
+    with batch_session() as db:
+        acc = db.get(models.SellerAccount, account_id)
+        db.expunge(acc)  # sonst lädt jeder Zugriff nach einem Commit neu – Transaktion offen während SP-API-Wartezeit
+        while not stop.is_set():
+            # neueste Fenster zuerst: aktuelle Daten sind beim Onboarding am schnellsten da
+            c = db.execute(_CLAIM_SQL, {"job": job_id, "max_attempts": max_attempts}).first()
+            db.commit()
+            if not c:
+                return
+            try:
+                # ein NOTIFY je Chunk – auch wenn der Aufrufer (z. B. Reports-Pull) selbst batched() läuft
+                with cache_bus.batched(isolated=True):
+                    n = SOURCES[c.source].run(db, acc, c.window_start, c.window_end)
+            except circuit.CircuitOpen as e:
+                # Störung bei Amazon, nicht am Fenster: Versuch zurückgeben und bis zum Probe warten
+                db.rollback()
+                ops.emit("chunk_deferred", source=c.source, retry_in=round(e.retry_in, 1))
+                db.execute(update(models.BackfillChunk).where(models.BackfillChunk.id == c.id)
+                           .values(status="pending", attempts=models.BackfillChunk.attempts - 1))
+                db.commit()
+                stop.wait(max(e.retry_in, 1.0))
+                continue
+            except Exception as e:
+                db.rollback()
+                log.warning("[backfill] job %s %s %s..%s failed: %s", job_id, c.source,
+                            c.window_start.date(), c.window_end.date(), e)
+                ops.emit("chunk_failed", source=c.source, window=f"{c.window_start.date()}..{c.window_end.date()}",
+                         error=str(e)[:200])
+                db.execute(update(models.BackfillChunk).where(models.BackfillChunk.id == c.id)
+                           .values(status="failed", error=str(e)[:2000], finished_at=func.now()))
+            else:
+                log.info("[backfill] job %s %s %s..%s: %d rows", job_id, c.source,
+                         c.window_start.date(), c.window_end.date(), n)
+                ops.emit("chunk_done", source=c.source, window=f"{c.window_start.date()}..{c.window_end.date()}",
+                         rows=n)
+                db.execute(update(models.BackfillChunk).where(models.BackfillChunk.id == c.id)
+                           .values(status="done", rows=n, finished_at=func.now()))
+            db.commit()
+
+def run_job(job_id: int, workers: Optional[int] = None, retry_failed: bool = False) -> Dict[str, Any]:
+    """Offene Chunks mit `workers` Threads abarbeiten (Default BACKFILL_WORKERS). Fortsetzbar.
+
+    retry_failed: endgültig gescheiterte Chunks bekommen eine neue Runde Versuche (explizites Resume).
+    """
+    from .db.session import batch_session, engine
+    workers = workers or get_settings().BACKFILL_WORKERS
+    with engine.connect() as lock_conn:
+        if not lock_conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _LOCK_BASE + job_id}).scalar():
+            raise RuntimeError(f"backfill job {job_id} is already running")
+        lock_conn.commit()  # Session-Lock bleibt, aber keine offene Transaktion über die Laufzeit
+        try:
+            with batch_session() as db:
+                job = db.get(models.BackfillJob, job_id)
+                if job is None:
+                    raise ValueError(f"backfill job {job_id} not found")
+                # Reste eines abgebrochenen Laufs wieder freigeben
+                db.execute(update(models.BackfillChunk)
+                           .where(models.BackfillChunk.job_id == job_id, models.BackfillChunk.status == "running")
+                           .values(status="pending"))
+                if retry_failed:
+                    db.execute(update(models.BackfillChunk)
+                               .where(models.BackfillChunk.job_id == job_id, models.BackfillChunk.status == "failed")
+                               .values(status="pending", attempts=0))
+                job.status, job.finished_at = "running", None
+                db.commit()
+                account_id = job.account_id
+
+            stop = threading.Event()
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"backfill-{job_id}") as pool:
+                # Context je Worker kopieren: Fortschritts-Events landen bei der aufrufenden Operation
+                futures = [pool.submit(contextvars.copy_context().run, _worker, job_id, account_id, stop)
+                           for _ in range(workers)]
+                try:
+                    for f in futures:
+                        f.result()
+                except BaseException:
+                    stop.set()
+                    raise
+
+            with batch_session() as db:
+                summary = progress(db, job_id)
+                job = db.get(models.BackfillJob, job_id)
+                job.status = "done" if summary["chunks"].get("done", 0) == summary["total"] else "failed"
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                summary["status"] = job.status
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _LOCK_BASE + job_id})
+    log.info("[backfill] job %s %s: %s", job_id, summary["status"], summary["chunks"])
+    return summary
+
+def progress(db: Session, job_id: int) -> Dict[str, Any]:
+    """Stand eines Jobs: Chunks je Status, geschriebene Zeilen je Quelle."""
+    job = db.get(models.BackfillJob, job_id)
+    if job is None:
+        raise ValueError(f"backfill job {job_id} not found")
+    c = models.BackfillChunk
+    rows = db.execute(select(c.source, c.status, func.count(), func.coalesce(func.sum(c.rows), 0))
+                      .where(c.job_id == job_id).group_by(c.source, c.status)).all()
+    chunks: Dict[str, int] = {}
+    per_source: Dict[str, int] = {}
+    for source, status, n, written in rows:
+        chunks[status] = chunks.get(status, 0) + n
+        per_source[source] = per_source.get(source, 0) + int(written)
+    return {"job_id": job_id, "account_id": job.account_id, "status": job.status,
+            "total": sum(chunks.values()), "chunks": chunks, "rows": per_source}
@@ -0,0 +1,193 @@
+"""Cache-Invalidierung über Prozessgrenzen: Postgres LISTEN/NOTIFY statt Redis.
+
+    cache_bus.publish("data", account_id=7, table="orders")   # nach dem Commit
+    cache_bus.subscribe(("data", "account"), handler)         # handler(Event), einmal beim Import
+    cache_bus.start() / cache_bus.stop()                      # Listener-Thread (Web-Lifespan)
+    with cache_bus.batched(): ...                             # NOTIFY je Event einmal am Ende
+
+publish() ruft die Handler des eigenen Prozesses sofort auf und schickt das Event per
+pg_notify an CACHE_BUS_CHANNEL. Der Listener jedes anderen Prozesses (eigene, dauerhaft
+offene Verbindung außerhalb des Pools) ruft dort dieselben Handler auf; eigene Events
+erkennt er an `origin`. Postgres stellt NOTIFY erst beim Commit zu, in Sende-Reihenfolge.
+
+Innerhalb von batched() (Pull, Sync, Backfill-Chunk) gehen gleiche Events nur einmal,
+am Ende des Blocks, per NOTIFY raus – nicht je gespeichertem Batch; lokal sofort.
+
+Arten: data (Zeilen einer Tabelle des Accounts geschrieben), account (Stammdaten eines
+Accounts; ohne account_id: Account-Liste; table = geänderter Bereich, CREDENTIALS für
+Refresh-Token/Schlüssel, ohne table: alles), reset (alles verwerfen – nach Bulk-Writes an
+der Anwendung vorbei und nach einem Reconnect des Listeners, weil Events in der Lücke
+verloren sind; geht an jeden Handler). NOTIFY ist best effort: schlägt es fehl, bleiben
+fremde Caches bis zu ihrer TTL alt.
+"""
+from __future__ import annotations
+
+import contextvars
+import itertools
+import json
+import logging
+import os
+import select
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import get_settings
+
+log = logging.getLogger(__name__)
+
+KINDS = ("data", "account", "reset")
+CREDENTIALS = "credentials"  # table eines account-Events: Zugangsdaten geändert
+ORIGIN = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+@dataclass(frozen=True)
+class Event:
+    kind: str
+    account_id: Optional[int] = None
+    table: Optional[str] = None
+    version: int = 0          # laufende Nummer je Sender-Prozess
+    origin: str = ORIGIN
+
+Handler = Callable[[Event], None]
+
+_handlers: Dict[str, List[Handler]] = {k: [] for k in KINDS}
+_seq = itertools.count(1)
+# (Art, Account, Tabelle) -> (letztes Event, bind) für den laufenden batched()-Block
+_pending: contextvars.ContextVar[Optional[Dict[Tuple, Tuple[Event, object]]]] = contextvars.ContextVar(
+    "cache_bus_pending", default=None)
+
+def subscribe(kinds: Iterable[str], handler: Handler) -> None:
+    """Handler für diese Arten registrieren; 'reset' bekommt er immer."""
+    for k in set(kinds) | {"reset"}:
+        if k not in _handlers:
+            raise ValueError(f"unknown event kind {k!r} (expected one of {', '.join(KINDS)})")
+        if handler not in _handlers[k]:
+            _handlers[k].append(handler)
+
+def _dispatch(ev: Event) -> None:
+    for h in list(_handlers[ev.kind]):
+        try:
+            h(ev)
+        except Exception:
+            log.exception("[cache_bus] handler %s failed for %s", getattr(h, "__qualname__", h), ev)
+
+def publish(kind: str, account_id: Optional[int] = None, table: Optional[str] = None, *, bind=None) -> Event:
+    """Lokal zustellen und an alle anderen Prozesse senden (bind: Engine, sonst die Web-Engine)."""
+    if kind not in _handlers:
+        raise ValueError(f"unknown event kind {kind!r} (expected one of {', '.join(KINDS)})")
+    ev = Event(kind, account_id, table, next(_seq))
+    _dispatch(ev)
+    pending = _pending.get()
+    if pending is not None:
+        pending[(kind, account_id, table)] = (ev, bind)
+    else:
+        _notify(ev, bind)
+    return ev
+
+@contextmanager
+def batched(isolated: bool = False) -> Iterator[None]:
+    """NOTIFYs im Block sammeln, je (Art, Account, Tabelle) einmal am Ende senden (auch bei Fehlern).
+
+    isolated: eigener Block auch innerhalb eines äußeren (Worker-Threads mit kopiertem Context
+    sollen weder auf das Ende des Aufrufers warten noch dessen Sammel-Dict teilen).
+    """
+    if _pending.get() is not None and not isolated:  # verschachtelt: der äußere Block sendet
+        yield
+        return
+    pending: Dict[Tuple, Tuple[Event, object]] = {}
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+        for ev, bind in pending.values():
+            _notify(ev, bind)
+
+def _notify(ev: Event, bind=None) -> None:
+    s = get_settings()
+    if not s.CACHE_BUS_ENABLED:
+        return
+    from sqlalchemy import text
+    if bind is None:
+        from app.db.session import engine as bind
+    try:
+        with bind.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:ch, :payload)"),
+                         {"ch": s.CACHE_BUS_CHANNEL, "payload": json.dumps(asdict(ev), separators=(",", ":"))})
+            conn.commit()
+        metrics.CACHE_BUS_EVENTS.labels(ev.kind, "sent").inc()
+    except Exception as e:
+        metrics.CACHE_BUS_EVENTS.labels(ev.kind, "failed").inc()
+        log.warning("[cache_bus] notify failed (%s): %s", ev.kind, e)
+
+def _receive(payload: str) -> None:
+    try:
+        ev = Event(**json.loads(payload))
+    except (TypeError, ValueError):
+        log.warning("[cache_bus] invalid payload %r", payload[:200])
+        return
+    if ev.origin == ORIGIN or ev.kind not in _handlers:
+        return
+    metrics.CACHE_BUS_EVENTS.labels(ev.kind, "received").inc()
+    _dispatch(ev)
+
+# ---------- Listener ----------
+
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+def _listen_dsn() -> str:
+    from sqlalchemy.engine import make_url
+    s = get_settings()
+    url = make_url(s.CACHE_BUS_LISTEN_URL or s.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+def _listen() -> None:
+    import psycopg2
+    from psycopg2 import sql
+    delay, connected_before = 1.0, False
+    while not _stop.is_set():
+        conn = None
+        try:
+            conn = psycopg2.connect(_listen_dsn(), connect_timeout=5, application_name="cache_bus",
+                                    keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(get_settings().CACHE_BUS_CHANNEL)))
+            metrics.CACHE_BUS_LISTENING.set(1)
+            if connected_before:
+                _dispatch(Event("reset"))  # Events während der Trennung sind verloren
+            connected_before, delay = True, 1.0
+            while not _stop.is_set():
+                if select.select([conn], [], [], 1.0)[0]:
+                    conn.poll()
+                    while conn.notifies:
+                        _receive(conn.notifies.pop(0).payload)
+        except Exception as e:
+            metrics.CACHE_BUS_LISTENING.set(0)
+            log.warning("[cache_bus] listener disconnected, retry in %.0fs: %s", delay, e)
+            _stop.wait(delay)
+            delay = min(delay * 2, 30.0)
+        finally:
+            if conn is not None:
+                conn.close()
+    metrics.CACHE_BUS_LISTENING.set(0)
+
+def start() -> None:
+    """Listener-Thread starten (idempotent; aus bei CACHE_BUS_ENABLED=0)."""
+    global _thread
+    if not get_settings().CACHE_BUS_ENABLED or (_thread and _thread.is_alive()):
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_listen, name="cache-bus", daemon=True)
+    _thread.start()
+
+def stop(timeout: float = 3.0) -> None:
+    global _thread
+    _stop.set()
+    if _thread:
+        _thread.join(timeout)
+        _thread = None
@@ -0,0 +1,108 @@
+"""Katalog-Dimension: (Account, SKU, ASIN) -> catalog_items.id für die Faktentabellen.
+
+    ids = catalog.resolve(db, account_id, [(sku, asin, fnsku), ...])   # {(sku, asin): id}
+
+resolve() bedient sich aus einem prozessweiten Cache; nur unbekannte Schlüssel gehen als ein
+Upsert an die DB – in eigener, sofort committeter Transaktion: IDs im Cache existieren
+damit garantiert, auch wenn die Fakten-Transaktion des Aufrufers später zurückrollt.
+IDs ändern sich nie (keine Deletes); nur ein reset-Event des Cache-Bus (z.B. nach
+synthdata --truncate in einem anderen Prozess) leert den Cache.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from . import cache_bus
+from .models import CatalogItem
+
+FACT_TABLES = ("order_items", "fba_returns", "fba_removals", "fba_inventory_adjustments",
+               "fba_reimbursements", "inventory_ledger", "reimbursements", "recon_results")
+
+_CACHE_MAX = 500_000
+# (account_id, sku, asin) -> (id, fnsku bekannt)
+_cache: Dict[Tuple[int, str, str], Tuple[int, bool]] = {}
+_cache_lock = threading.Lock()
+
+def key(sku: Optional[str], asin: Optional[str]) -> Tuple[str, str]:
+    return (sku or "")[:100], (asin or "")[:20]
+
+def resolve(db: Session, account_id: int,
+            items: Iterable[Tuple[Optional[str], Optional[str], Optional[str]]]) -> Dict[Tuple[str, str], int]:
+    """catalog_id je (sku, asin); unbekannte Artikel werden angelegt, FNSKU nachgetragen."""
+    wanted: Dict[Tuple[str, str], Optional[str]] = {}
+    for sku, asin, fnsku in items:
+        k = key(sku, asin)
+        if fnsku or k not in wanted:
+            wanted[k] = fnsku[:20] if fnsku else None
+    out: Dict[Tuple[str, str], int] = {}
+    missing = []
+    with _cache_lock:
+        for k, fnsku in wanted.items():
+            hit = _cache.get((account_id, *k))
+            if hit and (hit[1] or not fnsku):
+                out[k] = hit[0]
+            else:
+                missing.append(k)
+    if not missing:
+        return out
+
+    t = CatalogItem.__table__
+    rows = [dict(account_id=account_id, sku=k[0], asin=k[1], fnsku=wanted[k]) for k in sorted(missing)]
+    stmt = pg_insert(t).values(rows)
+    # DO UPDATE statt DO NOTHING: RETURNING liefert so auch die IDs bereits vorhandener Artikel
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[t.c.account_id, t.c.sku, t.c.asin],
+        set_={"fnsku": func.coalesce(t.c.fnsku, stmt.excluded.fnsku)},
+    ).returning(t.c.id, t.c.sku, t.c.asin, t.c.fnsku)
+    with db.get_bind().connect() as conn:
+        found = conn.execute(stmt).all()
+        conn.commit()
+    with _cache_lock:
+        if len(_cache) + len(found) > _CACHE_MAX:
+            _cache.clear()
+        for r in found:
+            _cache[(account_id, r.sku, r.asin)] = (r.id, r.fnsku is not None)
+            out[(r.sku, r.asin)] = r.id
+    return out
+
+def clear_cache() -> None:
+    """Nach TRUNCATE/RESTART IDENTITY von catalog_items (z.B. synthdata --truncate)."""
+    with _cache_lock:
+        _cache.clear()
+
+def _on_reset(ev: cache_bus.Event) -> None:
+    clear_cache()
+
+cache_bus.subscribe((), _on_reset)
+
+def lookup(db: Session, ids: Iterable[int]) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+    """id -> (sku, asin); '' wieder als None."""
+    ids = [i for i in set(ids) if i is not None]
+    if not ids:
+        return {}
+    rows = db.execute(select(CatalogItem.id, CatalogItem.sku, CatalogItem.asin).where(CatalogItem.id.in_(ids))).all()
+    return {r.id: (r.sku or None, r.asin or None) for r in rows}
+
+def backfill(db: Session, account_id: Optional[int] = None, tables: Sequence[str] = FACT_TABLES) -> int:
+    """catalog_id für Fakten ohne ID nachtragen (Zeilen aus COPY-Importen o.ä.). Rückgabe: Zeilen."""
+    acc = "" if account_id is None else "AND f.account_id = :acc"
+    params = {} if account_id is None else {"acc": account_id}
+    n = 0
+    for t in tables:
+        # (account_id, catalog_id)-Index: "catalog_id IS NULL" ist ein Index-Lookup, kein Scan
+        db.execute(text(f"""
+            INSERT INTO catalog_items (account_id, sku, asin)
+            SELECT DISTINCT f.account_id, coalesce(f.sku, ''), coalesce(f.asin, '') FROM {t} f
+            WHERE f.catalog_id IS NULL AND f.account_id IS NOT NULL {acc}
+            ON CONFLICT DO NOTHING"""), params)
+        n += db.execute(text(f"""
+            UPDATE {t} f SET catalog_id = c.id FROM catalog_items c
+            WHERE f.catalog_id IS NULL {acc} AND c.account_id = f.account_id
+              AND c.sku = coalesce(f.sku, '') AND c.asin = coalesce(f.asin, '')"""), params).rowcount
+    db.commit()
+    return n
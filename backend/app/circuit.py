@@ -0,0 +1,112 @@
+"""Circuit-Breaker je (Region, Operation) um die SP-API- und LWA-Calls.
+
+    b = circuit.breaker("eu", "getReport")
+    b.before()                  # wirft CircuitOpen sofort (ms), solange offen
+    ... Request ...
+    b.record(ok)                # ok=False: Transportfehler/Timeout oder 5xx
+
+closed -> open nach CIRCUIT_FAILURES Fehlern in Folge; nach CIRCUIT_OPEN_S half_open:
+genau ein Probe-Request darf durch, Erfolg schließt, Fehler öffnet erneut. 4xx/429
+sind keine Ausfälle (Amazon antwortet ja). Zustand liegt im Prozess-Speicher – jeder
+Worker lernt einen Ausfall selbst, braucht dafür aber nur wenige Fehl-Requests.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from .core import metrics
+from .core.config import get_settings
+
+STATES = ("closed", "half_open", "open")
+
+class CircuitOpen(RuntimeError):
+    """SP-API/LWA gilt für diese Operation als gestört – Request wurde gar nicht erst gesendet."""
+
+    def __init__(self, region: str, operation: str, retry_in: float):
+        self.region, self.operation, self.retry_in = region, operation, max(0.0, retry_in)
+        super().__init__(f"SP-API {region}/{operation} degraded (circuit open, retry in {self.retry_in:.0f}s)")
+
+class Breaker:
+    def __init__(self, region: str, operation: str):
+        self.region = region
+        self.operation = operation
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error: str | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _set(self, state: str) -> None:
+        self.state = state
+        metrics.SP_API_CIRCUIT_STATE.labels(self.region, self.operation).set(STATES.index(state))
+
+    def before(self) -> None:
+        """Request zulassen oder CircuitOpen werfen."""
+        if self.state == "closed":
+            return
+        open_s = get_settings().CIRCUIT_OPEN_S
+        with self._lock:
+            if self.state == "open":
+                waited = time.monotonic() - self.opened_at
+                if waited < open_s:
+                    metrics.SP_API_CIRCUIT_REJECTED.labels(self.region, self.operation).inc()
+                    raise CircuitOpen(self.region, self.operation, open_s - waited)
+                self._set("half_open")
+                self._probing = False
+            if self.state == "half_open":
+                if self._probing:  # Probe läuft schon, alle anderen scheitern weiter schnell
+                    metrics.SP_API_CIRCUIT_REJECTED.labels(self.region, self.operation).inc()
+                    raise CircuitOpen(self.region, self.operation, 1.0)
+                self._probing = True
+
+    def record(self, ok: bool, error: str | None = None) -> None:
+        with self._lock:
+            self._probing = False
+            if ok:
+                self.failures = 0
+                if self.state != "closed":
+                    self._set("closed")
+                return
+            self.failures += 1
+            self.last_error = (error or "")[:200] or None
+            if self.state == "half_open" or self.failures >= get_settings().CIRCUIT_FAILURES:
+                self.opened_at = time.monotonic()
+                self._set("open")
+
+    def release(self) -> None:
+        """Request ohne Aussage über die Gegenstelle beendet (z.B. lokaler Fehler)."""
+        with self._lock:
+            self._probing = False
+
+    def summary(self) -> Dict[str, Any]:
+        retry_in = 0.0
+        if self.state == "open":
+            retry_in = max(0.0, get_settings().CIRCUIT_OPEN_S - (time.monotonic() - self.opened_at))
+        return {"region": self.region, "operation": self.operation, "state": self.state,
+                "failures": self.failures, "retry_in": round(retry_in, 1), "last_error": self.last_error}
+
+_breakers: Dict[Tuple[str, str], Breaker] = {}
+_registry_lock = threading.Lock()
+
+def breaker(region: str, operation: str) -> Breaker:
+    b = _breakers.get((region, operation))
+    if b is None:
+        with _registry_lock:
+            b = _breakers.setdefault((region, operation), Breaker(region, operation))
+    return b
+
+def is_failure(status_code: int) -> bool:
+    return status_code >= 500
+
+def status() -> Dict[str, Any]:
+    """Für Dashboard/API: gestörte Regionen und alle nicht geschlossenen Breaker."""
+    tripped: List[Dict[str, Any]] = [b.summary() for b in list(_breakers.values()) if b.state != "closed"]
+    return {"degraded": sorted({b["region"] for b in tripped}), "circuits": tripped}
+
+def reset() -> None:
+    with _registry_lock:
+        _breakers.clear()
+    metrics.SP_API_CIRCUIT_STATE.clear()
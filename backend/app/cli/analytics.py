@@ -0,0 +1,42 @@
+"""Parquet-Export für die KPI-Abfragen (inkrementell: nur geänderte Account/Monat-Partitionen).
+
+    python -m app.cli.analytics export                      # alle Accounts, alle Datasets
+    python -m app.cli.analytics export --account 3 --datasets order_items,returns
+    python -m app.cli.analytics export --loop 600           # Dauerbetrieb (Compose-Service)
+    python -m app.cli.analytics export --full               # alle Partitionen abgleichen, nicht nur seit der Marke
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from typing import List
+
+log = logging.getLogger("app.analytics")
+
+def main(argv: List[str] | None = None) -> None:
+    from app import analytics
+
+    p = argparse.ArgumentParser(prog="python -m app.cli.analytics", description=__doc__.splitlines()[0])
+    p.add_argument("command", choices=("export",))
+    p.add_argument("--account", type=int)
+    p.add_argument("--datasets", help="CSV aus " + ", ".join(analytics.DATASETS))
+    p.add_argument("--full", action="store_true", help="alle Partitionen fingerprinten (sonst nur seit der Marke berührte)")
+    p.add_argument("--loop", type=int, metavar="SECONDS", help="wiederholt exportieren, Pause in Sekunden")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.db.session import batch_read_session
+    datasets = [d.strip() for d in args.datasets.split(",")] if args.datasets else None
+    while True:
+        t0 = time.perf_counter()
+        # Lesen von der Replika (falls konfiguriert), Buchführung in analytics_exports am Primary
+        with batch_read_session(args.account) as db:
+            written = analytics.export(db, args.account, datasets, full=args.full)
+        log.info("export: %s in %.1fs", written, time.perf_counter() - t0)
+        if not args.loop:
+            return
+        time.sleep(args.loop)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Backfill eines Accounts über einen langen Zeitraum (Chunks, parallel, fortsetzbar).
+
+    python -m app.cli.backfill --account 1 --days 540                     # alle Quellen
+    python -m app.cli.backfill --account 1 --days 540 --sources orders,returns --workers 6
+    python -m app.cli.backfill --resume 7                                 # abgebrochenen Job fortsetzen
+    python -m app.cli.backfill --status 7
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+def main(argv: List[str] | None = None) -> None:
+    from app import backfill
+
+    p = argparse.ArgumentParser(prog="python -m app.cli.backfill", description=__doc__.splitlines()[0])
+    p.add_argument("--account", type=int, help="seller_accounts.id")
+    p.add_argument("--days", type=int, default=540)
+    p.add_argument("--sources", default=",".join(backfill.SOURCES), help="CSV aus " + ", ".join(backfill.SOURCES))
+    p.add_argument("--workers", type=int, help="parallele Chunks (Default BACKFILL_WORKERS)")
+    p.add_argument("--resume", type=int, metavar="JOB_ID")
+    p.add_argument("--status", type=int, metavar="JOB_ID")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.db.session import batch_session
+    if args.status:
+        with batch_session() as db:
+            print(json.dumps(backfill.progress(db, args.status), indent=2))
+        return
+    job_id = args.resume
+    if not job_id:
+        if not args.account:
+            p.error("--account required (or --resume/--status)")
+        end = datetime.utcnow() - timedelta(minutes=5)
+        with batch_session() as db:
+            job_id = backfill.plan_job(db, args.account, [s.strip() for s in args.sources.split(",") if s.strip()],
+                                       end - timedelta(days=args.days), end).id
+        logging.info("backfill job %s planned", job_id)
+    print(json.dumps(backfill.run_job(job_id, args.workers, retry_failed=bool(args.resume)), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""SQL-Migrationen (migrations/NNN_*.sql) anwenden – einmalig vor dem App-Start, nicht im Boot-Pfad.
+
+    python -m app.cli.migrate            # alle offenen anwenden
+    python -m app.cli.migrate --status   # nur anzeigen
+
+Angewendete Dateien stehen in schema_migrations; ein Advisory-Lock verhindert
+parallele Läufe (mehrere Container starten gleichzeitig).
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+from typing import List
+
+log = logging.getLogger("app.migrate")
+
+_LOCK_ID = 0x5C_0001
+
+def migrations_dir() -> Path:
+    env = os.getenv("MIGRATIONS_DIR")
+    if env:
+        return Path(env)
+    here = Path(__file__).resolve()
+    # Container: /app/migrations, Repo: <root>/migrations
+    for cand in (here.parents[2] / "migrations", here.parents[3] / "migrations"):
+        if cand.is_dir():
+            return cand
+    raise RuntimeError("migrations directory not found (set MIGRATIONS_DIR)")
+
+def pending(conn, files: List[Path]) -> List[Path]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT name FROM schema_migrations")
+        done = {r[0] for r in cur.fetchall()}
+    return [f for f in files if f.name not in done]
+
+def main(argv: List[str] | None = None) -> None:
+    p = argparse.ArgumentParser(prog="python -m app.cli.migrate", description=__doc__.splitlines()[0])
+    p.add_argument("--status", action="store_true", help="offene Migrationen nur auflisten")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.core.config import get_settings
+    from app.db.engine import make_engine
+
+    files = sorted(migrations_dir().glob("[0-9][0-9][0-9]_*.sql"))
+    engine = make_engine(get_settings().DATABASE_URL, name="migrate", workload="batch")
+    conn = engine.raw_connection()
+    try:
+        conn.set_client_encoding("UTF8")  # Migrationsdateien sind UTF-8 (Kommentare)
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (_LOCK_ID,))
+            cur.execute("CREATE TABLE IF NOT EXISTS schema_migrations ("
+                        "name VARCHAR(200) PRIMARY KEY, applied_at TIMESTAMP NOT NULL DEFAULT NOW())")
+        conn.commit()
+        todo = pending(conn, files)
+        if args.status:
+            for f in files:
+                log.info("%s %s", "pending" if f in todo else "applied", f.name)
+            return
+        for f in todo:
+            log.info("applying %s", f.name)
+            with conn.cursor() as cur:
+                cur.execute(f.read_text(encoding="utf-8"))
+                cur.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (f.name,))
+            conn.commit()
+        log.info("%d migration(s) applied, %d total", len(todo), len(files))
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (_LOCK_ID,))
+        conn.commit()
+        conn.close()
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
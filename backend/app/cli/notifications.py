@@ -0,0 +1,82 @@
+"""Consumer für REPORT_PROCESSING_FINISHED-Notifications (schreibt nach sp_report_events).
+
+    python -m app.cli.notifications --source sqs  --queue-url https://sqs.eu-west-1.amazonaws.com/…/sp-api
+    python -m app.cli.notifications --source file --dir /tmp/sp-notifications   # lokaler Stand-in
+
+SQS: Long-Polling, Nachricht wird erst nach erfolgreichem record() gelöscht.
+Datei: jede *.json wird eingelesen und nach processed/ verschoben.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import List
+
+from app import report_events
+
+log = logging.getLogger("app.notifications")
+
+def consume_sqs(queue_url: str, once: bool = False) -> None:
+    import boto3  # nur für diesen Consumer nötig
+    sqs = boto3.client("sqs")
+    from app.db.session import SessionLocal
+    while True:
+        msgs = sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10,
+                                   WaitTimeSeconds=20).get("Messages") or []
+        for m in msgs:
+            try:
+                with SessionLocal() as db:
+                    n = report_events.record(db, m["Body"])
+            except Exception:
+                log.exception("notification %s failed – left in queue", m.get("MessageId"))
+                continue
+            sqs.delete_message(QueueUrl=queue_url, ReceiptHandle=m["ReceiptHandle"])
+            log.info("message %s: %d event(s)", m.get("MessageId"), n)
+        if once:
+            return
+
+def consume_dir(path: Path, once: bool = False, interval_s: float = 1.0) -> None:
+    from app.db.session import SessionLocal
+    done = path / "processed"
+    done.mkdir(parents=True, exist_ok=True)
+    while True:
+        for f in sorted(path.glob("*.json")):
+            try:
+                with SessionLocal() as db:
+                    n = report_events.record(db, f.read_text(encoding="utf-8"))
+            except Exception:
+                log.exception("notification file %s failed", f.name)
+                f.rename(f.with_suffix(".failed"))
+                continue
+            f.rename(done / f.name)
+            log.info("%s: %d event(s)", f.name, n)
+        if once:
+            return
+        time.sleep(interval_s)
+
+def main(argv: List[str] | None = None) -> None:
+    p = argparse.ArgumentParser(prog="python -m app.cli.notifications", description=__doc__.splitlines()[0])
+    p.add_argument("--source", choices=("sqs", "file"), required=True)
+    p.add_argument("--queue-url", help="SQS-Queue (Default: NOTIFICATIONS_SQS_URL)")
+    p.add_argument("--dir", help="Verzeichnis mit *.json (Default: NOTIFICATIONS_DIR)")
+    p.add_argument("--once", action="store_true", help="einmal abarbeiten und beenden")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.core.config import get_settings
+    s = get_settings()
+    if args.source == "sqs":
+        url = args.queue_url or s.NOTIFICATIONS_SQS_URL
+        if not url:
+            p.error("--queue-url or NOTIFICATIONS_SQS_URL required")
+        consume_sqs(url, args.once)
+    else:
+        d = args.dir or s.NOTIFICATIONS_DIR
+        if not d:
+            p.error("--dir or NOTIFICATIONS_DIR required")
+        consume_dir(Path(d), args.once)
+
+if __name__ == "__main__":
+    main()
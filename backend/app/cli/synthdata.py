@@ -0,0 +1,345 @@
+"""Synthetischer Multi-Account-Datensatz für Lasttests (Recon, Dashboard, Indizes).
+
+    python -m app.cli.synthdata --accounts 20 --skus 5000 --days 365 --orders-per-day 800 --jobs 8
+
+Schreibt per COPY (CSV über STDIN) in seller_accounts, orders, order_items, fba_*,
+inventory_ledger, reimbursements und recon_results. Verteilung: SKU-Popularität
+Pareto-verteilt, Preise log-normal, Wochenend-/Saisoneffekt auf das Order-Volumen,
+Retouren/Verluste/Erstattungen als Raten auf die verkauften Einheiten.
+Deterministisch über --seed (pro Account). --users N legt Login-Nutzer <prefix>01..NN
+für den Lasttest an (benchmarks/bench_load.py).
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import logging
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence
+
+from app.sp_api import EU_MK_IDS
+
+log = logging.getLogger("app.synthdata")
+
+COLUMNS: Dict[str, Sequence[str]] = {
+    "orders": ("account_id", "order_id", "purchase_date", "last_update_date", "status", "marketplace", "data"),
+    "order_items": ("account_id", "order_id", "order_item_id", "asin", "sku", "qty", "price_amount", "currency"),
+    "fba_returns": ("account_id", "return_date", "order_id", "asin", "sku", "disposition", "reason", "quantity", "fc"),
+    "fba_removals": ("account_id", "removal_order_id", "order_type", "status", "request_date", "shipped_date",
+                     "received_date", "asin", "sku", "quantity", "disposition"),
+    "fba_inventory_adjustments": ("account_id", "adjustment_date", "asin", "sku", "quantity", "reason", "fc"),
+    "fba_reimbursements": ("account_id", "posted_date", "case_id", "asin", "sku", "quantity", "amount",
+                           "currency", "reason"),
+    "inventory_ledger": ("account_id", "event_date", "event_type", "asin", "sku", "fc", "qty", "reference"),
+    "reimbursements": ("account_id", "posted_date", "asin", "sku", "case_id", "reason", "units", "amount"),
+    "recon_results": ("account_id", "asin", "sku", "window_from", "window_to", "lost_units", "damaged_units",
+                      "found_units", "reimbursed_units", "reimbursed_amount", "open_units", "open_amount",
+                      "open_currency"),
+}
+TABLES = ["seller_accounts", *COLUMNS]
+
+# Raten je verkaufter Einheit bzw. je Ereignis
+RETURN_RATE = 0.06
+LOST_RATE = 0.004
+DAMAGED_RATE = 0.003
+FOUND_SHARE = 0.3         # Anteil verlorener Einheiten, die wieder auftauchen
+REIMBURSED_SHARE = 0.65   # Anteil Lost/Damaged, die erstattet werden
+REMOVALS_PER_DAY = 0.3
+
+FCS = ("LEJ1", "DTM2", "WRO5", "FRA3", "MUC3", "PRG2", "BER3", "CGN1")
+ORDER_STATUS = (("Shipped", 90), ("Unshipped", 4), ("Canceled", 4), ("Pending", 2))
+DISPOSITIONS = (("SELLABLE", 60), ("CUSTOMER_DAMAGED", 25), ("DEFECTIVE", 10), ("CARRIER_DAMAGED", 5))
+RETURN_REASONS = ("UNWANTED_ITEM", "NOT_AS_DESCRIBED", "DEFECTIVE", "ORDERED_WRONG_ITEM", "NOT_COMPATIBLE")
+
+def _weighted(pairs):
+    vals, weights = zip(*pairs)
+    return vals, list(weights)
+
+def _ts(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+class _Catalog:
+    """SKUs eines Accounts mit Pareto-Popularität und log-normalen Preisen."""
+
+    def __init__(self, rnd: random.Random, account_id: int, n: int):
+        self.sku = [f"A{account_id:03d}-SKU-{i:06d}" for i in range(n)]
+        self.asin = [f"B0{rnd.randrange(16**8):08X}" for _ in range(n)]
+        self.price = [round(min(999.0, max(1.99, rnd.lognormvariate(3.0, 0.8))), 2) for _ in range(n)]
+        weights = [rnd.paretovariate(1.2) for _ in range(n)]
+        total, acc, self.cum = sum(weights), 0.0, []
+        for w in weights:
+            acc += w / total
+            self.cum.append(acc)
+
+    def pick(self, rnd: random.Random, k: int = 1) -> List[int]:
+        return rnd.choices(range(len(self.sku)), cum_weights=self.cum, k=k)
+
+class _CopyWriter:
+    """Puffert CSV-Zeilen je Tabelle und schreibt sie blockweise per COPY."""
+
+    def __init__(self, conn, flush_rows: int):
+        self.conn = conn
+        self.flush_rows = flush_rows
+        self.buffers: Dict[str, io.StringIO] = {}
+        self.writers: Dict[str, "csv._writer"] = {}
+        self.pending: Dict[str, int] = {}
+        self.written: Dict[str, int] = dict.fromkeys(COLUMNS, 0)
+
+    def row(self, table: str, values: tuple) -> None:
+        w = self.writers.get(table)
+        if w is None:
+            self.buffers[table] = io.StringIO()
+            w = self.writers[table] = csv.writer(self.buffers[table], lineterminator="\n")
+            self.pending[table] = 0
+        w.writerow(values)
+        self.pending[table] += 1
+        if self.pending[table] >= self.flush_rows:
+            self.flush(table)
+
+    def flush(self, table: str | None = None) -> None:
+        for t in [table] if table else list(self.buffers):
+            buf = self.buffers.get(t)
+            if not buf or not self.pending[t]:
+                continue
+            buf.seek(0)
+            with self.conn.cursor() as cur:
+                cur.copy_expert(f"COPY {t} ({', '.join(COLUMNS[t])}) FROM STDIN WITH (FORMAT csv)", buf)
+            self.written[t] += self.pending[t]
+            self.buffers[t] = io.StringIO()
+            self.writers[t] = csv.writer(self.buffers[t], lineterminator="\n")
+            self.pending[t] = 0
+
+def _generate_account(out: _CopyWriter, account_id: int, marketplaces: List[str], args) -> None:
+    rnd = random.Random(args.seed * 1_000_003 + account_id)
+    cat = _Catalog(rnd, account_id, args.skus)
+    status_vals, status_w = _weighted(ORDER_STATUS)
+    disp_vals, disp_w = _weighted(DISPOSITIONS)
+    mk_ids = [EU_MK_IDS[m] for m in marketplaces]
+    window_to = args.end.replace(hour=0, minute=0, second=0, microsecond=0)
+    window_from = window_to - timedelta(days=args.days)
+
+    # SKU-Index -> [lost, damaged, found, reimb_units, reimb_amount]
+    agg: Dict[int, List[float]] = {}
+    order_seq = 0
+
+    for d in range(args.days):
+        day = window_from + timedelta(days=d)
+        season = 1.0 + 0.35 * math.sin(2 * math.pi * (day.timetuple().tm_yday - 250) / 365)
+        weekend = 1.15 if day.weekday() >= 5 else 1.0
+        n_orders = max(0, int(rnd.gauss(args.orders_per_day * season * weekend, args.orders_per_day * 0.1)))
+        units_sold: Dict[int, int] = {}
+
+        for _ in range(n_orders):
+            order_seq += 1
+            oid = f"{300 + account_id % 700:03d}-{order_seq:07d}-{rnd.randrange(10**7):07d}"
+            pdate = day + timedelta(seconds=rnd.randrange(86400))
+            mk = rnd.randrange(len(marketplaces))
+            status = rnd.choices(status_vals, status_w)[0]
+            udate = pdate + timedelta(hours=rnd.randint(1, 72))
+            out.row("orders", (account_id, oid, _ts(pdate), _ts(udate), status, marketplaces[mk],
+                               json.dumps({"orderId": oid, "marketplaceId": mk_ids[mk]})))
+            n_items = 1 if rnd.random() < 0.8 else rnd.randint(2, 4)
+            for k, idx in enumerate(cat.pick(rnd, n_items)):
+                qty = 1 if rnd.random() < 0.85 else rnd.randint(2, 5)
+                # price_amount wie Amazons ItemPrice: Positionssumme, nicht Stückpreis
+                out.row("order_items", (account_id, oid, f"{order_seq:09d}{k:02d}", cat.asin[idx], cat.sku[idx], qty,
+                                        round(cat.price[idx] * qty, 2), "EUR"))
+                if status == "Shipped":
+                    units_sold[idx] = units_sold.get(idx, 0) + qty
+                    if rnd.random() < RETURN_RATE:
+                        rdate = pdate + timedelta(days=rnd.randint(2, 30), seconds=rnd.randrange(86400))
+                        if rdate < window_to:
+                            out.row("fba_returns", (account_id, _ts(rdate), oid, cat.asin[idx], cat.sku[idx],
+                                                    rnd.choices(disp_vals, disp_w)[0], rnd.choice(RETURN_REASONS),
+                                                    1, rnd.choice(FCS)))
+
+        # Lagerereignisse proportional zu den bewegten Einheiten
+        for idx, units in units_sold.items():
+            for event_type, rate, reason in (("Lost", LOST_RATE, "Lost_Warehouse"),
+                                             ("Damaged", DAMAGED_RATE, "Damaged_Warehouse")):
+                n = sum(1 for _ in range(units) if rnd.random() < rate)
+                if not n:
+                    continue
+                a = agg.setdefault(idx, [0, 0, 0, 0, 0.0])
+                a[0 if event_type == "Lost" else 1] += n
+                edate = day + timedelta(seconds=rnd.randrange(86400))
+                fc = rnd.choice(FCS)
+                ref = f"{rnd.randrange(10**10):010d}"
+                out.row("inventory_ledger", (account_id, _ts(edate), event_type, cat.asin[idx], cat.sku[idx], fc, n, ref))
+                out.row("fba_inventory_adjustments", (account_id, _ts(edate), cat.asin[idx], cat.sku[idx], -n, reason, fc))
+
+                if event_type == "Lost" and rnd.random() < FOUND_SHARE:
+                    fdate = edate + timedelta(days=rnd.randint(1, 20))
+                    if fdate < window_to:
+                        a[2] += n
+                        out.row("inventory_ledger", (account_id, _ts(fdate), "Found", cat.asin[idx], cat.sku[idx], fc, n, ref))
+                        out.row("fba_inventory_adjustments", (account_id, _ts(fdate), cat.asin[idx], cat.sku[idx],
+                                                              n, "Found", fc))
+                        continue
+                if rnd.random() < REIMBURSED_SHARE:
+                    rdate = edate + timedelta(days=rnd.randint(5, 45))
+                    if rdate < window_to:
+                        amount = round(cat.price[idx] * n * rnd.uniform(0.7, 1.0), 2)
+                        case = f"{rnd.randrange(10**10):010d}"
+                        a[3] += n
+                        a[4] += amount
+                        out.row("reimbursements", (account_id, _ts(rdate), cat.asin[idx], cat.sku[idx], case,
+                                                   reason, n, amount))
+                        out.row("fba_reimbursements", (account_id, _ts(rdate), case, cat.asin[idx], cat.sku[idx],
+                                                       n, amount, "EUR", reason))
+
+        if rnd.random() < REMOVALS_PER_DAY:
+            idx = cat.pick(rnd)[0]
+            req = day + timedelta(seconds=rnd.randrange(86400))
+            shipped = req + timedelta(days=rnd.randint(3, 14))
+            received = shipped + timedelta(days=rnd.randint(2, 7))
+            order_type = rnd.choice(("Return", "Disposal"))
+            out.row("fba_removals", (account_id, f"RMV{account_id:03d}{d:05d}", order_type, "Completed",
+                                     _ts(req), _ts(shipped) if shipped < window_to else None,
+                                     _ts(received) if received < window_to and order_type == "Return" else None,
+                                     cat.asin[idx], cat.sku[idx], rnd.randint(1, 20), "Unsellable"))
+
+    for idx, (lost, damaged, found, r_units, r_amount) in agg.items():
+        open_units = lost + damaged - found - r_units
+        open_amount = round(max(0, open_units) * cat.price[idx], 2)
+        out.row("recon_results", (account_id, cat.asin[idx], cat.sku[idx], _ts(window_from), _ts(window_to),
+                                  lost, damaged, found, r_units, round(r_amount, 2), open_units, open_amount, "EUR"))
+
+def _worker(account_ids: List[int], marketplaces: Dict[int, List[str]], args) -> Dict[str, int]:
+    """Ein Prozess, eine Connection; Commit je Account."""
+    from app.core.config import get_settings
+    from app.db.engine import make_engine
+
+    engine = make_engine(get_settings().DATABASE_URL, name="synthdata", workload="batch")
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET synchronous_commit = off")
+        out = _CopyWriter(conn, args.flush_rows)
+        for account_id in account_ids:
+            t0 = time.perf_counter()
+            _generate_account(out, account_id, marketplaces[account_id], args)
+            out.flush()
+            conn.commit()
+            log.info("account %s done in %.1fs", account_id, time.perf_counter() - t0)
+        return out.written
+    finally:
+        conn.close()
+        engine.dispose()
+
+def _create_accounts(conn, args) -> Dict[int, List[str]]:
+    rnd = random.Random(args.seed)
+    codes = ["DE", "FR", "IT", "ES", "NL", "PL", "SE"]
+    result: Dict[int, List[str]] = {}
+    with conn.cursor() as cur:
+        for n in range(args.accounts):
+            mks = ["DE"] + rnd.sample(codes[1:], rnd.randint(0, 4))
+            cur.execute(
+                "INSERT INTO seller_accounts (name, region, marketplaces, refresh_token, is_active, created_at) "
+                "VALUES (%s, 'eu', %s, 'synthetic', true, now()) RETURNING id",
+                (f"{args.name_prefix}{n + 1:04d}", ",".join(mks)),
+            )
+            result[cur.fetchone()[0]] = mks
+    conn.commit()
+    return result
+
+def _create_users(conn, args) -> int:
+    """Lastnutzer anlegen bzw. Passwort zurücksetzen (ein bcrypt-Hash für alle)."""
+    from app.core.security import hash_password
+    pw_hash = hash_password(args.user_password)
+    with conn.cursor() as cur:
+        for n in range(args.users):
+            name = f"{args.user_prefix}{n + 1:02d}"
+            cur.execute(
+                "INSERT INTO users (email, username, password_hash, is_admin) VALUES (%s, %s, %s, false) "
+                "ON CONFLICT (email) DO UPDATE SET password_hash = EXCLUDED.password_hash",
+                (f"{name}@load.invalid", name, pw_hash),
+            )
+    conn.commit()
+    return args.users
+
+def main(argv: List[str] | None = None) -> None:
+    p = argparse.ArgumentParser(prog="python -m app.cli.synthdata", description=__doc__.splitlines()[0])
+    p.add_argument("--accounts", type=int, default=3)
+    p.add_argument("--skus", type=int, default=1000, help="SKUs je Account")
+    p.add_argument("--days", type=int, default=90)
+    p.add_argument("--orders-per-day", type=int, default=200, help="mittlere Orders je Account und Tag")
+    p.add_argument("--end", type=lambda s: datetime.fromisoformat(s), default=datetime.utcnow(),
+                   help="Ende des Zeitraums (ISO-Datum), Default: heute")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--jobs", type=int, default=1, help="parallele Prozesse (je eine Connection)")
+    p.add_argument("--flush-rows", type=int, default=50_000, help="Zeilen je COPY-Block")
+    p.add_argument("--name-prefix", default="synth-")
+    p.add_argument("--truncate", action="store_true", help="alle Zieltabellen vorher leeren (RESTART IDENTITY)")
+    p.add_argument("--create-tables", action="store_true", help="fehlende Tabellen aus den Models anlegen")
+    p.add_argument("--users", type=int, default=0, help="Login-Nutzer für den Lasttest anlegen")
+    p.add_argument("--user-prefix", default="load")
+    p.add_argument("--user-password", default="load")
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
+
+    from sqlalchemy.orm import Session
+
+    from app import cache_bus, catalog, models, valuation
+    from app.core.config import get_settings
+    from app.db.engine import make_engine
+
+    engine = make_engine(get_settings().DATABASE_URL, name="synthdata", workload="batch")
+    if args.create_tables:
+        models.Base.metadata.create_all(
+            bind=engine, tables=[models.Base.metadata.tables[t] for t in TABLES]
+            + [models.CatalogItem.__table__, models.SkuValuation.__table__])
+    conn = engine.raw_connection()
+    try:
+        if args.truncate:
+            with conn.cursor() as cur:
+                cur.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+        accounts = _create_accounts(conn, args)
+        if args.users:
+            log.info("users: %d (%s01.., password from --user-password)", _create_users(conn, args), args.user_prefix)
+    finally:
+        conn.close()
+        engine.dispose()
+
+    t0 = time.perf_counter()
+    ids = list(accounts)
+    jobs = max(1, min(args.jobs, len(ids)))
+    chunks = [ids[i::jobs] for i in range(jobs)]
+    totals: Dict[str, int] = dict.fromkeys(COLUMNS, 0)
+    if jobs == 1:
+        results = [_worker(ids, accounts, args)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            results = list(ex.map(_worker, chunks, [accounts] * jobs, [args] * jobs))
+    for r in results:
+        for t, n in r.items():
+            totals[t] += n
+
+    elapsed = time.perf_counter() - t0
+    rows = sum(totals.values())
+    for t, n in totals.items():
+        log.info("%-26s %12d", t, n)
+    log.info("%d rows in %.1fs (%.0f rows/s)", rows, elapsed, rows / elapsed if elapsed else 0)
+
+    # COPY umgeht den Ingest-Pfad: Katalog-IDs nachtragen, Bewertungsindex einmal komplett aufbauen
+    with Session(engine) as db:
+        log.info("catalog_id assigned: %d rows", catalog.backfill(db))
+        log.info("sku_valuations: %d rows", valuation.rebuild(db))
+
+    # Planner-Statistiken sofort aktualisieren, sonst sind die ersten Benchmarks verfälscht
+    with engine.connect() as c:
+        c.exec_driver_sql(f"ANALYZE {', '.join(TABLES)}, catalog_items, sku_valuations")
+        c.commit()
+    # COPY/TRUNCATE an der Anwendung vorbei: laufende Worker verwerfen ihre Caches
+    cache_bus.publish("reset", bind=engine)
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,122 @@ from pydantic import Field
 
 class Settings(BaseSettings):
     DATABASE_URL: str = Field(..., alias="DATABASE_URL")
+    # Optional: eigene URL für den Async-Treiber; sonst aus DATABASE_URL abgeleitet
+    ASYNC_DATABASE_URL: str | None = None
     SECRET_KEY: str = Field(..., alias="SESSION_SECRET")
+
+    # DB-Pool (eine Engine je Treiber, siehe app/db/engine.py)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    # PgBouncer im Transaction-Mode: NullPool, keine Prepared Statements
+    DB_PGBOUNCER: bool = False
+    # Statement-Timeouts je Workload (0 = aus); DB_WORKLOAD gilt für die Prozess-Engine
+    DB_WORKLOAD: str = "web"
+    DB_STATEMENT_TIMEOUT_WEB_MS: int = 15_000
+    DB_STATEMENT_TIMEOUT_BATCH_MS: int = 0
+    # Optionale Lese-Replika (app/db/replica.py): nur für ausdrücklich lesende Pfade
+    DATABASE_REPLICA_URL: str | None = None
+    REPLICA_MAX_LAG_S: float = 10.0     # darüber liest alles vom Primary
+    REPLICA_LAG_CHECK_S: float = 2.0    # Lag-Messung so lange gecacht
+    READ_YOUR_WRITES_S: float = 30.0    # nach eigenem Write liest der Account so lange vom Primary
+
+    # Optionaler Bearer-Token für GET /metrics
+    METRICS_TOKEN: str | None = None
+
+    # Request-Profiling (app/core/profiling.py)
+    PROFILE_SLOW_MS: int = 1000
+    PROFILE_N_PLUS_ONE: int = 10
+    PROFILE_ALLOW: bool = False
     SESSION_COOKIE_NAME: str = "session"
 
+    # Passwort-Hashing: Ziel-Kosten (bcrypt rounds) + begrenzter Worker-Pool
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE: int = 32
+    # Login-Throttling je Identifier (E-Mail/Username)
+    LOGIN_MAX_ATTEMPTS: int = 10
+    LOGIN_ATTEMPT_WINDOW_S: int = 300
+
+    # SP-API-Client: Timeouts je Phase (Sekunden), ein Connection-Pool je Prozess
+    SP_API_CONNECT_TIMEOUT_S: float = 3.05
+    SP_API_READ_TIMEOUT_S: float = 30.0
+    SP_API_POOL_TIMEOUT_S: float = 5.0
+    SP_API_MAX_CONNECTIONS: int = 20
+    SP_API_THROTTLE_RETRIES: int = 4    # 429: erneut nach 1, 2, 4, 8 s
+    # Circuit-Breaker je (Region, Operation) (app/circuit.py)
+    CIRCUIT_FAILURES: int = 5           # Fehler in Folge bis "open"
+    CIRCUIT_OPEN_S: float = 30.0        # so lange sofort abweisen, dann ein Probe-Request
+
+    # Reports: vorhandene DONE-Reports (getReports) wiederverwenden statt neu zu erzeugen
+    REPORT_REUSE: bool = True
+    REPORT_REUSE_SLACK_H: int = 24      # max. Lücke je Rand; der Rand wird als eigener Report nachgeholt
+    REPORT_REUSE_MAX_AGE_H: int = 72    # nur Reports, die höchstens so alt sind
+    REPORT_SCHEDULE_PERIOD: str = "P1D"
+
+    # Report-Fertigmeldungen (REPORT_PROCESSING_FINISHED) statt 5-s-Polling
+    REPORT_NOTIFICATIONS: bool = False
+    REPORT_POLL_FALLBACK_S: int = 60    # getReport nur noch als Sicherheitsnetz
+    REPORT_EVENT_CHECK_S: float = 1.0   # DB-Check auf Events anderer Prozesse
+    NOTIFICATIONS_TOKEN: str | None = None            # Bearer für POST /api/notifications/sp-api
+    NOTIFICATIONS_DESTINATION_ID: str | None = None   # SP-API-Destination (SQS/EventBridge)
+    NOTIFICATIONS_SQS_URL: str | None = None
+    NOTIFICATIONS_DIR: str | None = None              # lokaler Stand-in: *.json-Dateien
+
+    # Polling-Plan aus der Laufzeit-Historie (sp_report_timings)
+    REPORT_POLL_MIN_S: float = 2.0
+    REPORT_POLL_MAX_S: float = 120.0
+    REPORT_TIMEOUT_MIN_S: int = 360
+    REPORT_TIMEOUT_MAX_S: int = 4 * 3600
+    REPORT_ETA_HISTORY: int = 50        # letzte N Läufe je Scope
+
+    # Inkrementelle Report-Pulls (app/watermarks.py): Overlap je Report-Typ in Stunden (JSON-Override
+    # z.B. '{"GET_FBA_REIMBURSEMENTS_DATA": 120}'); ohne Wasserzeichen bzw. bei größerer Lücke Catch-up
+    REPORT_WATERMARK_OVERLAP_H: dict[str, float] = {}
+    REPORT_CATCHUP_DAYS: int = 30
+    # Große Report-Dokumente (app/report_parse.py): 0/1 = wie bisher im Speicher parsen; >1 = Prozesse
+    # für TSV-Dokumente ab REPORT_PARSE_PARALLEL_MIN_MB (entpackt), Bereiche à REPORT_PARSE_CHUNK_MB
+    REPORT_PARSE_WORKERS: int = 0
+    REPORT_PARSE_PARALLEL_MIN_MB: int = 64
+    REPORT_PARSE_CHUNK_MB: int = 16
+    REPORT_PARSE_BATCH_ROWS: int = 50_000   # Zeilen je store_report_rows-Aufruf (sequentieller Pfad)
+
+    # Orders: 'api' (getOrders + getOrderItems je Order), 'report' (Flatfile-Report), 'auto' = Report ab
+    # ORDER_REPORT_MIN_DAYS Fensterlänge (auch der 7-Tage-Sync); je Account übersteuerbar (seller_accounts.order_source)
+    ORDER_SOURCE: str = "api"
+    ORDER_REPORT_MIN_DAYS: int = 3
+    ORDER_REPORT_MAX_DAYS: int = 30     # Amazon-Limit je Orders-Report
+
+    # Backfill (app/backfill.py): parallele Chunks, Wiederholungen je Chunk
+    BACKFILL_WORKERS: int = 4
+    BACKFILL_MAX_ATTEMPTS: int = 3
+
+    # Bewertung offener Recon-Fälle (app/valuation.py): rollierendes Fenster in Monaten
+    SKU_VALUATION_MONTHS: int = 12
+
+    # Analytik: Parquet-Export + DuckDB (app/analytics.py)
+    ANALYTICS_DIR: str = "/app/data/analytics"
+    ANALYTICS_THREADS: int = 4
+    ANALYTICS_FULL_SCAN_H: float = 24.0  # voller Fingerprint-Abgleich (Löschungen); dazwischen nur seit der Marke berührte Partitionen
+
+    # Dashboard (/ui): Fragment-Cache je (Fragment, Account, Datenversion), vorkompilierte Templates
+    UI_FRAGMENT_TTL_S: float = 60.0     # 0 = aus; Writes anderer Prozesse kommen über den Cache-Bus
+    UI_FRAGMENT_CACHE_MAX: int = 500
+    UI_RECENT_ORDERS: int = 20
+    UI_TEMPLATE_RELOAD: bool = False    # True: Templates bei Änderung neu laden (Entwicklung)
+    UI_TEMPLATE_CACHE_DIR: str | None = None   # Jinja-Bytecode-Cache über Neustarts hinweg
+
+    # Cache-Invalidierung zwischen Prozessen über LISTEN/NOTIFY (app/cache_bus.py)
+    CACHE_BUS_ENABLED: bool = True
+    CACHE_BUS_CHANNEL: str = "seller_cache"
+    CACHE_BUS_LISTEN_URL: str | None = None   # direkt auf Postgres: PgBouncer im Transaction-Mode kann kein LISTEN
+
+    # Warm-up nach dem Start (im Hintergrund, blockiert die Bereitschaft nicht)
+    STARTUP_PREWARM: bool = True
+    PREWARM_LWA_TOKENS: bool = False
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -17,6 +130,14 @@ class Settings(BaseSettings):
     def SESSION_SECRET(self) -> str:
         return self.SECRET_KEY
 
+    @property
+    def async_database_url(self) -> str:
+        """DATABASE_URL mit asyncpg-Treiber (postgresql+psycopg2:// -> postgresql+asyncpg://)."""
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        scheme, sep, rest = self.DATABASE_URL.partition("://")
+        return f"postgresql+asyncpg{sep}{rest}" if scheme.startswith("postgres") else self.DATABASE_URL
+
 _settings: Settings | None = None
 def get_settings() -> Settings:
     global _settings
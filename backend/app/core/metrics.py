@@ -0,0 +1,93 @@
+"""Prometheus-Metriken (Export über GET /metrics)."""
+import weakref
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+# --- DB-Pool ---
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Wartezeit auf eine Pool-Connection",
+    ["pool"], buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts, die am pool_timeout gescheitert sind", ["pool"],
+)
+
+_pools: "weakref.WeakValueDictionary[str, object]" = weakref.WeakValueDictionary()
+
+def register_pool(name: str, engine) -> None:
+    _pools[name] = engine
+
+class _PoolCollector:
+    """Liest Pool-Auslastung erst beim Scrape (kein Overhead im Request-Pfad)."""
+
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "Konfigurierte Pool-Größe", labels=["pool"])
+        out = GaugeMetricFamily("db_pool_checked_out", "Aktuell ausgeliehene Connections", labels=["pool"])
+        idle = GaugeMetricFamily("db_pool_idle", "Connections im Pool (idle)", labels=["pool"])
+        over = GaugeMetricFamily("db_pool_overflow", "Overflow-Connections (über pool_size)", labels=["pool"])
+        for name, engine in list(_pools.items()):
+            pool = engine.pool
+            if not hasattr(pool, "checkedout"):
+                continue  # NullPool (PgBouncer-Mode)
+            size.add_metric([name], pool.size())
+            out.add_metric([name], pool.checkedout())
+            idle.add_metric([name], pool.checkedin())
+            over.add_metric([name], max(0, pool.overflow()))
+        yield from (size, out, idle, over)
+
+REGISTRY.register(_PoolCollector())
+
+# --- Lese-Replika ---
+DB_REPLICA_LAG = Gauge("db_replica_lag_seconds", "Zuletzt gemessener Replika-Lag (-1 = nicht erreichbar)")
+DB_READ_ROUTING = Counter(
+    "db_read_routing_total", "Ziel lesender Transaktionen (replica/primary) und Grund", ["target", "reason"],
+)
+
+# --- SP-API ---
+SP_API_LATENCY = Histogram(
+    "sp_api_request_seconds", "Latenz der SP-API-Calls", ["operation", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+)
+SP_API_THROTTLED = Counter("sp_api_throttled_total", "SP-API-Antworten mit 429", ["operation"])
+LWA_REFRESHES = Counter("sp_api_lwa_refresh_total", "LWA Access-Token-Refreshes", ["result"])
+SP_API_CIRCUIT_STATE = Gauge(
+    "sp_api_circuit_state", "Circuit-Breaker je Region/Operation (0=closed, 1=half_open, 2=open)", ["region", "operation"],
+)
+SP_API_CIRCUIT_REJECTED = Counter(
+    "sp_api_circuit_rejected_total", "Wegen offenem Circuit sofort abgewiesene Calls", ["region", "operation"],
+)
+
+# --- Reports / Ingestion ---
+_WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 3600)
+REPORT_QUEUE_WAIT = Histogram(
+    "sp_report_queue_seconds", "createdTime -> processingStartTime", ["report_type"], buckets=_WAIT_BUCKETS,
+)
+REPORT_PROCESSING = Histogram(
+    "sp_report_processing_seconds", "processingStartTime -> processingEndTime", ["report_type"], buckets=_WAIT_BUCKETS,
+)
+REPORT_DOC_BYTES = Counter("sp_report_document_bytes_total", "Heruntergeladene Report-Bytes (komprimiert)", ["report_type"])
+REPORT_ROWS_PARSED = Counter("sp_report_rows_parsed_total", "Geparste Report-Zeilen", ["report_type"])
+REPORT_SOURCE = Counter(
+    "sp_report_source_total", "Herkunft der Report-Dokumente (reused/created/skipped)", ["report_type", "source"],
+)
+REPORT_EVENTS = Counter("sp_report_events_total", "Empfangene REPORT_PROCESSING_FINISHED-Notifications", ["status"])
+REPORT_COMPLETION = Counter(
+    "sp_report_completion_total", "Wie ein Report als fertig erkannt wurde (event/poll)", ["report_type", "via"],
+)
+REPORT_STATUS_CHECKS = Counter("sp_report_status_checks_total", "getReport-Aufrufe beim Warten auf DONE", ["report_type"])
+UI_FRAGMENT_CACHE = Counter("ui_fragment_cache_total", "Dashboard-Fragmente aus dem Cache bzw. neu gerendert",
+                            ["fragment", "result"])
+CACHE_BUS_EVENTS = Counter("cache_bus_events_total", "Cache-Invalidierungen über LISTEN/NOTIFY",
+                           ["kind", "direction"])
+CACHE_BUS_LISTENING = Gauge("cache_bus_listening", "1 = Listener-Verbindung für Cache-Invalidierungen steht")
+INGEST_ROWS_WRITTEN = Counter("ingest_rows_written_total", "Geschriebene Zeilen je Quelle", ["report_type"])
+
+# --- Recon / DB ---
+RECON_DURATION = Histogram(
+    "recon_duration_seconds", "Laufzeit reconcile_account", buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300),
+)
+DB_SESSION_SECONDS = Histogram(
+    "db_session_seconds", "Lebensdauer einer DB-Session je Request", ["kind"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 120),
+)
@@ -0,0 +1,136 @@
+"""Per-Request-Profiling als reine ASGI-Middleware.
+
+Misst Wall-Time, Anzahl/Zeit der SQL-Statements (SQLAlchemy-Engine-Events) und
+SP-API-Calls je Request. Langsame Requests werden geloggt, mehrfach identische
+Statements (N+1) gewarnt. Mit ``X-Profile: 1`` bzw. ``?_profile=1`` liefert der
+Request statt seiner Antwort ein pyinstrument-Profil (nur Admins, PROFILE_ALLOW=1).
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+
+log = logging.getLogger("app.profiling")
+
+class RequestStats:
+    __slots__ = ("sql_count", "sql_time", "sp_api_calls", "statements")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.sp_api_calls = 0
+        self.statements: Counter = Counter()
+
+# Mutables Objekt im ContextVar: Threadpool (sync-Handler) und Greenlets (asyncpg)
+# erben den Context, Zähler landen also beim richtigen Request.
+_current: ContextVar[RequestStats | None] = ContextVar("sc_request_stats", default=None)
+
+def current_stats() -> RequestStats | None:
+    return _current.get()
+
+def count_sp_api_call() -> None:
+    st = _current.get()
+    if st is not None:
+        st.sp_api_calls += 1
+
+# Startzeit am Execution-Context statt als Stack in conn.info: fehlgeschlagene Statements
+# (kein after_cursor_execute) hinterlassen nichts auf der Connection im Pool
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._sc_t0 = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    st = _current.get()
+    t0 = getattr(context, "_sc_t0", None)
+    if st is None or t0 is None:
+        return
+    context._sc_t0 = None
+    st.sql_count += 1
+    st.sql_time += time.perf_counter() - t0
+    st.statements[statement] += 1
+
+class ProfilingMiddleware:
+    """Muss innerhalb der SessionMiddleware liegen (scope["session"] für den Admin-Check)."""
+
+    def __init__(self, app):
+        self.app = app
+        s = get_settings()
+        self.slow_s = s.PROFILE_SLOW_MS / 1000
+        self.n_plus_one = s.PROFILE_N_PLUS_ONE
+        self.allow_profile = s.PROFILE_ALLOW
+
+    def _wants_profile(self, scope) -> bool:
+        if not self.allow_profile or not (scope.get("session") or {}).get("is_admin"):
+            return False
+        headers = dict(scope.get("headers") or [])
+        return headers.get(b"x-profile") == b"1" or b"_profile=1" in (scope.get("query_string") or b"")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        t0 = time.perf_counter()
+        status = [0]
+        streaming = [False]
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                # SSE-Streams laufen bewusst lange – nicht als langsame Requests melden
+                streaming[0] = any(k == b"content-type" and v.startswith(b"text/event-stream")
+                                   for k, v in message.get("headers", []))
+                timing = (f"app;dur={(time.perf_counter() - t0) * 1000:.1f}, "
+                          f"db;dur={stats.sql_time * 1000:.1f};desc=\"{stats.sql_count} queries\"")
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            if self._wants_profile(scope):
+                await self._profiled(scope, receive, send)
+            else:
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if not streaming[0]:
+                self._report(scope, stats, time.perf_counter() - t0, status[0])
+
+    async def _profiled(self, scope, receive, send):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            log.warning("profile requested but pyinstrument is not installed")
+            return await self.app(scope, receive, send)
+
+        async def discard(message):
+            pass  # Original-Antwort verwerfen, stattdessen Profil ausliefern
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+        body = profiler.output_html().encode()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/html; charset=utf-8"),
+                                (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    def _report(self, scope, stats: RequestStats, wall: float, status: int) -> None:
+        path = f'{scope.get("method", "")} {scope.get("path", "")}'
+        if wall >= self.slow_s:
+            log.warning("slow request %s status=%s %.0fms sql=%d/%.0fms sp_api=%d",
+                        path, status, wall * 1000, stats.sql_count, stats.sql_time * 1000, stats.sp_api_calls)
+        if stats.statements:
+            stmt, n = stats.statements.most_common(1)[0]
+            if n >= self.n_plus_one:
+                log.warning("possible N+1 in %s: statement ran %dx: %s", path, n, " ".join(stmt.split())[:300])
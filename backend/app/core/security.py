@@ -1,12 +1,117 @@
-from passlib.context import CryptContext
+"""Passwort-Hashing (einzige Stelle im Projekt).
 
-_pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+bcrypt ist absichtlich teuer – deshalb laufen Verifikationen aus async-Handlern
+über einen kleinen, begrenzten Thread-Pool statt auf dem Event-Loop.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from app.core.config import get_settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+_pwd: "CryptContext | None" = None
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+_inflight = 0
+
+class HashingBusy(RuntimeError):
+    """Warteschlange des Hash-Pools ist voll."""
+
+def _context() -> "CryptContext":
+    global _pwd
+    if _pwd is None:
+        from passlib.context import CryptContext
+        rounds = get_settings().PASSWORD_BCRYPT_ROUNDS
+        # min == max == default: Hashes mit anderen Kosten gelten als veraltet -> Rehash beim Login
+        _pwd = CryptContext(
+            schemes=["bcrypt"], deprecated="auto",
+            bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds,
+        )
+    return _pwd
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, get_settings().PASSWORD_HASH_WORKERS),
+                thread_name_prefix="pwhash",
+            )
+        return _executor
 
 def hash_password(raw: str) -> str:
-    return _pwd.hash(raw)
+    return _context().hash(raw)
 
 def verify_password(raw: str, hashed: str) -> bool:
     try:
-        return _pwd.verify(raw, hashed)
+        return _context().verify(raw, hashed)
     except Exception:
         return False
+
+def verify_and_update(raw: str, hashed: str) -> tuple[bool, str | None]:
+    """(ok, neuer_hash) – neuer_hash ist gesetzt, wenn der alte Hash nicht den konfigurierten Kosten entspricht."""
+    try:
+        return _context().verify_and_update(raw, hashed)
+    except Exception:
+        return False, None
+
+async def verify_password_async(raw: str, hashed: str) -> tuple[bool, str | None]:
+    """verify_and_update im Hash-Pool; wirft HashingBusy, wenn Pool + Queue voll sind."""
+    global _inflight
+    s = get_settings()
+    if _inflight >= s.PASSWORD_HASH_WORKERS + s.PASSWORD_HASH_QUEUE:
+        raise HashingBusy("password hashing queue full")
+    _inflight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_pool(), verify_and_update, raw, hashed)
+    finally:
+        _inflight -= 1
+
+class LoginThrottle:
+    """Sliding-Window-Limit für Login-Versuche je Identifier (pro Prozess)."""
+
+    def __init__(self, max_attempts: int, window_s: int, max_keys: int = 10_000):
+        self.max_attempts = max_attempts
+        self.window_s = window_s
+        self.max_keys = max_keys
+        self._hits: dict[str, deque] = {}
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_s
+        for key in [k for k, q in self._hits.items() if not q or q[-1] < cutoff]:
+            del self._hits[key]
+
+    def hit(self, key: str) -> float:
+        """Versuch zählen. Rückgabe: 0 wenn erlaubt, sonst Sekunden bis zum nächsten Versuch."""
+        now = time.monotonic()
+        key = key.strip().lower()
+        q = self._hits.get(key)
+        if q is None:
+            if len(self._hits) >= self.max_keys:
+                self._prune(now)
+            q = self._hits[key] = deque()
+        while q and q[0] < now - self.window_s:
+            q.popleft()
+        if len(q) >= self.max_attempts:
+            return max(1.0, q[0] + self.window_s - now)
+        q.append(now)
+        return 0.0
+
+    def reset(self, key: str) -> None:
+        self._hits.pop(key.strip().lower(), None)
+
+_throttle: LoginThrottle | None = None
+
+def login_throttle() -> LoginThrottle:
+    global _throttle
+    if _throttle is None:
+        s = get_settings()
+        _throttle = LoginThrottle(s.LOGIN_MAX_ATTEMPTS, s.LOGIN_ATTEMPT_WINDOW_S)
+    return _throttle
@@ -0,0 +1,83 @@
+"""Hintergrund-Warm-up nach dem Start: DB-Pools füllen, Hashing-Kontext und Templates laden, optional LWA-Tokens.
+
+Läuft als Task im Lifespan – der Worker nimmt sofort Requests an; Fehler werden nur geloggt.
+"""
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+
+from sqlalchemy import select, text
+
+from app.core.config import get_settings
+
+log = logging.getLogger("app.warmup")
+
+def _warm_sync_pool() -> int:
+    from app.db.session import engine
+    n = getattr(engine.pool, "size", lambda: 0)()
+    conns = []
+    try:
+        for _ in range(n):
+            c = engine.connect()
+            c.execute(text("SELECT 1"))
+            conns.append(c)
+    finally:
+        for c in conns:
+            c.close()
+    return len(conns)
+
+async def _warm_async_pool() -> int:
+    from app.db.session import get_async_engine
+    async_engine = get_async_engine()
+    n = getattr(async_engine.pool, "size", lambda: 0)()
+    # Alle gleichzeitig halten, sonst landet immer dieselbe Connection wieder im Pool
+    async with AsyncExitStack() as stack:
+        conns = await asyncio.gather(*(stack.enter_async_context(async_engine.connect()) for _ in range(n)))
+        for c in conns:
+            await c.execute(text("SELECT 1"))
+    return n
+
+def _warm_lwa_tokens() -> int:
+    from app import models
+    from app.db.session import SessionLocal
+    from app.sp_api import _get_lwa_access_token
+
+    with SessionLocal() as db:
+        accounts = db.execute(
+            select(models.SellerAccount.id, models.SellerAccount.refresh_token)
+            .where(models.SellerAccount.is_active.is_(True))
+        ).all()
+    ok = 0
+    for account_id, rtok in accounts:
+        try:
+            _get_lwa_access_token(account_id, rtok)
+            ok += 1
+        except Exception as e:
+            log.warning("LWA warm-up for account %s failed: %s", account_id, e)
+    return ok
+
+def _warm_templates() -> int:
+    from app.api.routers import ui
+    return ui.precompile()
+
+def _warm_hashing() -> None:
+    from app.core import security
+    security._context().hash("warm-up")  # lädt das bcrypt-Backend
+
+async def run() -> None:
+    s = get_settings()
+    t0 = time.perf_counter()
+    steps = [("sync pool", asyncio.to_thread(_warm_sync_pool)),
+             ("async pool", _warm_async_pool()),
+             ("hashing", asyncio.to_thread(_warm_hashing)),
+             ("templates", asyncio.to_thread(_warm_templates))]
+    if s.PREWARM_LWA_TOKENS:
+        steps.append(("lwa tokens", asyncio.to_thread(_warm_lwa_tokens)))
+    results = await asyncio.gather(*(c for _, c in steps), return_exceptions=True)
+    for (name, _), res in zip(steps, results):
+        if isinstance(res, BaseException):
+            log.warning("warm-up %s failed: %s", name, res)
+        else:
+            log.info("warm-up %s: %s", name, res)
+    log.info("warm-up done in %.0fms", (time.perf_counter() - t0) * 1000)
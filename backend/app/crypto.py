@@ -1,22 +1,26 @@
-from cryptography.fernet import Fernet, InvalidToken
+from functools import lru_cache
 import os
 
-_key = os.getenv("SECRET_KEY")
-if not _key:
-    raise RuntimeError("SECRET_KEY is missing in environment")
-
-try:
-    fernet = Fernet(_key.encode())
-except Exception as e:
-    raise RuntimeError(
-        "SECRET_KEY must be a Fernet key (32 bytes urlsafe-base64)."
-    ) from e
+@lru_cache(maxsize=1)
+def _fernet():
+    # Erst beim ersten Ver-/Entschlüsseln laden und prüfen – der Import bleibt frei von Seiteneffekten
+    from cryptography.fernet import Fernet
+    key = os.getenv("SECRET_KEY")
+    if not key:
+        raise RuntimeError("SECRET_KEY is missing in environment")
+    try:
+        return Fernet(key.encode())
+    except Exception as e:
+        raise RuntimeError(
+            "SECRET_KEY must be a Fernet key (32 bytes urlsafe-base64)."
+        ) from e
 
 def encrypt(text: str) -> str:
-    return fernet.encrypt(text.encode()).decode()
+    return _fernet().encrypt(text.encode()).decode()
 
 def decrypt(token: str) -> str:
+    from cryptography.fernet import InvalidToken
     try:
-        return fernet.decrypt(token.encode()).decode()
+        return _fernet().decrypt(token.encode()).decode()
     except InvalidToken:
         raise RuntimeError("Invalid SECRET_KEY or token")
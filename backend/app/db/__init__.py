@@ -1 +1,8 @@
 from .base import Base
+
+def __getattr__(name):
+    # Backward-Compat für die frühere app/db.py (from app.db import SessionLocal, get_db, engine)
+    if name in ("engine", "SessionLocal", "get_db"):
+        from . import session
+        return getattr(session, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,7 @@
 from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 
 from app.db.models import User
 
@@ -19,3 +20,30 @@ def create(db: Session, email: str, username: str, password_hash: str, is_admin:
 def get_by_login(db: Session, login: str) -> Optional[User]:
     """Backward-Compat: wird vom Auth-Router importiert."""
     return get_by_email_or_username(db, login)
+
+# --- Async-Varianten (AsyncSession, für async def-Handler) ---
+
+async def get_by_email_or_username_async(db: AsyncSession, identifier: str) -> Optional[User]:
+    """Wie get_by_email_or_username, aber ohne den Event-Loop zu blockieren."""
+    res = await db.execute(
+        select(User).where(or_(User.email == identifier, User.username == identifier)).limit(1)
+    )
+    return res.scalars().first()
+
+async def get_by_id_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    return await db.get(User, user_id)
+
+async def create_async(db: AsyncSession, email: str, username: str, password_hash: str, is_admin: bool = False) -> int:
+    user = User(email=email, username=username, password_hash=password_hash, is_admin=is_admin)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user.id
+
+async def get_by_login_async(db: AsyncSession, login: str) -> Optional[User]:
+    return await get_by_email_or_username_async(db, login)
+
+async def update_password_hash_async(db: AsyncSession, user: User, password_hash: str) -> None:
+    """Rehash-on-Login: neuen Hash (aktuelle bcrypt-Kosten) speichern."""
+    user.password_hash = password_hash
+    await db.commit()
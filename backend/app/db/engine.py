@@ -0,0 +1,86 @@
+"""Engine-Factory: einziger Ort, an dem Engines/Pools gebaut werden.
+
+Pool-Größen, Recycle, Pre-Ping und Statement-Timeouts kommen aus den Settings.
+Mit DB_PGBOUNCER=1 läuft alles über NullPool (PgBouncer im Transaction-Mode
+poolt selbst); Prepared Statements werden dann abgeschaltet und Timeouts per
+SET LOCAL statt über Startup-Parameter gesetzt.
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import get_settings
+from app.core import metrics
+
+WORKLOADS = ("web", "batch")
+
+def statement_timeout_ms(workload: str) -> int:
+    s = get_settings()
+    if workload not in WORKLOADS:
+        raise ValueError(f"unknown workload {workload!r} (expected one of {WORKLOADS})")
+    return s.DB_STATEMENT_TIMEOUT_BATCH_MS if workload == "batch" else s.DB_STATEMENT_TIMEOUT_WEB_MS
+
+def _timed_pool(base: type, name: str) -> type:
+    """Pool-Klasse, die die Wartezeit beim Checkout misst (bleibt über pool.recreate() erhalten)."""
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = base._do_get(self)
+        except Exception:
+            metrics.DB_POOL_CHECKOUT_TIMEOUTS.labels(name).inc()
+            raise
+        metrics.DB_POOL_CHECKOUT_WAIT.labels(name).observe(time.perf_counter() - t0)
+        return conn
+    # __module__ der Basis: Pool-Logger bleibt unter "sqlalchemy.pool" (nicht "app.*")
+    return type(f"Timed{base.__name__}_{name}", (base,), {"_do_get": _do_get, "__module__": base.__module__})
+
+def _set_local_timeout(engine: Engine, ms: int) -> None:
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(ms)}")
+
+def engine_kwargs(name: str, *, is_async: bool = False, workload: str = "web") -> dict:
+    s = get_settings()
+    ms = statement_timeout_ms(workload)
+    kw: dict = {}
+    connect_args: dict = {}
+    if s.DB_PGBOUNCER:
+        kw["poolclass"] = NullPool
+        if is_async:
+            # asyncpg: Prepared-Statement-Caches vertragen sich nicht mit Transaction-Pooling
+            connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+    else:
+        kw.update(
+            poolclass=_timed_pool(AsyncAdaptedQueuePool if is_async else QueuePool, name),
+            pool_size=s.DB_POOL_SIZE,
+            max_overflow=s.DB_MAX_OVERFLOW,
+            pool_timeout=s.DB_POOL_TIMEOUT,
+            pool_recycle=s.DB_POOL_RECYCLE,
+            pool_pre_ping=s.DB_POOL_PRE_PING,
+        )
+        if ms:
+            if is_async:
+                connect_args["server_settings"] = {"statement_timeout": str(ms)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={ms}"
+    if connect_args:
+        kw["connect_args"] = connect_args
+    return kw
+
+def make_engine(url: str, name: str = "web", workload: str = "web") -> Engine:
+    from sqlalchemy import create_engine
+    engine = create_engine(url, future=True, **engine_kwargs(name, workload=workload))
+    if get_settings().DB_PGBOUNCER and statement_timeout_ms(workload):
+        _set_local_timeout(engine, statement_timeout_ms(workload))
+    metrics.register_pool(name, engine)
+    return engine
+
+def make_async_engine(url: str, name: str = "async", workload: str = "web"):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    engine = create_async_engine(url, **engine_kwargs(name, is_async=True, workload=workload))
+    if get_settings().DB_PGBOUNCER and statement_timeout_ms(workload):
+        _set_local_timeout(engine.sync_engine, statement_timeout_ms(workload))
+    metrics.register_pool(name, engine.sync_engine)
+    return engine
@@ -0,0 +1,132 @@
+"""Lese-Replika: Routing-Session für reine Lesepfade (Dashboard, Listen, Export).
+
+    db = read_session(account_id)   # app/db/session.py; Web: Depends(get_read_db)
+
+RoutingSession entscheidet je Statement: SELECTs gehen an die Replika, alles andere
+(Flush, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, DDL, Text-SQL außer SELECT) an
+den Primary. Hat eine Transaktion einmal geschrieben, bleibt sie bis zum Commit/Rollback
+auf dem Primary – sie soll ihre eigenen Änderungen lesen.
+
+Die Replika wird nur genutzt, wenn sie erreichbar ist und ihr Lag unter
+REPLICA_MAX_LAG_S liegt (Messung gecacht, REPLICA_LAG_CHECK_S). Read-your-writes:
+nach note_write(account_id) liest dieser Account READ_YOUR_WRITES_S (+ aktueller Lag)
+lang vom Primary. note_write() geht über den Cache-Bus (app/cache_bus.py), das gilt
+damit auch für Writes anderer Prozesse (Worker, CLI), sobald deren NOTIFY ankommt.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.selectable import Select
+
+from app import cache_bus
+from app.core import metrics
+from app.core.config import get_settings
+
+log = logging.getLogger(__name__)
+
+_LAG_SQL = text("""
+SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END
+""")
+_READ_SQL = re.compile(r"^\s*select\b", re.I)
+
+# ---------- Lag ----------
+
+_lag_lock = threading.Lock()
+_lag: Tuple[float, Optional[float]] = (0.0, None)   # (gemessen um, Lag in s | None = nicht erreichbar)
+
+def replica_lag(replica: Engine) -> Optional[float]:
+    """Lag der Replika in Sekunden (gecacht); None, wenn sie nicht erreichbar ist."""
+    global _lag
+    checked, lag = _lag
+    if time.monotonic() - checked < get_settings().REPLICA_LAG_CHECK_S:
+        return lag
+    with _lag_lock:
+        checked, lag = _lag
+        if time.monotonic() - checked < get_settings().REPLICA_LAG_CHECK_S:
+            return lag  # anderer Thread hat inzwischen gemessen
+        try:
+            with replica.connect() as conn:
+                lag = float(conn.execute(_LAG_SQL).scalar())
+        except Exception as e:
+            log.warning("[replica] lag check failed: %s", e)
+            lag = None
+        _lag = (time.monotonic(), lag)
+    metrics.DB_REPLICA_LAG.set(-1 if lag is None else lag)
+    return lag
+
+# ---------- Read-your-writes ----------
+
+_writes: Dict[Optional[int], float] = {}   # account_id (None = Account-Liste) -> letzter Write
+
+def note_write(account_id: Optional[int] = None, table: Optional[str] = None) -> None:
+    """Account hat gerade (committet) geschrieben – Leser kurz auf den Primary, Caches invalidieren."""
+    cache_bus.publish("data", account_id, table)
+
+def _on_write(ev: cache_bus.Event) -> None:
+    if ev.kind != "reset":
+        _writes[ev.account_id] = time.monotonic()
+
+cache_bus.subscribe(("data", "account"), _on_write)
+
+def _recent_write(account_id: Optional[int], lag: float) -> bool:
+    window = get_settings().READ_YOUR_WRITES_S + lag
+    now = time.monotonic()
+    scopes = (None,) if account_id is None else (None, account_id)
+    return any(now - _writes.get(s, -window) < window for s in scopes)
+
+def choose(replica: Optional[Engine], account_id: Optional[int]) -> Tuple[Optional[Engine], str]:
+    """(Replika | None = Primary, Grund) für eine lesende Transaktion."""
+    if replica is None:
+        return None, "disabled"
+    lag = replica_lag(replica)
+    if lag is None:
+        return None, "unavailable"
+    if lag > get_settings().REPLICA_MAX_LAG_S:
+        return None, "lag"
+    if _recent_write(account_id, lag):
+        return None, "read_your_writes"
+    return replica, "replica"
+
+# ---------- Session ----------
+
+def _is_read(clause) -> bool:
+    if isinstance(clause, Select):
+        return clause._for_update_arg is None
+    if isinstance(clause, TextClause):
+        return bool(_READ_SQL.match(clause.text))
+    return False
+
+class RoutingSession(Session):
+    """Session mit Primary als bind; info["replica"] = Replika-Engine oder None,
+    info["account_id"] = Scope für Read-your-writes."""
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or isinstance(clause, UpdateBase) or (clause is not None and not _is_read(clause)):
+            self.info["wrote"] = True
+        if clause is None or self.info.get("wrote"):
+            return primary  # clause=None: db.get_bind() für eigene Connections -> immer Primary
+        if "target" not in self.info:
+            target, reason = choose(self.info.get("replica"), self.info.get("account_id"))
+            self.info["target"] = target
+            metrics.DB_READ_ROUTING.labels("primary" if target is None else "replica", reason).inc()
+        return self.info["target"] or primary
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_routing(session, transaction):
+    # je Transaktion neu entscheiden: Lag/Read-your-writes ändern sich, Writes sind committet
+    if transaction.parent is None:
+        session.info.pop("wrote", None)
+        session.info.pop("target", None)
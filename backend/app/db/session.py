@@ -1,20 +1,115 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import threading
+import time
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import get_settings
+from app.core import metrics
+from app.db.engine import make_async_engine, make_engine, statement_timeout_ms
+from app.db.replica import RoutingSession
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    future=True,
-)
+# Eine Engine (ein Pool) pro Prozess und Treiber
+engine = make_engine(settings.DATABASE_URL, name="web", workload=settings.DB_WORKLOAD)
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# Batch-Arbeit (Report-Import, Recon) auf derselben Engine, aber mit Batch-Timeout
+BatchSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+# Lesende Pfade: SELECTs an die Replika (falls konfiguriert und aktuell), Writes an den Primary
+replica_engine = (make_engine(settings.DATABASE_REPLICA_URL, name="replica", workload=settings.DB_WORKLOAD)
+                  if settings.DATABASE_REPLICA_URL else None)
+
+ReadSessionLocal = sessionmaker(bind=engine, class_=RoutingSession, autocommit=False, autoflush=False)
+ReadBatchSessionLocal = sessionmaker(bind=engine, class_=RoutingSession, autocommit=False, autoflush=False)
+
+@event.listens_for(BatchSessionLocal, "after_begin")
+@event.listens_for(ReadBatchSessionLocal, "after_begin")
+def _batch_timeout(session, transaction, connection):
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {statement_timeout_ms('batch')}")
+
+# Async-Pendant (asyncpg) für async-Handler – blockiert den Event-Loop nicht.
+# Erst beim ersten Gebrauch (Warm-up, Login) gebaut: asyncpg + Dialekt kosten sonst Kaltstart-Importzeit
+_async_engine: Optional[AsyncEngine] = None
+_async_lock = threading.Lock()
+
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        with _async_lock:
+            if _async_engine is None:
+                _async_engine = make_async_engine(settings.async_database_url, name="async",
+                                                  workload=settings.DB_WORKLOAD)
+                AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+async def dispose_async_engine() -> None:
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
 def get_db():
     db = SessionLocal()
+    t0 = time.perf_counter()
     try:
         yield db
     finally:
         db.close()
+        metrics.DB_SESSION_SECONDS.labels("web").observe(time.perf_counter() - t0)
+
+def get_batch_db():
+    db = BatchSessionLocal()
+    t0 = time.perf_counter()
+    try:
+        yield db
+    finally:
+        db.close()
+        metrics.DB_SESSION_SECONDS.labels("batch").observe(time.perf_counter() - t0)
+
+@contextmanager
+def batch_session() -> Iterator[Session]:
+    """Session für Hintergrund-/CLI-Jobs (Batch-Statement-Timeout)."""
+    db = BatchSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def read_session(account_id: Optional[int] = None, batch: bool = False) -> Session:
+    """Routing-Session; account_id = Scope für Read-your-writes (None: Account-Liste)."""
+    factory = ReadBatchSessionLocal if batch else ReadSessionLocal
+    return factory(info={"replica": replica_engine, "account_id": account_id})
+
+def get_read_db(account_id: Optional[int] = None):
+    """Für ausdrücklich lesende Endpoints; account_id kommt aus dem Query-Parameter."""
+    db = read_session(account_id)
+    t0 = time.perf_counter()
+    try:
+        yield db
+    finally:
+        db.close()
+        metrics.DB_SESSION_SECONDS.labels("read").observe(time.perf_counter() - t0)
+
+@contextmanager
+def batch_read_session(account_id: Optional[int] = None) -> Iterator[Session]:
+    """Lesende Hintergrund-/CLI-Jobs (Export): Replika + Batch-Statement-Timeout."""
+    db = read_session(account_id, batch=True)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    t0 = time.perf_counter()
+    get_async_engine()
+    try:
+        async with AsyncSessionLocal() as db:
+            yield db
+    finally:
+        metrics.DB_SESSION_SECONDS.labels("async").observe(time.perf_counter() - t0)
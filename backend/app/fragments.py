@@ -0,0 +1,66 @@
+"""Serverseitiger Cache für HTMX-Fragmente des Dashboards.
+
+    html = fragments.cached("accounts", None, lambda: render(...))   # account_id=None: accountübergreifend
+
+Schlüssel: (Fragment, Account, Datenversion). Die Version steigt bei jedem data-/account-
+Event des Cache-Bus (app/cache_bus.py) für den Account bzw. die Account-Liste (None) – auch
+aus anderen Prozessen (Worker, CLI); accountübergreifende Fragmente hängen an allen
+Versionen. UI_FRAGMENT_TTL_S begrenzt die Veraltung nur noch, wenn NOTIFY ausfällt.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from app import cache_bus
+from app.core import metrics
+from app.core.config import get_settings
+
+_versions: Dict[Optional[int], int] = {}
+_global = 0   # steigt bei jedem bump – Version für accountübergreifende Fragmente
+_cache: Dict[Tuple[str, Optional[int]], Tuple[float, Tuple[int, int], str]] = {}
+_lock = threading.Lock()
+
+def bump(account_id: Optional[int] = None) -> None:
+    """Daten des Accounts (None: Account-Liste) haben sich geändert."""
+    global _global
+    with _lock:
+        _versions[account_id] = _versions.get(account_id, 0) + 1
+        _global += 1
+
+def version(account_id: Optional[int]) -> Tuple[int, int]:
+    if account_id is None:
+        return _global, 0
+    return _versions.get(None, 0), _versions.get(account_id, 0)
+
+def cached(name: str, account_id: Optional[int], render: Callable[[], str]) -> str:
+    """Gerendertes Fragment aus dem Cache oder neu rendern (bei TTL 0 immer neu)."""
+    ttl = get_settings().UI_FRAGMENT_TTL_S
+    key, ver = (name, account_id), version(account_id)
+    hit = _cache.get(key)
+    if ttl > 0 and hit and hit[1] == ver and time.monotonic() - hit[0] < ttl:
+        metrics.UI_FRAGMENT_CACHE.labels(name, "hit").inc()
+        return hit[2]
+    metrics.UI_FRAGMENT_CACHE.labels(name, "miss").inc()
+    html = render()
+    if ttl > 0:
+        with _lock:
+            if len(_cache) >= get_settings().UI_FRAGMENT_CACHE_MAX:
+                now = time.monotonic()
+                for k in [k for k, v in _cache.items() if now - v[0] >= ttl] or list(_cache)[:len(_cache) // 2]:
+                    _cache.pop(k, None)
+            _cache[key] = (time.monotonic(), ver, html)
+    return html
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
+
+def _on_event(ev: cache_bus.Event) -> None:
+    if ev.kind == "reset":
+        clear()
+    else:
+        bump(ev.account_id)
+
+cache_bus.subscribe(("data", "account"), _on_event)
@@ -1,21 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 EXEMPT_PREFIXES = ("/health","/login","/api/login","/openapi.json","/docs","/redoc","/static","/favicon.ico")
-from fastapi.responses import RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from starlette.middleware.sessions import SessionMiddleware
 
+from app import cache_bus
+from app.circuit import CircuitOpen
 from app.core.config import get_settings
+from app.core.profiling import ProfilingMiddleware
 from app.api.routers.auth import router as auth_router
 from app.api.routers.ui import router as ui_router
-from app.db.base import Base
-from app.db.session import engine
-
-# DB-Tabellen sicherstellen (nur für Users; Reports bleiben Alembic-gesteuert)
-Base.metadata.create_all(bind=engine)
+from app.api.routers.metrics import router as metrics_router
+from app.api.routers.ingest import router as ingest_router
+from app.api.routers.notifications import router as notifications_router
+from app.api.routers.kpi import router as kpi_router
+from app.db.session import dispose_async_engine, engine
 
 settings = get_settings()
-app = FastAPI(title="Seller Control", docs_url=None, redoc_url=None)
+
+# Kein DDL beim Import: Schema kommt aus migrations/ (python -m app.cli.migrate)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup = None
+    if settings.STARTUP_PREWARM:
+        from app.core import warmup as _warmup
+        warmup = asyncio.create_task(_warmup.run())
+    cache_bus.start()  # Invalidierungen anderer Worker/Prozesse empfangen
+    yield
+    if warmup and not warmup.done():
+        warmup.cancel()
+    await asyncio.to_thread(cache_bus.stop)
+    await dispose_async_engine()
+    engine.dispose()
+
+app = FastAPI(title="Seller Control", docs_url=None, redoc_url=None, lifespan=lifespan)
 app.include_router(auth_router)
 
+# Profiling innen (sieht scope["session"]), Sessions außen
+app.add_middleware(ProfilingMiddleware)
+
 # Sessions (vor Routern/Middleware)
 app.add_middleware(SessionMiddleware,
     secret_key=settings.SESSION_SECRET,
@@ -27,6 +52,19 @@ app.add_middleware(SessionMiddleware,
 
 # Router registrieren
 app.include_router(ui_router)
+app.include_router(metrics_router)
+app.include_router(ingest_router)
+app.include_router(notifications_router)
+app.include_router(kpi_router)
+
+# SP-API gestört: sofort 503 statt Worker minutenlang in Timeouts zu binden
+@app.exception_handler(CircuitOpen)
+async def circuit_open(request: Request, exc: CircuitOpen):
+    headers = {"Retry-After": str(max(1, round(exc.retry_in)))}
+    if request.headers.get("HX-Request"):
+        return HTMLResponse(f"<div class='text-amber-700'>{exc}</div>", status_code=200, headers=headers)
+    return JSONResponse({"detail": str(exc), "region": exc.region, "operation": exc.operation},
+                        status_code=503, headers=headers)
 
 # Fallback: Unauth → Login
 @app.middleware("http")
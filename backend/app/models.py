@@ -1,8 +1,8 @@
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, Boolean, Numeric, JSON
+from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, Boolean, Numeric, JSON, func
 from datetime import datetime
 from .db import Base
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Numeric, ForeignKey
+from sqlalchemy import Column, Computed, Integer, BigInteger, Float, String, Text, Date, DateTime, JSON, Numeric, ForeignKey, Index
 
 class SellerAccount(Base):
     __tablename__ = "seller_accounts"
@@ -21,9 +21,12 @@ class SellerAccount(Base):
 
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Orders über 'api' oder 'report' holen; None = ORDER_SOURCE (app/order_sourcing.py)
+    order_source: Mapped[str | None] = mapped_column(String(10), nullable=True)
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (Index("uq_orders_account_order", "account_id", "order_id", unique=True),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     account_id: Mapped[int] = mapped_column(ForeignKey("seller_accounts.id"), index=True)
     order_id: Mapped[str] = mapped_column(String(40), index=True)
@@ -31,14 +34,24 @@ class Order(Base):
     status: Mapped[str | None] = mapped_column(String(40))
     marketplace: Mapped[str | None] = mapped_column(String(10))
     data: Mapped[dict | None] = mapped_column(JSON)
+    last_update_date: Mapped[datetime | None] = mapped_column(DateTime)
+    # Hash über den normalisierten Order-Inhalt (inkl. Items) – unverändert = kein Write
+    content_hash: Mapped[str | None] = mapped_column(String(32))
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("uq_order_items_account_order_item", "account_id", "order_id", "order_item_id", unique=True),
+        Index("ix_order_items_account_catalog", "account_id", "catalog_id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     account_id: Mapped[int] = mapped_column(ForeignKey("seller_accounts.id"), index=True)
     order_id: Mapped[str] = mapped_column(String(40), index=True)
-    asin: Mapped[str | None] = mapped_column(String(20), index=True)
-    sku: Mapped[str | None] = mapped_column(String(80), index=True)
+    order_item_id: Mapped[str | None] = mapped_column(String(40))
+    asin: Mapped[str | None] = mapped_column(String(20))
+    sku: Mapped[str | None] = mapped_column(String(80))
+    catalog_id: Mapped[int | None] = mapped_column(ForeignKey("catalog_items.id"))
     qty: Mapped[int | None] = mapped_column(Integer)
     price_amount: Mapped[float | None] = mapped_column(Numeric(12,2))
     currency: Mapped[str | None] = mapped_column(String(3))
@@ -85,23 +98,27 @@ class RemovalShipment(Base):
 
 class InventoryLedger(Base):
     __tablename__ = "inventory_ledger"
+    __table_args__ = (Index("ix_inventory_ledger_account_catalog", "account_id", "catalog_id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     account_id: Mapped[int] = mapped_column(ForeignKey("seller_accounts.id"), index=True)
     event_date: Mapped[datetime | None] = mapped_column(DateTime, index=True)
     event_type: Mapped[str | None] = mapped_column(String(40))  # Lost/Damaged/Found/Adjustment
-    asin: Mapped[str | None] = mapped_column(String(20), index=True)
-    sku: Mapped[str | None] = mapped_column(String(80), index=True)
+    asin: Mapped[str | None] = mapped_column(String(20))
+    sku: Mapped[str | None] = mapped_column(String(80))
+    catalog_id: Mapped[int | None] = mapped_column(ForeignKey("catalog_items.id"))
     fc: Mapped[str | None] = mapped_column(String(20))
     qty: Mapped[int | None] = mapped_column(Integer)
     reference: Mapped[str | None] = mapped_column(String(80))
 
 class Reimbursement(Base):
     __tablename__ = "reimbursements"
+    __table_args__ = (Index("ix_reimbursements_account_catalog", "account_id", "catalog_id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     account_id: Mapped[int] = mapped_column(ForeignKey("seller_accounts.id"), index=True)
     posted_date: Mapped[datetime | None] = mapped_column(DateTime, index=True)
-    asin: Mapped[str | None] = mapped_column(String(20), index=True)
-    sku: Mapped[str | None] = mapped_column(String(80), index=True)
+    asin: Mapped[str | None] = mapped_column(String(20))
+    sku: Mapped[str | None] = mapped_column(String(80))
+    catalog_id: Mapped[int | None] = mapped_column(ForeignKey("catalog_items.id"))
     case_id: Mapped[str | None] = mapped_column(String(60))
     reason: Mapped[str | None] = mapped_column(String(200))
     units: Mapped[int | None] = mapped_column(Integer)
@@ -109,10 +126,12 @@ class Reimbursement(Base):
 
 class ReconResult(Base):
     __tablename__ = "recon_results"
+    __table_args__ = (Index("ix_recon_results_account_catalog", "account_id", "catalog_id"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     account_id: Mapped[int] = mapped_column(ForeignKey("seller_accounts.id"), index=True)
-    asin: Mapped[str | None] = mapped_column(String(20), index=True)
-    sku: Mapped[str | None] = mapped_column(String(80), index=True)
+    asin: Mapped[str | None] = mapped_column(String(20))
+    sku: Mapped[str | None] = mapped_column(String(80))
+    catalog_id: Mapped[int | None] = mapped_column(ForeignKey("catalog_items.id"))
     window_from: Mapped[datetime | None] = mapped_column(DateTime)
     window_to: Mapped[datetime | None] = mapped_column(DateTime)
     lost_units: Mapped[int | None] = mapped_column(Integer, default=0)
@@ -122,7 +141,10 @@ class ReconResult(Base):
     reimbursed_amount: Mapped[float | None] = mapped_column(Numeric(12,2), default=0)
     open_units: Mapped[int | None] = mapped_column(Integer, default=0)
     open_amount: Mapped[float | None] = mapped_column(Numeric(12,2), default=0)
+    open_currency: Mapped[str | None] = mapped_column(String(3))  # Währung der SKU-Bewertung (open_amount)
+
 
+ROW_HASH_SQL = "md5(CASE WHEN row_seq = 0 THEN raw::text ELSE raw::text || '#' || row_seq::text END)"
 
 class FbaReturn(Base):
     __tablename__ = "fba_returns"
@@ -130,13 +152,21 @@ class FbaReturn(Base):
     account_id = Column(Integer, ForeignKey("seller_accounts.id"), index=True, nullable=False)
     return_date = Column(DateTime, index=True)
     order_id = Column(String(40), index=True)
-    asin = Column(String(20), index=True)
-    sku = Column(String(100), index=True)
+    asin = Column(String(20))
+    sku = Column(String(100))
+    catalog_id = Column(Integer, ForeignKey("catalog_items.id"))  # Katalog-Dimension (Migration 009)
     disposition = Column(String(30))
     reason = Column(String(120))
     quantity = Column(Integer)
     fc = Column(String(20))
     raw = Column(JSON)
+    # Dedupe überlappender Backfill-Fenster (Migration 006); row_seq: n-te gleiche Rohzeile im Dokument (013)
+    row_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    row_hash = Column(String(32), Computed(ROW_HASH_SQL, persisted=True))
+    __table_args__ = (
+        Index("uq_fba_returns_account_row_hash", "account_id", "row_hash", unique=True),
+        Index("ix_fba_returns_account_catalog", "account_id", "catalog_id"),
+    )
 
 class FbaRemoval(Base):
     __tablename__ = "fba_removals"
@@ -148,23 +178,39 @@ class FbaRemoval(Base):
     request_date = Column(DateTime, index=True)
     shipped_date = Column(DateTime)
     received_date = Column(DateTime)
-    asin = Column(String(20), index=True)
-    sku = Column(String(100), index=True)
+    asin = Column(String(20))
+    sku = Column(String(100))
+    catalog_id = Column(Integer, ForeignKey("catalog_items.id"))  # Katalog-Dimension (Migration 009)
     quantity = Column(Integer)
     disposition = Column(String(30))
     raw = Column(JSON)
+    # Dedupe überlappender Backfill-Fenster (Migration 006); row_seq: n-te gleiche Rohzeile im Dokument (013)
+    row_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    row_hash = Column(String(32), Computed(ROW_HASH_SQL, persisted=True))
+    __table_args__ = (
+        Index("uq_fba_removals_account_row_hash", "account_id", "row_hash", unique=True),
+        Index("ix_fba_removals_account_catalog", "account_id", "catalog_id"),
+    )
 
 class FbaInventoryAdjustment(Base):
     __tablename__ = "fba_inventory_adjustments"
     id = Column(Integer, primary_key=True)
     account_id = Column(Integer, ForeignKey("seller_accounts.id"), index=True, nullable=False)
     adjustment_date = Column(DateTime, index=True)
-    asin = Column(String(20), index=True)
-    sku = Column(String(100), index=True)
+    asin = Column(String(20))
+    sku = Column(String(100))
+    catalog_id = Column(Integer, ForeignKey("catalog_items.id"))  # Katalog-Dimension (Migration 009)
     quantity = Column(Integer)
     reason = Column(String(40), index=True)  # z.B. Lost_Warehouse, Damaged_Warehouse, Found...
     fc = Column(String(20))
     raw = Column(JSON)
+    # Dedupe überlappender Backfill-Fenster (Migration 006); row_seq: n-te gleiche Rohzeile im Dokument (013)
+    row_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    row_hash = Column(String(32), Computed(ROW_HASH_SQL, persisted=True))
+    __table_args__ = (
+        Index("uq_fba_inventory_adjustments_account_row_hash", "account_id", "row_hash", unique=True),
+        Index("ix_fba_inventory_adjustments_account_catalog", "account_id", "catalog_id"),
+    )
 
 class FbaReimbursement(Base):
     __tablename__ = "fba_reimbursements"
@@ -172,10 +218,127 @@ class FbaReimbursement(Base):
     account_id = Column(Integer, ForeignKey("seller_accounts.id"), index=True, nullable=False)
     posted_date = Column(DateTime, index=True)
     case_id = Column(String(40), index=True)
-    asin = Column(String(20), index=True)
-    sku = Column(String(100), index=True)
+    asin = Column(String(20))
+    sku = Column(String(100))
+    catalog_id = Column(Integer, ForeignKey("catalog_items.id"))  # Katalog-Dimension (Migration 009)
     quantity = Column(Integer)
     amount = Column(Numeric(12,2))
     currency = Column(String(3))
     reason = Column(String(120))
     raw = Column(JSON)
+    # Dedupe überlappender Backfill-Fenster (Migration 006); row_seq: n-te gleiche Rohzeile im Dokument (013)
+    row_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    row_hash = Column(String(32), Computed(ROW_HASH_SQL, persisted=True))
+    __table_args__ = (
+        Index("uq_fba_reimbursements_account_row_hash", "account_id", "row_hash", unique=True),
+        Index("ix_fba_reimbursements_account_catalog", "account_id", "catalog_id"),
+    )
+
+class ReportEvent(Base):
+    """REPORT_PROCESSING_FINISHED-Notification (eine Zeile je Report)."""
+    __tablename__ = "sp_report_events"
+    report_id = Column(String(40), primary_key=True)
+    report_type = Column(String(80))
+    status = Column(String(20), nullable=False)
+    document_id = Column(String(200))
+    seller_id = Column(String(40))
+    payload = Column(JSON)
+    received_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class ReportTiming(Base):
+    """Laufzeit eines abgeschlossenen Reports (createdTime -> processingEndTime)."""
+    __tablename__ = "sp_report_timings"
+    id = Column(BigInteger, primary_key=True)
+    account_id = Column(Integer, nullable=False)
+    report_type = Column(String(80), nullable=False)
+    window_days = Column(Float, nullable=False)
+    queue_s = Column(Float)
+    processing_s = Column(Float)
+    total_s = Column(Float, nullable=False)
+    source = Column(String(10), nullable=False, default="poll")  # poll | event
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    __table_args__ = (Index("ix_sp_report_timings_type_window", "report_type", "window_days", "id"),)
+
+class BackfillJob(Base):
+    """Backfill eines Zeitraums für einen Account (in Chunks zerlegt, fortsetzbar)."""
+    __tablename__ = "backfill_jobs"
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey("seller_accounts.id"), index=True, nullable=False)
+    sources = Column(String(200), nullable=False)  # CSV, z.B. "orders,returns"
+    range_from = Column(DateTime, nullable=False)
+    range_to = Column(DateTime, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending|running|done|failed
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+class BackfillChunk(Base):
+    """Teilfenster eines Backfill-Jobs = Checkpoint."""
+    __tablename__ = "backfill_chunks"
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("backfill_jobs.id", ondelete="CASCADE"), nullable=False)
+    source = Column(String(40), nullable=False)
+    window_start = Column(DateTime, nullable=False)
+    window_end = Column(DateTime, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending|running|done|failed
+    attempts = Column(Integer, nullable=False, default=0)
+    rows = Column(Integer)
+    error = Column(Text)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    __table_args__ = (
+        Index("uq_backfill_chunks_job_source_window", "job_id", "source", "window_start", unique=True),
+        Index("ix_backfill_chunks_job_status", "job_id", "status"),
+    )
+
+class AnalyticsExport(Base):
+    """Exportierte Parquet-Partition (Dataset, Account, Monat) mit Fingerprint der Quelldaten."""
+    __tablename__ = "analytics_exports"
+    dataset = Column(String(40), primary_key=True)
+    account_id = Column(Integer, primary_key=True)
+    month = Column(Date, primary_key=True)
+    fingerprint = Column(String(80), nullable=False)
+    rows = Column(Integer, nullable=False)
+    exported_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class AnalyticsExportMark(Base):
+    """Hochwassermarke des Parquet-Exports je Dataset und Umfang (account_id 0 = alle Accounts)."""
+    __tablename__ = "analytics_export_marks"
+    dataset = Column(String(40), primary_key=True)
+    account_id = Column(Integer, primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0)
+    last_updated = Column(DateTime)
+    full_scan_at = Column(DateTime)
+
+class SkuValuation(Base):
+    """Verkaufs-/Erstattungssummen je SKU, Währung und Monat (Bewertung offener Recon-Fälle)."""
+    __tablename__ = "sku_valuations"
+    account_id = Column(Integer, ForeignKey("seller_accounts.id"), primary_key=True)
+    sku = Column(String(100), primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    month = Column(Date, primary_key=True)
+    sold_units = Column(BigInteger, nullable=False, default=0)
+    sold_amount = Column(Numeric(14,2), nullable=False, default=0)
+    reimbursed_units = Column(BigInteger, nullable=False, default=0)
+    reimbursed_amount = Column(Numeric(14,2), nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class CatalogItem(Base):
+    """Katalog-Dimension: (Account, SKU, ASIN) -> int-ID, auf die die Faktentabellen zeigen."""
+    __tablename__ = "catalog_items"
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey("seller_accounts.id"), nullable=False)
+    sku = Column(String(100), nullable=False, default="")    # '' statt NULL: Teil des eindeutigen Schlüssels
+    asin = Column(String(20), nullable=False, default="")
+    fnsku = Column(String(20))
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    __table_args__ = (Index("uq_catalog_items_account_sku_asin", "account_id", "sku", "asin", unique=True),)
+
+class ReportWatermark(Base):
+    """Ende des zuletzt vollständig importierten Datenfensters je Account und Report-Typ."""
+    __tablename__ = "report_watermarks"
+    account_id = Column(Integer, ForeignKey("seller_accounts.id"), primary_key=True)
+    report_type = Column(String(80), primary_key=True)
+    data_end = Column(DateTime, nullable=False)
+    last_start = Column(DateTime)
+    last_rows = Column(Integer)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -4,7 +4,8 @@ from sqlalchemy.orm import Session
 from urllib.parse import urlencode
 from datetime import datetime
 import os, httpx, secrets
-from .db import get_db
+from .db.session import get_db
+from . import cache_bus
 from . import models
 from .crypto import encrypt
 
@@ -78,6 +79,7 @@ def oauth_callback(state: str | None = None,
     )
     db.add(acc)
     db.commit()
+    cache_bus.publish("account")  # neuer Account sofort in der Liste (alle Worker, Read-your-writes)
 
     # zurück zum Dashboard
     html = "<script>window.location='/'</script>OAuth success. Redirecting…"
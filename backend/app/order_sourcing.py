@@ -0,0 +1,73 @@
+"""Order-Beschaffung: getOrders/getOrderItems je Order ('api') oder Flatfile-Report in Bulk ('report').
+
+    res = order_sourcing.sync(db, acc, start, end)    # {"synced", "changed", "source", "reports"}
+
+Die Orders-API braucht je Order einen getOrderItems-Call (Rate-Limit ~0,5/s) – für Backfills
+und große Accounts unbrauchbar. Der Report GET_FLAT_FILE_ALL_ORDERS_DATA_BY_LAST_UPDATE_GENERAL
+liefert alle Positionen eines Fensters (max. ORDER_REPORT_MAX_DAYS, Amazon-Limit 30 Tage) in
+einem Dokument. Quelle: seller_accounts.order_source, sonst ORDER_SOURCE; 'auto' nimmt den
+Report ab ORDER_REPORT_MIN_DAYS Fensterlänge. Achtung: das Report-Fenster filtert nach
+last-updated-date, die API nach CreatedAfter/CreatedBefore.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import cache_bus, models, progress
+from .core.config import get_settings
+from .sp_api import EU_MK_IDS, pull_orders
+from .sp_api_reports_patch import R_ORDERS, fetch_orders_report
+
+MODES = ("api", "report", "auto")
+
+def mode(acc: models.SellerAccount, span: timedelta, override: Optional[str] = None) -> str:
+    """'api' oder 'report' für ein Fenster der Länge `span`."""
+    m = override or acc.order_source or get_settings().ORDER_SOURCE
+    if m not in MODES:
+        raise ValueError(f"unknown order source {m!r} (expected one of {', '.join(MODES)})")
+    if m == "auto":
+        return "report" if span >= timedelta(days=get_settings().ORDER_REPORT_MIN_DAYS) else "api"
+    return m
+
+def report_windows(start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+    step = timedelta(days=get_settings().ORDER_REPORT_MAX_DAYS)
+    out, s = [], start
+    while s < end:
+        out.append((s, min(end, s + step)))
+        s += step
+    return out
+
+def _mk_ids(acc: models.SellerAccount) -> List[str]:
+    mks = [m.strip().upper() for m in (acc.marketplaces or "DE").split(",") if m.strip()]
+    return [EU_MK_IDS[m] for m in mks if m in EU_MK_IDS]
+
+def fetch_report(acc: models.SellerAccount, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """Orders eines Fensters (≤ ORDER_REPORT_MAX_DAYS) aus dem Flatfile-Report."""
+    return fetch_orders_report(acc.id, acc.refresh_token, start, end, _mk_ids(acc) or None)
+
+def sync(db: Session, acc: models.SellerAccount, start: datetime, end: datetime,
+         source: Optional[str] = None) -> Dict[str, Any]:
+    """Orders [start, end] holen und speichern; im Report-Modus je Report-Fenster gespeichert."""
+    with cache_bus.batched():  # ein NOTIFY je Sync, nicht je Report-Fenster
+        return _sync(db, acc, start, end, mode(acc, end - start, source))
+
+def _sync(db: Session, acc: models.SellerAccount, start: datetime, end: datetime, src: str) -> Dict[str, Any]:
+    from .services import store_orders
+    if src == "api":
+        with progress.stage("fetch", source=src):
+            orders = pull_orders({"marketplaces": acc.marketplaces or "DE"}, acc.id, acc.refresh_token, start, end)
+        with progress.stage("store"):
+            changed = store_orders(db, acc.id, orders)
+        return {"synced": len(orders), "changed": changed, "source": src}
+    synced = changed = 0
+    windows = report_windows(start, end)
+    for ws, we in windows:
+        with progress.stage("fetch", source=src, since=ws.isoformat(timespec="minutes")):
+            orders = fetch_report(acc, ws, we)
+        with progress.stage("store"):
+            changed += store_orders(db, acc.id, orders, source=R_ORDERS)
+        synced += len(orders)
+    return {"synced": synced, "changed": changed, "source": src, "reports": len(windows)}
@@ -0,0 +1,174 @@
+"""Fortschritt langer Operationen (Sync/Pull/Recon) als Event-Strom für die UI (SSE).
+
+    op, started = progress.start("reports-pull", account_id, fn, *args)   # Hintergrund-Thread
+    progress.emit("report_status", report_id=rid, status="IN_PROGRESS")    # tief im Code
+    with progress.stage("returns"): ...                                    # Stage mit Dauer
+    async for ev in op.follow(last_id): ...                                # GET /api/ops/{id}/events
+
+emit()/stage() schreiben in die Operation des aktuellen Contexts (ContextVar); ohne
+laufende Operation sind sie No-ops – API-/CLI-Pfade bleiben unverändert. Pro
+(Art, Account) läuft höchstens eine Operation: ein zweiter Start (Doppelklick,
+zweiter Tab) hängt sich an die laufende an. Events liegen im Prozess-Speicher, der
+Stream muss also vom selben API-Prozess kommen, der die Operation gestartet hat.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+TERMINAL = ("done", "failed")
+_MAX_EVENTS = 2000      # je Operation; ältere fallen raus (Replay ab Verbindungsaufbau reicht)
+_KEEP_S = 600           # fertige Operationen so lange abrufbar (Reconnect, Nachzügler)
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    name: str
+    t: float                # Sekunden seit Start der Operation
+    data: Dict[str, Any] = field(default_factory=dict)
+
+class Operation:
+    def __init__(self, kind: str, account_id: int):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.account_id = account_id
+        self.status = "running"
+        self.result: Any = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._t0 = time.monotonic()
+        self._seq = 0
+        self._events: Deque[Event] = deque(maxlen=_MAX_EVENTS)
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def last_id(self) -> int:
+        return self._seq
+
+    def emit(self, name: str, **data: Any) -> Event:
+        with self._lock:
+            self._seq += 1
+            ev = Event(self._seq, name, round(time.monotonic() - self._t0, 3), data)
+            self._events.append(ev)
+            waiters = list(self._waiters)
+        for loop, flag in waiters:
+            loop.call_soon_threadsafe(flag.set)
+        return ev
+
+    def finish(self, status: str, **data: Any) -> None:
+        self.status, self.finished_at = status, time.time()
+        self.emit(status, seconds=round(self.finished_at - self.started_at, 3), **data)
+
+    def since(self, last_id: int = 0) -> List[Event]:
+        with self._lock:
+            return [e for e in self._events if e.id > last_id]
+
+    async def follow(self, last_id: int = 0, keepalive_s: float = 15.0) -> AsyncIterator[Optional[Event]]:
+        """Events ab `last_id` (Replay), dann live bis done/failed. None = Keepalive fällig."""
+        flag = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), flag)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            while True:
+                flag.clear()
+                for ev in self.since(last_id):
+                    last_id = ev.id
+                    yield ev
+                    if ev.name in TERMINAL:
+                        return
+                if self.status in TERMINAL and last_id >= self.last_id:
+                    return
+                try:
+                    await asyncio.wait_for(flag.wait(), keepalive_s)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"op_id": self.id, "kind": self.kind, "account_id": self.account_id, "status": self.status,
+                "started_at": self.started_at, "finished_at": self.finished_at, "last_event_id": self.last_id,
+                "result": self.result}
+
+_current: ContextVar[Optional[Operation]] = ContextVar("sc_operation", default=None)
+_ops: Dict[str, Operation] = {}
+_running: Dict[Tuple[str, int], Operation] = {}
+_registry_lock = threading.Lock()
+
+def current() -> Optional[Operation]:
+    return _current.get()
+
+def emit(name: str, **data: Any) -> None:
+    op = _current.get()
+    if op is not None:
+        op.emit(name, **data)
+
+@contextmanager
+def stage(name: str, **data: Any) -> Iterator[None]:
+    """Stage-Anfang/-Ende mit Dauer melden (stage_started / stage_finished)."""
+    op = _current.get()
+    if op is None:
+        yield
+        return
+    op.emit("stage_started", stage=name, **data)
+    t0 = time.monotonic()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        op.emit("stage_finished", stage=name, seconds=round(time.monotonic() - t0, 3), ok=ok)
+
+def get(op_id: str) -> Optional[Operation]:
+    return _ops.get(op_id)
+
+def _prune() -> None:
+    cutoff = time.time() - _KEEP_S
+    for op_id, op in list(_ops.items()):
+        if op.finished_at and op.finished_at < cutoff:
+            del _ops[op_id]
+
+def start(kind: str, account_id: int, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Operation, bool]:
+    """fn(*args) im Hintergrund starten. Läuft schon eine (kind, account_id)-Operation:
+    (diese, False) statt einer zweiten."""
+    with _registry_lock:
+        _prune()
+        running = _running.get((kind, account_id))
+        if running is not None:
+            return running, False
+        op = Operation(kind, account_id)
+        _ops[op.id] = op
+        _running[(kind, account_id)] = op
+    threading.Thread(target=_run, args=(op, fn, args, kwargs),
+                     name=f"op-{kind}-{account_id}", daemon=True).start()
+    return op, True
+
+def _run(op: Operation, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+    token = _current.set(op)
+    op.emit("started", kind=op.kind, account_id=op.account_id)
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        log.exception("[ops] %s account %s failed", op.kind, op.account_id)
+        status, data = "failed", {"error": str(e)[:500]}
+    else:
+        op.result = result
+        status, data = "done", {"result": result}
+    finally:
+        _current.reset(token)
+        with _registry_lock:
+            _running.pop((op.kind, op.account_id), None)
+    op.finish(status, **data)
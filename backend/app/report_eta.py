@@ -0,0 +1,107 @@
+"""Polling-Plan für Reports aus der eigenen Laufzeit-Historie.
+
+Jeder fertige Report landet mit Typ, Fenstergröße und Account in sp_report_timings.
+predict() schätzt daraus Median/p90 (erst Account+Typ+Fensterklasse, dann Typ+Fensterklasse,
+dann Typ) und liefert:
+  - ersten getReport-Check kurz vor der erwarteten Fertigstellung (höchstens Timeout),
+  - danach exponentielles Backoff mit Jitter (REPORT_POLL_MIN_S..REPORT_POLL_MAX_S),
+  - Timeout aus p90 statt fester 360 s (REPORT_TIMEOUT_MIN_S..REPORT_TIMEOUT_MAX_S).
+"""
+from __future__ import annotations
+
+import logging
+import math
+import random
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy import text
+
+from .core.config import get_settings
+
+log = logging.getLogger(__name__)
+
+# Fensterklassen (Tage, obere Grenze inkl.) – Laufzeiten wachsen grob mit der Fenstergröße
+WINDOW_BUCKETS = (1, 7, 31, 92, 183, 366)
+_MIN_SAMPLES = 3
+
+def window_bucket(window_days: float) -> Tuple[float, float]:
+    lo = 0.0
+    for hi in WINDOW_BUCKETS:
+        if window_days <= hi:
+            return lo, float(hi)
+        lo = float(hi)
+    return lo, math.inf
+
+@dataclass(frozen=True)
+class Eta:
+    p50_s: Optional[float]
+    p90_s: Optional[float]
+    samples: int
+    scope: str            # account | type_window | type | default
+    timeout_s: float
+
+    def delays(self) -> Iterator[float]:
+        """Wartezeiten vor jedem getReport-Check (erster = ETA, dann Backoff mit Jitter).
+
+        Der erste Check ist nur durch den Timeout begrenzt (lange Reports nicht nach REPORT_POLL_MAX_S
+        abfragen), REPORT_POLL_MAX_S gilt erst für das Backoff nach der ETA.
+        """
+        s = get_settings()
+        lo, hi = s.REPORT_POLL_MIN_S, s.REPORT_POLL_MAX_S
+        first = min(self.timeout_s, max(lo, 0.8 * self.p50_s)) if self.p50_s else lo
+        yield first
+        # Basis ~10 % der erwarteten Dauer: kurze Reports eng, lange grob nachfragen
+        base = max(lo, 0.1 * self.p50_s) if self.p50_s else lo
+        n = 0
+        while True:
+            d = min(hi, base * 2 ** n)
+            yield random.uniform(d / 2, d)
+            n += 1
+
+def _timeout(p90_s: Optional[float], window_days: float) -> float:
+    s = get_settings()
+    if p90_s:
+        t = 3 * p90_s
+    else:
+        # ohne Historie: Mindest-Timeout, für große Fenster hochskaliert
+        t = s.REPORT_TIMEOUT_MIN_S * max(1.0, math.sqrt(window_days / 31))
+    return float(min(s.REPORT_TIMEOUT_MAX_S, max(s.REPORT_TIMEOUT_MIN_S, t)))
+
+_STATS_SQL = """
+SELECT percentile_cont(0.5) WITHIN GROUP (ORDER BY total_s),
+       percentile_cont(0.9) WITHIN GROUP (ORDER BY total_s),
+       count(*)
+FROM (SELECT total_s FROM sp_report_timings
+      WHERE report_type = :rt {where}
+      ORDER BY id DESC LIMIT :n) t
+"""
+
+def predict(account_id: int, report_type: str, window_days: float) -> Eta:
+    from .db.session import SessionLocal
+    lo, hi = window_bucket(window_days)
+    win = "AND window_days > :lo AND window_days <= :hi"
+    scopes = (("account", f"AND account_id = :acc {win}"), ("type_window", win), ("type", ""))
+    params = {"rt": report_type, "acc": account_id, "lo": lo, "hi": hi if hi != math.inf else 1e9,
+              "n": get_settings().REPORT_ETA_HISTORY}
+    try:
+        with SessionLocal() as db:
+            for scope, where in scopes:
+                p50, p90, n = db.execute(text(_STATS_SQL.format(where=where)), params).one()
+                if n >= _MIN_SAMPLES:
+                    return Eta(p50, p90, n, scope, _timeout(p90, window_days))
+    except Exception as e:  # Planung darf das Warten nie verhindern
+        log.warning("[reports] ETA lookup failed (%s) – default schedule", e)
+    return Eta(None, None, 0, "default", _timeout(None, window_days))
+
+def record(account_id: int, report_type: str, window_days: float, total_s: float,
+           queue_s: float | None = None, processing_s: float | None = None, source: str = "poll") -> None:
+    from .db.session import SessionLocal
+    from .models import ReportTiming
+    try:
+        with SessionLocal() as db:
+            db.add(ReportTiming(account_id=account_id, report_type=report_type, window_days=window_days,
+                                total_s=total_s, queue_s=queue_s, processing_s=processing_s, source=source))
+            db.commit()
+    except Exception as e:
+        log.warning("[reports] recording timing failed: %s", e)
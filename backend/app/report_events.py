@@ -0,0 +1,174 @@
+"""REPORT_PROCESSING_FINISHED-Notifications: Subscription, Empfang, Warten auf Fertigmeldung.
+
+Quellen sind austauschbar, alle landen in record():
+  - HTTP:  POST /api/notifications/sp-api (SNS-/EventBridge-Weiterleitung, Mock)
+  - SQS:   python -m app.cli.notifications --source sqs
+  - Datei: python -m app.cli.notifications --source file (Verzeichnis mit *.json, lokaler Stand-in)
+
+wait_for_report() wartet auf das Event (In-Process sofort, sonst DB-Check alle
+REPORT_EVENT_CHECK_S); getReport-Polling bleibt nur als langsames Sicherheitsnetz
+in _wait_report_done().
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from .core import metrics
+from .core.config import get_settings
+from .models import ReportEvent
+
+log = logging.getLogger(__name__)
+
+NOTIFICATION_TYPE = "REPORT_PROCESSING_FINISHED"
+DESTINATIONS = "/notifications/v1/destinations"
+SUBSCRIPTIONS = f"/notifications/v1/subscriptions/{NOTIFICATION_TYPE}"
+_GRANTLESS_SCOPE = "sellingpartnerapi::notifications"
+
+# ---------- Subscriptions ----------
+
+def list_destinations() -> List[Dict[str, Any]]:
+    from .sp_api import _get_grantless_token, _sp_request
+    j = _sp_request(0, "", "GET", DESTINATIONS, access_token=_get_grantless_token(_GRANTLESS_SCOPE)).json()
+    return j.get("payload") or []
+
+def create_sqs_destination(arn: str, name: str = "seller-control") -> str:
+    """Destination für eine SQS-Queue (grantless). Rückgabe: destinationId."""
+    from .sp_api import _get_grantless_token, _sp_request
+    for d in list_destinations():
+        if (d.get("resource") or {}).get("sqs", {}).get("arn") == arn:
+            return d["destinationId"]
+    body = {"name": name, "resourceSpecification": {"sqs": {"arn": arn}}}
+    j = _sp_request(0, "", "POST", DESTINATIONS, body=body,
+                    access_token=_get_grantless_token(_GRANTLESS_SCOPE)).json()
+    return (j.get("payload") or {})["destinationId"]
+
+def get_subscription(account_id: int, enc_refresh_token: str) -> Optional[Dict[str, Any]]:
+    from .sp_api import SpApiError, _sp_request
+    try:
+        j = _sp_request(account_id, enc_refresh_token, "GET", SUBSCRIPTIONS).json()
+    except SpApiError as e:
+        if e.status_code == 404:
+            return None
+        raise
+    return j.get("payload") or None
+
+def ensure_subscription(account_id: int, enc_refresh_token: str, destination_id: str | None = None) -> Dict[str, Any]:
+    """REPORT_PROCESSING_FINISHED für den Account abonnieren (idempotent)."""
+    from .sp_api import _sp_request
+    sub = get_subscription(account_id, enc_refresh_token)
+    if sub:
+        return sub
+    destination_id = destination_id or get_settings().NOTIFICATIONS_DESTINATION_ID
+    if not destination_id:
+        raise RuntimeError("NOTIFICATIONS_DESTINATION_ID not configured")
+    body = {"payloadVersion": "1.0", "destinationId": destination_id}
+    j = _sp_request(account_id, enc_refresh_token, "POST", SUBSCRIPTIONS, body=body).json()
+    sub = j.get("payload") or {}
+    log.info("[notifications] account %s subscribed (%s -> %s)", account_id,
+             sub.get("subscriptionId"), destination_id)
+    return sub
+
+def delete_subscription(account_id: int, enc_refresh_token: str, subscription_id: str) -> None:
+    from .sp_api import _get_grantless_token, _sp_request
+    _sp_request(account_id, enc_refresh_token, "DELETE", f"{SUBSCRIPTIONS}/{subscription_id}",
+                access_token=_get_grantless_token(_GRANTLESS_SCOPE))
+
+# ---------- Empfang ----------
+
+def parse_notifications(body: Any) -> List[Dict[str, Any]]:
+    """SP-API-Notification(s) -> Zeilen für sp_report_events.
+
+    Akzeptiert die rohe Notification, SNS-Hülle (Message als JSON-String),
+    EventBridge (detail), SQS-Body als String und Listen davon.
+    """
+    if isinstance(body, (str, bytes)):
+        body = json.loads(body)
+    if isinstance(body, list):
+        return [row for b in body for row in parse_notifications(b)]
+    if not isinstance(body, dict):
+        return []
+    if body.get("Type") == "Notification" and "Message" in body:
+        return parse_notifications(body["Message"])
+    if "detail" in body and isinstance(body["detail"], dict):
+        return parse_notifications(body["detail"])
+
+    ntype = body.get("NotificationType") or body.get("notificationType")
+    if ntype and ntype != NOTIFICATION_TYPE:
+        return []
+    payload = body.get("Payload") or body.get("payload") or {}
+    n = payload.get("reportProcessingFinishedNotification")
+    if not n or not n.get("reportId"):
+        return []
+    return [{
+        "report_id": str(n["reportId"]),
+        "report_type": n.get("reportType"),
+        "status": n.get("processingStatus") or "DONE",
+        "document_id": n.get("reportDocumentId"),
+        "seller_id": n.get("sellerId"),
+        "payload": body,
+    }]
+
+def record(db: Session, body: Any) -> int:
+    """Notifications speichern (Upsert je reportId) und wartende Threads wecken."""
+    rows = parse_notifications(body)
+    if not rows:
+        return 0
+    stmt = pg_insert(ReportEvent).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReportEvent.report_id],
+        set_={c: stmt.excluded[c] for c in ("report_type", "status", "document_id", "seller_id", "payload")},
+    )
+    db.execute(stmt)
+    db.commit()
+    for r in rows:
+        metrics.REPORT_EVENTS.labels(r["status"]).inc()
+        _notify(r["report_id"])
+    return len(rows)
+
+# ---------- Warten ----------
+
+_waiters: Dict[str, threading.Event] = {}
+_waiters_lock = threading.Lock()
+
+def _notify(report_id: str) -> None:
+    with _waiters_lock:
+        ev = _waiters.get(report_id)
+    if ev:
+        ev.set()
+
+def lookup(report_id: str) -> Optional[Dict[str, Any]]:
+    from .db.session import SessionLocal
+    with SessionLocal() as db:
+        ev = db.execute(select(ReportEvent.status, ReportEvent.document_id, ReportEvent.report_type)
+                        .where(ReportEvent.report_id == report_id)).first()
+    return ev._asdict() if ev else None
+
+def wait_for_report(report_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+    """Bis zu `timeout` s auf die Notification warten. None = (noch) keine empfangen."""
+    check_s = get_settings().REPORT_EVENT_CHECK_S
+    ev = threading.Event()
+    with _waiters_lock:
+        _waiters[report_id] = ev
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            # DB-Check deckt Events ab, die ein anderer Prozess (API-Worker, Consumer) gespeichert hat
+            hit = lookup(report_id)
+            if hit:
+                return hit
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            ev.wait(min(check_s, remaining))
+            ev.clear()
+    finally:
+        with _waiters_lock:
+            _waiters.pop(report_id, None)
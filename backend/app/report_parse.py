@@ -0,0 +1,238 @@
+"""Parsing der Report-Flatfiles: sequentiell im Speicher oder parallel über Byte-Bereiche.
+
+    for batch in report_parse.iter_file(path, map_returns, workers=8):   # Reihenfolge bleibt erhalten
+        store_report_rows(db, account_id, report_type, batch)
+
+Parallel: die (entpackte) Datei wird per mmap in Bereiche von REPORT_PARSE_CHUNK_MB zerlegt,
+jeweils bis zum nächsten Zeilenende verlängert; ein Prozess-Pool (spawn) parst und mappt
+die Bereiche, der Aufrufer bekommt die Batches in Dateireihenfolge. Voraussetzung: keine
+Zeilenumbrüche innerhalb von Feldern – bei Amazons TSV-Flatfiles gegeben, deshalb läuft
+der parallele Modus nur für Tab-getrennte Dokumente. Dieses Modul importiert bewusst nichts
+aus der App: Worker-Prozesse starten damit schnell.
+"""
+from __future__ import annotations
+
+import atexit
+import csv
+import io
+import mmap
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Prozess-Pool nur im Parallelpfad laden (Kaltstart-Importzeit des Web-Workers)
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+Row = Dict[str, Any]
+Mapper = Callable[[Row], Row]
+
+_DIALECT_ATTRS = ("delimiter", "quotechar", "doublequote", "escapechar", "skipinitialspace", "quoting")
+
+# ---------- Mapping Rohzeile -> Spalten (für store_report_rows) ----------
+
+def _to_int(v: Any) -> int | None:
+    try:
+        return int(str(v).strip()) if v not in (None, "", "NA", "N/A") else None
+    except Exception:
+        return None
+
+def map_returns(r: Row) -> Row:
+    return {
+        "return_date": r.get("return-date") or r.get("return_date") or r.get("ReturnDate"),
+        "order_id": r.get("order-id") or r.get("order_id") or r.get("OrderId"),
+        "asin": r.get("asin") or r.get("ASIN"),
+        "sku": r.get("sku") or r.get("seller-sku") or r.get("SellerSKU"),
+        "disposition": r.get("disposition") or r.get("Disposition"),
+        "reason": r.get("reason") or r.get("Reason"),
+        "quantity": _to_int(r.get("quantity") or r.get("Quantity")),
+        "fc": r.get("fulfillment-center-id") or r.get("fc"),
+        "raw": r,
+    }
+
+def map_removals(r: Row) -> Row:
+    return {
+        "request_date": r.get("request-date") or r.get("request_date"),
+        "order_id": r.get("order-id") or r.get("order_id"),
+        "asin": r.get("asin") or r.get("ASIN"),
+        "sku": r.get("sku") or r.get("seller-sku") or r.get("SellerSKU"),
+        "quantity": _to_int(r.get("quantity")),
+        "disposition": r.get("disposition") or r.get("removal-disposition"),
+        "fc": r.get("fulfillment-center") or r.get("fc"),
+        "raw": r,
+    }
+
+def map_adjustments(r: Row) -> Row:
+    return {
+        "date": r.get("date") or r.get("posted-date") or r.get("adjusted-date"),
+        "fnsku": r.get("fnsku"),
+        "sku": r.get("sku") or r.get("seller-sku"),
+        "asin": r.get("asin"),
+        "quantity": _to_int(r.get("quantity") or r.get("quantity-adjusted") or r.get("quantity_total")),
+        "reason": r.get("reason") or r.get("adjustment-type"),
+        "raw": r,
+    }
+
+def map_reimbursements(r: Row) -> Row:
+    return {
+        "reimbursed_date": r.get("reimbursed-date") or r.get("posted-date"),
+        "reason": r.get("reason-code") or r.get("reason"),
+        "amount": r.get("amount-per-unit") or r.get("amount-total") or r.get("amount"),
+        "currency": r.get("currency"),
+        "order_id": r.get("order-id") or r.get("order_id"),
+        "asin": r.get("asin"),
+        "sku": r.get("sku") or r.get("seller-sku"),
+        "raw": r,
+    }
+
+def map_orders(r: Row) -> Row:
+    # eine Zeile je Order-Position; ohne "raw" – die Order-Daten landen gruppiert in orders.data
+    return {
+        "order_id": r.get("amazon-order-id"),
+        "order_item_id": r.get("order-item-id") or None,   # nicht in allen Report-Varianten
+        "purchase_date": r.get("purchase-date"),
+        "last_update_date": r.get("last-updated-date"),
+        "status": r.get("order-status"),
+        "sales_channel": r.get("sales-channel"),
+        "sku": r.get("sku"),
+        "asin": r.get("asin"),
+        "item_status": r.get("item-status"),
+        "qty": _to_int(r.get("quantity")),
+        "price": r.get("item-price") or None,
+        "currency": r.get("currency") or None,
+    }
+
+def number_duplicates(batches: Iterator[List[Row]]) -> Iterator[List[Row]]:
+    """Gemappte Zeilen eines Dokuments: row_seq = wievielte identische Rohzeile (ab 0; fließt in row_hash).
+
+    So bleiben echte Wiederholungen (zwei gleiche Erstattungen) erhalten, während dieselbe Zeile
+    aus einem überlappenden Dokument denselben Hash bekommt. Merkt sich einen Hash je Rohzeile.
+    """
+    seen: Dict[int, int] = {}
+    for batch in batches:
+        for r in batch:
+            raw = r.get("raw")
+            if raw is None:
+                continue
+            k = hash(repr(raw))
+            n = seen.get(k, 0)
+            seen[k] = n + 1
+            r["row_seq"] = n
+        yield batch
+
+# ---------- Sequentiell ----------
+
+def sniff(sample: str) -> csv.Dialect:
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except Exception:
+        # einfache Heuristik für Tab vs. Komma
+        return csv.excel_tab if sample.count("\t") > sample.count(",") else csv.excel
+
+def parse_text(text: str) -> List[Row]:
+    """Ganzes Dokument (Header + Zeilen) -> Liste von Rohzeilen-Dicts."""
+    return [dict(r) for r in csv.DictReader(io.StringIO(text), dialect=sniff(text[:2000]))]
+
+# ---------- Parallel ----------
+
+def _dialect_kw(dialect: csv.Dialect) -> Dict[str, Any]:
+    return {a: getattr(dialect, a) for a in _DIALECT_ATTRS}
+
+def _parse_range(path: str, start: int, end: int, header: List[str], dialect_kw: Dict[str, Any],
+                 mapper: Optional[Mapper]) -> List[Row]:
+    """Worker: Bytes [start, end) der Datei parsen (beginnt und endet an Zeilengrenzen)."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode("utf-8", errors="replace")
+    rows = (_as_dict(header, rec) for rec in csv.reader(io.StringIO(text), **dialect_kw) if rec)
+    return [mapper(r) for r in rows] if mapper else list(rows)
+
+def _as_dict(header: List[str], rec: List[str]) -> Row:
+    """Wie csv.DictReader (restkey/restval None): gleiche Rohzeile -> gleicher row_hash in beiden Pfaden."""
+    d: Row = dict(zip(header, rec))
+    if len(rec) > len(header):
+        d[None] = rec[len(header):]
+    elif len(rec) < len(header):
+        for k in header[len(rec):]:
+            d[k] = None
+    return d
+
+def ranges(mm: mmap.mmap, start: int, chunk: int) -> List[Tuple[int, int]]:
+    """Ab `start` Bereiche von ~`chunk` Bytes, jeweils bis hinter das nächste '\\n' verlängert."""
+    size, out = len(mm), []
+    while start < size:
+        nl = mm.find(b"\n", min(start + chunk, size) - 1)
+        end = size if nl < 0 else nl + 1
+        out.append((start, end))
+        start = end
+    return out
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    """Ein Pool je Prozess (spawn: sicher neben Threads/DB-Pools), bei Größenänderung neu."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+@atexit.register
+def _shutdown() -> None:
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+def iter_parallel(path: str, mapper: Optional[Mapper], workers: int, chunk_bytes: int) -> Iterator[List[Row]]:
+    """Batches je Byte-Bereich in Dateireihenfolge; höchstens 2×workers Bereiche gleichzeitig in Arbeit."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        head_end = mm.find(b"\n") + 1
+        if head_end <= 0:
+            return
+        head = mm[:head_end].decode("utf-8", errors="replace")
+        sample = mm[:min(len(mm), head_end + 2000)].decode("utf-8", errors="replace")
+        parts = ranges(mm, head_end, chunk_bytes)
+    dialect_kw = _dialect_kw(sniff(sample))
+    header = next(csv.reader(io.StringIO(head), **dialect_kw))
+    pool = _executor(workers)
+    todo = iter(parts)
+    inflight: Deque[Future] = deque()
+
+    def submit() -> None:
+        part = next(todo, None)
+        if part is not None:
+            inflight.append(pool.submit(_parse_range, path, part[0], part[1], header, dialect_kw, mapper))
+
+    try:
+        for _ in range(2 * workers):
+            submit()
+        while inflight:
+            batch = inflight.popleft().result()
+            submit()
+            yield batch
+    finally:
+        for fut in inflight:
+            fut.cancel()
+
+def is_parallel_safe(path: str) -> bool:
+    """Nur Tab-getrennte Dokumente (keine Zeilenumbrüche in Feldern) parallel parsen."""
+    with open(path, "rb") as f:
+        sample = f.read(4096).decode("utf-8", errors="replace")
+    return sniff(sample).delimiter == "\t"
+
+def iter_file(path: str, mapper: Optional[Mapper], workers: int = 0, chunk_bytes: int = 16 << 20,
+              batch_rows: int = 50_000) -> Iterator[List[Row]]:
+    """Entpackte Report-Datei als Batches (gemappt, falls mapper). workers > 1 und TSV: parallel."""
+    if workers > 1 and is_parallel_safe(path):
+        yield from iter_parallel(path, mapper, workers, chunk_bytes)
+        return
+    with open(path, "rb") as f:
+        rows = parse_text(f.read().decode("utf-8", errors="replace"))
+    for i in range(0, len(rows), batch_rows):
+        part = rows[i:i + batch_rows]
+        yield [mapper(r) for r in part] if mapper else part
@@ -0,0 +1,195 @@
+"""Report-Beschaffung: vorhandene Reports wiederverwenden, Schedules pflegen, erst zuletzt neu erzeugen.
+
+Reihenfolge in source_report():
+  1) getReports – jüngster DONE-Report desselben Typs, der das Fenster abdeckt; fehlen ihm an
+     den Rändern höchstens REPORT_REUSE_SLACK_H (z.B. der tägliche Schedule-Report von heute
+     früh), werden die Ränder als eigene, kleine Reports erzeugt
+  2) createReport für das ganze Fenster als Fallback (+ Warten auf DONE)
+Rückgabe: die Dokumente mit dem Datenfenster, das jedes abdeckt (für Wasserzeichen).
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from . import progress
+from .core import metrics
+from .core.config import get_settings
+from .sp_api import EU_MK_IDS, _iso8601s, _sp_request
+
+log = logging.getLogger(__name__)
+
+REPORTS = "/reports/2021-06-30/reports"
+SCHEDULES = "/reports/2021-06-30/schedules"
+
+# EU-Marktplätze ohne BE (AMEN7PMS3EDDL führte zu 400)
+EU_DEFAULT_MIDS = [mid for k, mid in EU_MK_IDS.items() if k != "BE"]
+
+# MWS-Namen / Tippfehler -> SP-API-Report-Typ
+_TYPE_FIXES = {
+    "GET_FBA_FULFILLMENT_REMOVALS_ORDER_DETAIL_DATA": "GET_FBA_FULFILLMENT_REMOVAL_ORDER_DETAIL_DATA",
+}
+
+@dataclass(frozen=True)
+class SourcedReport:
+    """Ein Report-Dokument und das Datenfenster, das es abdeckt (UTC)."""
+    document_id: str
+    start: datetime
+    end: datetime
+    reused: bool = False
+
+def normalize_report_type(report_type: str) -> str:
+    rt = str(report_type).strip().strip("_").upper()
+    return _TYPE_FIXES.get(rt, rt)
+
+def _parse_ts(v: Optional[str]) -> Optional[datetime]:
+    if not v:
+        return None
+    try:
+        dt = datetime.fromisoformat(v.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+def list_reports(account_id: int, enc_refresh_token: str, report_type: str, *,
+                 statuses=("DONE",), marketplace_ids: Optional[List[str]] = None,
+                 created_since: Optional[datetime] = None, max_pages: int = 3) -> List[Dict[str, Any]]:
+    """getReports (paginiert). createdSince max. 90 Tage zurück (API-Limit)."""
+    since = max(_utc(created_since or datetime.now(timezone.utc) - timedelta(days=90)),
+                datetime.now(timezone.utc) - timedelta(days=89, hours=23))
+    params: Dict[str, Any] = {
+        "reportTypes": normalize_report_type(report_type),
+        "processingStatuses": ",".join(statuses),
+        "createdSince": _iso8601s(since),
+        "pageSize": 100,
+    }
+    if marketplace_ids:
+        params["marketplaceIds"] = ",".join(marketplace_ids)
+    out: List[Dict[str, Any]] = []
+    for _ in range(max_pages):
+        j = _sp_request(account_id, enc_refresh_token, "GET", REPORTS, params=params).json()
+        p = j.get("payload", j)  # 2021-06-30 liefert ohne payload-Hülle
+        out.extend(p.get("reports") or [])
+        token = p.get("nextToken")
+        if not token:
+            break
+        params = {"nextToken": token}  # mit nextToken keine weiteren Filter erlaubt
+    return out
+
+def find_reusable_report(account_id: int, enc_refresh_token: str, report_type: str,
+                         start: datetime, end: datetime,
+                         marketplace_ids: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Jüngster DONE-Report, der [start, end] bis auf höchstens Slack je Rand abdeckt und die Marktplätze enthält."""
+    s = get_settings()
+    slack = timedelta(hours=s.REPORT_REUSE_SLACK_H)
+    max_age = timedelta(hours=s.REPORT_REUSE_MAX_AGE_H)
+    start, end = _utc(start), _utc(end)
+    wanted = set(marketplace_ids or [])
+    now = datetime.now(timezone.utc)
+
+    best = None
+    for rep in list_reports(account_id, enc_refresh_token, report_type, created_since=now - max_age):
+        if not rep.get("reportDocumentId"):
+            continue
+        ds, de, created = (_parse_ts(rep.get("dataStartTime")), _parse_ts(rep.get("dataEndTime")),
+                           _parse_ts(rep.get("createdTime")))
+        if not (ds and de) or ds > start + slack or de < end - slack or ds >= end or de <= start:
+            continue
+        have = set(rep.get("marketplaceIds") or [])
+        if have and wanted and not wanted <= have:
+            continue
+        key = created or de
+        if best is None or key > best[0]:
+            best = (key, rep)
+    return best[1] if best else None
+
+def _create(account_id: int, enc_refresh_token: str, rt: str, start: datetime, end: datetime,
+            mids: List[str]) -> Optional[SourcedReport]:
+    """createReport + Warten auf DONE; None = Amazon lässt es gerade nicht zu."""
+    from .sp_api_reports_patch import _create_report_tolerant, _wait_report_done
+
+    rep_id = _create_report_tolerant(account_id, enc_refresh_token, rt, start, end, mids)
+    if not rep_id:
+        metrics.REPORT_SOURCE.labels(rt, "skipped").inc()
+        progress.emit("report_skipped", report_type=rt)
+        return None
+    metrics.REPORT_SOURCE.labels(rt, "created").inc()
+    progress.emit("report_created", report_type=rt, report_id=rep_id)
+    window_days = (_utc(end) - _utc(start)).total_seconds() / 86400
+    doc_id = _wait_report_done(account_id, enc_refresh_token, rep_id, report_type=rt, window_days=window_days)
+    return SourcedReport(doc_id, _utc(start), _utc(end)) if doc_id else None
+
+def source_report(account_id: int, enc_refresh_token: str, report_type: str,
+                  start: datetime, end: datetime,
+                  marketplace_ids: Optional[List[str]] = None) -> List[SourcedReport]:
+    """Dokumente für Typ/Fenster in Datenreihenfolge – wiederverwendet (+ Ränder) oder neu erzeugt.
+
+    Leer = Amazon lässt es gerade nicht zu. Fehlt ein Rand-Report, deckt das Ergebnis das
+    Fenster nur teilweise ab; maßgeblich ist das Fenster je Dokument.
+    """
+    rt = normalize_report_type(report_type)
+    mids = marketplace_ids or EU_DEFAULT_MIDS
+    # Amazon rechnet in ganzen Sekunden – sonst gälte jeder Report als um Mikrosekunden zu kurz
+    start, end = _utc(start).replace(microsecond=0), _utc(end).replace(microsecond=0)
+    if get_settings().REPORT_REUSE:
+        try:
+            rep = find_reusable_report(account_id, enc_refresh_token, rt, start, end, mids)
+        except Exception as e:  # Lookup darf den Pull nie verhindern
+            log.warning("[reports] %s: getReports failed (%s) – creating instead", rt, e)
+            rep = None
+        if rep:
+            ds, de = _parse_ts(rep["dataStartTime"]), _parse_ts(rep["dataEndTime"])
+            log.info("[reports] %s: reusing report %s (%s..%s)", rt, rep.get("reportId"), ds, de)
+            metrics.REPORT_SOURCE.labels(rt, "reused").inc()
+            progress.emit("report_reused", report_type=rt, report_id=rep.get("reportId"))
+            out = [SourcedReport(rep["reportDocumentId"], ds, de, reused=True)]
+            # nicht abgedeckte Ränder einzeln nachholen (klein, schnell verarbeitet)
+            if ds > start:
+                head = _create(account_id, enc_refresh_token, rt, start, ds, mids)
+                out[:0] = [head] if head else []
+            if de < end:
+                tail = _create(account_id, enc_refresh_token, rt, de, end, mids)
+                out += [tail] if tail else []
+            return out
+
+    full = _create(account_id, enc_refresh_token, rt, start, end, mids)
+    return [full] if full else []
+
+def covered_until(start: datetime, sourced: List[SourcedReport]) -> Optional[datetime]:
+    """Ende des lückenlos ab `start` abgedeckten Fensters (naiv wie `start`); None = `start` nicht abgedeckt."""
+    cur = _utc(start)
+    for rep in sorted(sourced, key=lambda r: r.start):
+        if rep.start > cur:
+            break
+        cur = max(cur, rep.end)
+    if cur <= _utc(start):
+        return None
+    return cur.replace(tzinfo=None) if start.tzinfo is None else cur
+
+# ---------- Schedules ----------
+
+def list_schedules(account_id: int, enc_refresh_token: str, report_types: List[str]) -> List[Dict[str, Any]]:
+    params = {"reportTypes": ",".join(normalize_report_type(t) for t in report_types)}
+    j = _sp_request(account_id, enc_refresh_token, "GET", SCHEDULES, params=params).json()
+    return j.get("payload", j).get("reportSchedules") or []
+
+def ensure_schedule(account_id: int, enc_refresh_token: str, report_type: str, period: str = "P1D",
+                    marketplace_ids: Optional[List[str]] = None) -> str:
+    """createReportSchedule, falls für den Typ noch kein Schedule mit dieser Periode existiert. Rückgabe: scheduleId."""
+    rt = normalize_report_type(report_type)
+    for sch in list_schedules(account_id, enc_refresh_token, [rt]):
+        if sch.get("reportType") == rt and sch.get("period") == period:
+            return sch.get("reportScheduleId")
+    body = {"reportType": rt, "marketplaceIds": marketplace_ids or EU_DEFAULT_MIDS, "period": period}
+    j = _sp_request(account_id, enc_refresh_token, "POST", SCHEDULES, body=body).json()
+    sid = (j.get("payload") or {}).get("reportScheduleId") or j.get("reportScheduleId")
+    log.info("[reports] %s: schedule %s created (period=%s)", rt, sid, period)
+    return sid
+
+def cancel_schedule(account_id: int, enc_refresh_token: str, schedule_id: str) -> None:
+    _sp_request(account_id, enc_refresh_token, "DELETE", f"{SCHEDULES}/{schedule_id}")
@@ -11,6 +11,7 @@ class SellerAccountIn(BaseModel):
     aws_access_key: str | None = None
     aws_secret_key: str | None = None
     role_arn: str | None = None
+    order_source: str | None = None
 
 class SellerAccountOut(BaseModel):
     id: int
@@ -18,6 +19,7 @@ class SellerAccountOut(BaseModel):
     region: str
     marketplaces: str
     is_active: bool
+    order_source: str | None = None
     created_at: datetime
     class Config:
         from_attributes = True
@@ -1,52 +1,286 @@
+import hashlib
+import json
+from sqlalchemy import and_, bindparam, case, delete, func, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from datetime import datetime
-from . import models
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+from . import catalog, models, progress, valuation
+from .core import metrics
+from .db.replica import note_write
+from .sp_api import EU_MK_IDS
+from .sp_api_reports_patch import R_CUSTOMER_RETURNS, R_REMOVALS, R_ADJUSTMENTS, R_REIMBURSEMENTS
 
+# MarketplaceId -> Länderkürzel (orders.marketplace ist VARCHAR(10))
+_MK_CODES = {mid: code for code, mid in EU_MK_IDS.items()}
+
+def _try_parse_dt(s: Optional[str]):
+    if not s:
+        return None
+    try:
+        if s.endswith("Z"):
+            return datetime.fromisoformat(s.replace("Z", "+00:00"))
+        return datetime.fromisoformat(s)
+    except Exception:
+        return None
+
+def _to_decimal(v: Any) -> Optional[Decimal]:
+    if v in (None, ""):
+        return None
+    try:
+        return Decimal(str(v))
+    except (InvalidOperation, ValueError):
+        return None
+
+def _to_int(v: Any) -> Optional[int]:
+    try:
+        return int(str(v).strip()) if v not in (None, "") else None
+    except ValueError:
+        return None
+
+def _order_hash(o: dict) -> str:
+    payload = json.dumps(o, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+_ORDER_CHUNK = 500
+
+def store_orders(db: Session, account_id: int, orders: List[dict], source: str = "ORDERS_API") -> int:
+    """Orders + Items aus sp_api.pull_orders (bzw. fetch_orders_report) upserten. Rückgabe: Anzahl neuer/geänderter Orders.
+
+    Schlüssel (account_id, order_id) bzw. (account_id, order_id, order_item_id). Unveränderte
+    Orders (gleicher content_hash) kosten keinen Write, ältere Stände (LastUpdateDate) überschreiben nichts.
+    Orders mit leerer Item-Liste gelten als "Items unbekannt": nur die Kopfdaten werden aktualisiert,
+    data/content_hash und order_items bleiben beim letzten vollständigen Stand.
+    """
+    by_id = {o["orderId"]: o for o in orders if o.get("orderId")}
+    changed: set = set()
+    ids = list(by_id)
+    for i in range(0, len(ids), _ORDER_CHUNK):
+        rows = [dict(
+            account_id=account_id,
+            order_id=oid,
+            purchase_date=_try_parse_dt(o.get("purchaseDate")),
+            last_update_date=_try_parse_dt(o.get("lastUpdateDate")),
+            status=(o.get("status") or "")[:40],
+            marketplace=_MK_CODES.get(o.get("marketplaceId"), (o.get("marketplaceId") or "")[:10]),
+            data=o,
+            content_hash=_order_hash(o),
+        ) for oid, o in ((oid, by_id[oid]) for oid in ids[i:i + _ORDER_CHUNK])]
+        for with_items in (True, False):
+            part = [r for r in rows if bool(r["data"].get("items")) is with_items]
+            if part:
+                changed.update(_upsert_orders(db, part, with_items))
+        progress.emit("rows_written", table="orders", rows=len(changed), of=min(i + _ORDER_CHUNK, len(ids)))
+
+    with_items = {oid: by_id[oid] for oid in changed if by_id[oid].get("items")}
+    if with_items:
+        _store_order_items(db, account_id, with_items)
+    db.commit()
+    if changed:
+        note_write(account_id, "orders")
+    metrics.INGEST_ROWS_WRITTEN.labels(source).inc(len(changed))
+    return len(changed)
+
+_ORDER_HEADER = ("purchase_date", "last_update_date", "status", "marketplace")
+
+def _upsert_orders(db: Session, rows: List[dict], with_items: bool) -> List[str]:
+    """Ein Chunk Orders upserten; Rückgabe: order_ids neuer/geänderter Orders."""
+    t = models.Order.__table__
+    stmt = pg_insert(t).values(rows)
+    ex = stmt.excluded
+    if with_items:
+        cols = _ORDER_HEADER + ("data", "content_hash")
+        differs = t.c.content_hash.is_distinct_from(ex.content_hash)
+    else:
+        cols = _ORDER_HEADER
+        differs = tuple_(*(t.c[c] for c in cols)).is_distinct_from(tuple_(*(ex[c] for c in cols)))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[t.c.account_id, t.c.order_id],
+        set_={**{c: ex[c] for c in cols}, "updated_at": func.now()},  # Hochwassermarke des Parquet-Exports
+        where=and_(
+            differs,
+            or_(t.c.last_update_date.is_(None), ex.last_update_date.is_(None),
+                ex.last_update_date >= t.c.last_update_date),
+        ),
+    ).returning(t.c.order_id)
+    return list(db.execute(stmt).scalars())
+
+def _item_key(sku: Optional[str], asin: Optional[str]) -> str:
+    return f"{sku or ''}:{asin or ''}"[:40]  # Ersatz-ID, so lang wie die Spalte
+
+def _stored_item_ids(db: Session, account_id: int, order_ids: List[str]) -> Dict[tuple, List[str]]:
+    """(order_id, sku:asin) -> gespeicherte order_item_ids."""
+    t = models.OrderItem.__table__
+    out: Dict[tuple, List[str]] = {}
+    for oid, item_id, sku, asin in db.execute(
+            select(t.c.order_id, t.c.order_item_id, t.c.sku, t.c.asin)
+            .where(t.c.account_id == account_id, t.c.order_id.in_(order_ids), t.c.order_item_id.isnot(None))):
+        out.setdefault((oid, _item_key(sku, asin)), []).append(item_id)
+    return out
+
+def _store_order_items(db: Session, account_id: int, orders: Dict[str, dict]) -> None:
+    """Items nur für neue/geänderte Orders: upserten, nicht mehr gelieferte (und Alt-Zeilen ohne ID) löschen.
+
+    Report-Zeilen haben keine Positions-ID: sie übernehmen die gespeicherte ID gleicher SKU/ASIN
+    der Order (sonst Ersatz-ID sku:asin); API-Items benennen eine solche Ersatz-ID um. Ein Wechsel
+    der Order-Quelle aktualisiert Items so an Ort und Stelle statt sie zu löschen und neu anzulegen.
+    """
+    t = models.OrderItem.__table__
+    before = valuation.item_totals(db, account_id, orders)
+    stored = _stored_item_ids(db, account_id, list(orders))
+    renames: List[dict] = []
+    items: Dict[tuple, dict] = {}
+    for oid, o in orders.items():
+        for it in o.get("items", []):
+            key = _item_key(it.get("sku"), it.get("asin"))
+            have = stored.get((oid, key), [])
+            item_id = it.get("orderItemId")
+            if item_id is None:
+                item_id = have[0] if have else key
+            elif key in have and item_id[:40] not in have:
+                renames.append({"oid": oid, "old": key, "new": item_id[:40]})
+            items[(oid, item_id)] = dict(
+                account_id=account_id, order_id=oid, order_item_id=item_id[:40],
+                asin=it.get("asin"), sku=it.get("sku"), qty=it.get("qty"),
+                price_amount=_to_decimal(it.get("price")), currency=it.get("currency"),
+            )
+    rows = list(items.values())
+    ids = catalog.resolve(db, account_id, ((r["sku"], r["asin"], None) for r in rows))
+    for r in rows:
+        r["catalog_id"] = ids[catalog.key(r["sku"], r["asin"])]
+    if renames:
+        db.execute(update(t).where(t.c.account_id == account_id, t.c.order_id == bindparam("oid"),
+                                   t.c.order_item_id == bindparam("old"))
+                   .values(order_item_id=bindparam("new")), renames)
+    for i in range(0, len(rows), _ORDER_CHUNK):
+        stmt = pg_insert(t).values(rows[i:i + _ORDER_CHUNK])
+        ex = stmt.excluded
+        cols = ("asin", "sku", "catalog_id", "qty", "price_amount", "currency")
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.account_id, t.c.order_id, t.c.order_item_id],
+            set_={c: ex[c] for c in cols},
+            where=tuple_(*(t.c[c] for c in cols)).is_distinct_from(tuple_(*(ex[c] for c in cols))),
+        )
+        db.execute(stmt)
+    keep = [(r["order_id"], r["order_item_id"]) for r in rows]
+    db.execute(delete(t).where(
+        t.c.account_id == account_id,
+        t.c.order_id.in_(list(orders)),
+        or_(t.c.order_item_id.is_(None), ~tuple_(t.c.order_id, t.c.order_item_id).in_(keep)),
+    ))
+    # Bewertungsindex: nur die Differenz der betroffenen Orders nachziehen
+    valuation.apply(db, account_id, valuation.sales_deltas(before, valuation.item_totals(db, account_id, orders)))
+
+# Report-Typ -> (Model, Mapping der fetch_*_rows-Zeilen auf Spalten)
+_REPORT_TABLES = {
+    R_CUSTOMER_RETURNS: (models.FbaReturn, lambda r: dict(
+        return_date=_try_parse_dt(r.get("return_date")),
+        order_id=r.get("order_id"),
+        asin=r.get("asin"), sku=r.get("sku"),
+        disposition=r.get("disposition"), reason=r.get("reason"),
+        quantity=r.get("quantity"), fc=r.get("fc"), raw=r.get("raw"),
+    )),
+    R_REMOVALS: (models.FbaRemoval, lambda r: dict(
+        removal_order_id=r.get("order_id"),
+        order_type=(r.get("raw") or {}).get("order-type"),
+        status=(r.get("raw") or {}).get("order-status"),
+        request_date=_try_parse_dt(r.get("request_date")),
+        asin=r.get("asin"), sku=r.get("sku"),
+        quantity=r.get("quantity"), disposition=r.get("disposition"), raw=r.get("raw"),
+    )),
+    R_ADJUSTMENTS: (models.FbaInventoryAdjustment, lambda r: dict(
+        adjustment_date=_try_parse_dt(r.get("date")),
+        asin=r.get("asin"), sku=r.get("sku"),
+        quantity=r.get("quantity"), reason=(r.get("reason") or "")[:40] or None,
+        fc=(r.get("raw") or {}).get("fulfillment-center"), raw=r.get("raw"),
+    )),
+    R_REIMBURSEMENTS: (models.FbaReimbursement, lambda r: dict(
+        posted_date=_try_parse_dt(r.get("reimbursed_date")),
+        case_id=(r.get("raw") or {}).get("case-id"),
+        asin=r.get("asin"), sku=r.get("sku"),
+        quantity=_to_int((r.get("raw") or {}).get("quantity-reimbursed-total")),
+        amount=_to_decimal(r.get("amount")) or Decimal("0"),
+        currency=r.get("currency"), reason=r.get("reason"), raw=r.get("raw"),
+    )),
+}
+
+def store_report_rows(db: Session, account_id: int, report_type: str, rows: List[Dict[str, Any]]) -> int:
+    """Gemappte Report-Zeilen (fetch_*_rows) per Bulk-Insert speichern. Rückgabe: neu geschriebene Zeilen.
+
+    Bereits vorhandene Zeilen (gleicher row_hash = md5 der Rohzeile + row_seq, z.B. aus überlappenden
+    Backfill-Fenstern oder wiederholten Pulls) werden übersprungen.
+    """
+    if not rows:
+        return 0
+    model, mapper = _REPORT_TABLES[report_type]
+    values = [dict(mapper(r), account_id=account_id, row_seq=r.get("row_seq", 0)) for r in rows]
+    ids = catalog.resolve(db, account_id, ((v["sku"], v["asin"], (v.get("raw") or {}).get("fnsku")) for v in values))
+    for v in values:
+        v["catalog_id"] = ids[catalog.key(v["sku"], v["asin"])]
+    stmt = (pg_insert(model)
+            .on_conflict_do_nothing(index_elements=[model.account_id, model.row_hash])
+            .returning(model.id))
+    if model is models.FbaReimbursement:
+        stmt = stmt.returning(model.sku, model.currency, model.posted_date, model.quantity, model.amount)
+    inserted = db.execute(stmt, values).all()
+    n = len(inserted)
+    if model is models.FbaReimbursement:
+        valuation.apply(db, account_id, valuation.reimbursement_deltas(r[1:] for r in inserted))
+    db.commit()
+    if n:
+        note_write(account_id, model.__tablename__)
+    metrics.INGEST_ROWS_WRITTEN.labels(report_type).inc(n)
+    progress.emit("rows_written", table=model.__tablename__, rows=n, of=len(rows))
+    return n
+
+@metrics.RECON_DURATION.time()
 def reconcile_account(db: Session, account_id: int, date_from: datetime, date_to: datetime) -> int:
     # Simple placeholder: roll up ledger vs reimbursements by SKU
-    ledger_rows = db.query(models.InventoryLedger).filter(
-        models.InventoryLedger.account_id == account_id,
-        models.InventoryLedger.event_date >= date_from,
-        models.InventoryLedger.event_date < date_to
-    ).all()
+    L, R = models.InventoryLedger, models.Reimbursement
+    # Zeilen aus Importen ohne catalog_id zuordnen (Index-Lookup, meist nichts zu tun)
+    catalog.backfill(db, account_id, tables=("inventory_ledger", "reimbursements"))
 
-    reimb_rows = db.query(models.Reimbursement).filter(
-        models.Reimbursement.account_id == account_id,
-        models.Reimbursement.posted_date >= date_from,
-        models.Reimbursement.posted_date < date_to
+    # Aggregation in Postgres über die int-catalog_id statt Zeilen/Strings in Python
+    qty = func.coalesce(L.qty, 0)
+    ledger_rows = db.execute(
+        select(L.catalog_id,
+               func.sum(case((L.event_type == "Lost", qty), else_=0)),
+               func.sum(case((L.event_type == "Damaged", qty), else_=0)),
+               func.sum(case((L.event_type == "Found", qty), else_=0)))
+        .where(L.account_id == account_id, L.event_date >= date_from, L.event_date < date_to)
+        .group_by(L.catalog_id)
+    ).all()
+    reimb_rows = db.execute(
+        select(R.catalog_id, func.coalesce(func.sum(R.units), 0), func.coalesce(func.sum(R.amount), 0))
+        .where(R.account_id == account_id, R.posted_date >= date_from, R.posted_date < date_to)
+        .group_by(R.catalog_id)
     ).all()
+    progress.emit("recon_loaded", ledger_items=len(ledger_rows), reimbursement_items=len(reimb_rows))
 
-    # Aggregate
-    by_sku = {}
-    for r in ledger_rows:
-        key = (r.asin, r.sku)
-        agg = by_sku.setdefault(key, {"lost":0,"damaged":0,"found":0})
-        if r.event_type == "Lost":
-            agg["lost"] += (r.qty or 0)
-        elif r.event_type == "Damaged":
-            agg["damaged"] += (r.qty or 0)
-        elif r.event_type == "Found":
-            agg["found"] += (r.qty or 0)
-
-    reimb_by_sku = {}
-    for r in reimb_rows:
-        key = (r.asin, r.sku)
-        agg = reimb_by_sku.setdefault(key, {"units":0,"amount":0.0})
-        agg["units"] += (r.units or 0)
-        agg["amount"] += float(r.amount or 0)
+    reimb_by_item = {cid: {"units": int(units), "amount": float(amount)} for cid, units, amount in reimb_rows}
+    items = catalog.lookup(db, (cid for cid, *_ in ledger_rows))
+    # Wert je Einheit aus dem Bewertungsindex (PK-Lookup statt Scan über Orders/Erstattungen)
+    unit_value = valuation.unit_values(db, account_id, (sku for sku, _ in items.values()), date_to)
 
     # Upsert recon results
     inserted = 0
-    for (asin, sku), m in by_sku.items():
-        reimb = reimb_by_sku.get((asin, sku), {"units":0,"amount":0.0})
-        open_units = (m["lost"] + m["damaged"] - m["found"]) - reimb["units"]
+    for cid, lost, damaged, found in ledger_rows:
+        sku, asin = items.get(cid, (None, None))
+        reimb = reimb_by_item.get(cid, {"units":0,"amount":0.0})
+        open_units = (lost + damaged - found) - reimb["units"]
+        uv = unit_value.get(sku)
+        # Betrag in der Bewertungswährung der SKU – Beträge verschiedener SKUs nicht blind addieren
+        open_amount = round(float(uv.value) * max(open_units, 0), 2) if uv else 0.0
         db.add(models.ReconResult(
-            account_id=account_id, asin=asin, sku=sku,
+            account_id=account_id, asin=asin, sku=sku, catalog_id=cid,
             window_from=date_from, window_to=date_to,
-            lost_units=m["lost"], damaged_units=m["damaged"], found_units=m["found"],
+            lost_units=lost, damaged_units=damaged, found_units=found,
             reimbursed_units=reimb["units"], reimbursed_amount=reimb["amount"],
-            open_units=open_units, open_amount=0.0
+            open_units=open_units, open_amount=open_amount, open_currency=uv.currency if uv else None
         ))
         inserted += 1
     db.commit()
+    note_write(account_id, "recon_results")
+    progress.emit("rows_written", table="recon_results", rows=inserted)
     return inserted
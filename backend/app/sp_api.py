@@ -1,14 +1,17 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 from datetime import datetime, timedelta, timezone
-import os, time, json, urllib.parse
+import os, re, threading, time, json, urllib.parse
 
-import httpx
-from botocore.credentials import Credentials as BotoCreds
-from botocore.auth import SigV4Auth
-from botocore.awsrequest import AWSRequest
+# httpx/botocore erst beim ersten Call importieren (Kaltstart der Worker)
+if TYPE_CHECKING:
+    import httpx
 
+from . import cache_bus, circuit, progress
 from .crypto import decrypt
+from .core import metrics
+from .core.config import get_settings
+from .core.profiling import count_sp_api_call
 
 ENDPOINT_BY_REGION = {
     "eu": "https://sellingpartnerapi-eu.amazon.com",
@@ -29,11 +32,83 @@ AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY")
 AWS_SECRET_KEY = os.getenv("AWS_SECRET_KEY")
 NO_AWS_MODE = os.getenv("NO_AWS_MODE","0") == "1"
 
-BASE_URL = ENDPOINT_BY_REGION[SP_REGION]
+# SP_API_BASE_URL / LWA_TOKEN_URL: z.B. auf den lokalen Mock (benchmarks/mock_sp_api.py) zeigen
+BASE_URL = os.getenv("SP_API_BASE_URL") or ENDPOINT_BY_REGION[SP_REGION]
+LWA_TOKEN_URL = os.getenv("LWA_TOKEN_URL", "https://api.amazon.com/auth/o2/token")
 AWS_EXEC_REGION = AWS_REGION_FOR_SP[SP_REGION]
 
 _LWA_CACHE: Dict[int, Tuple[str, float]] = {}
 
+class SpApiError(RuntimeError):
+    """SP-API antwortet mit 4xx/5xx; status_code zum Verzweigen, die Meldung enthält den Body."""
+
+    def __init__(self, status_code: int, message: str):
+        self.status_code = status_code
+        super().__init__(message)
+
+_http: "httpx.Client | None" = None
+_http_lock = threading.Lock()
+
+def _client() -> httpx.Client:
+    """Ein Client (Connection-Pool, Keep-Alive) je Prozess; Timeouts je Phase aus den Settings."""
+    global _http
+    if _http is None:
+        import httpx
+        s = get_settings()
+        with _http_lock:
+            if _http is None:
+                _http = httpx.Client(
+                    timeout=httpx.Timeout(s.SP_API_READ_TIMEOUT_S, connect=s.SP_API_CONNECT_TIMEOUT_S,
+                                          pool=s.SP_API_POOL_TIMEOUT_S),
+                    limits=httpx.Limits(max_connections=s.SP_API_MAX_CONNECTIONS),
+                )
+    return _http
+
+def _lwa_post(data: Dict[str, Any]) -> httpx.Response:
+    """Token-Request an LWA hinter dem ("lwa", "token")-Breaker."""
+    b = circuit.breaker("lwa", "token")
+    b.before()
+    import httpx
+    try:
+        r = _client().post(LWA_TOKEN_URL, data=data,
+                           headers={"Content-Type": "application/x-www-form-urlencoded;charset=UTF-8"})
+    except httpx.TransportError as e:
+        b.record(False, f"{type(e).__name__}: {e}")
+        metrics.LWA_REFRESHES.labels("error").inc()
+        raise
+    except Exception:
+        b.release()  # lokaler Fehler: Probe-Slot freigeben, sonst bleibt der Breaker dauerhaft zu
+        metrics.LWA_REFRESHES.labels("error").inc()
+        raise
+    b.record(not circuit.is_failure(r.status_code), f"HTTP {r.status_code}")
+    metrics.LWA_REFRESHES.labels("ok" if r.status_code < 400 else "error").inc()
+    r.raise_for_status()
+    return r
+
+# Operation-Namen für Metriken (begrenzte Label-Kardinalität, IDs fliegen raus)
+_OPERATIONS = [
+    ("GET",  re.compile(r"^/orders/v0/orders$"), "getOrders"),
+    ("GET",  re.compile(r"^/orders/v0/orders/[^/]+/orderItems$"), "getOrderItems"),
+    ("POST", re.compile(r"^/reports/2021-06-30/reports$"), "createReport"),
+    ("GET",  re.compile(r"^/reports/2021-06-30/reports$"), "getReports"),
+    ("GET",  re.compile(r"^/reports/2021-06-30/reports/[^/]+$"), "getReport"),
+    ("GET",  re.compile(r"^/reports/2021-06-30/documents/[^/]+$"), "getReportDocument"),
+    ("GET",  re.compile(r"^/reports/2021-06-30/schedules$"), "getReportSchedules"),
+    ("POST", re.compile(r"^/reports/2021-06-30/schedules$"), "createReportSchedule"),
+    ("DELETE", re.compile(r"^/reports/2021-06-30/schedules/[^/]+$"), "cancelReportSchedule"),
+    ("GET",  re.compile(r"^/notifications/v1/destinations$"), "getDestinations"),
+    ("POST", re.compile(r"^/notifications/v1/destinations$"), "createDestination"),
+    ("GET",  re.compile(r"^/notifications/v1/subscriptions/[^/]+$"), "getSubscription"),
+    ("POST", re.compile(r"^/notifications/v1/subscriptions/[^/]+$"), "createSubscription"),
+    ("DELETE", re.compile(r"^/notifications/v1/subscriptions/[^/]+/[^/]+$"), "deleteSubscriptionById"),
+]
+
+def _operation(method: str, path: str) -> str:
+    for m, rx, name in _OPERATIONS:
+        if m == method.upper() and rx.match(path):
+            return name
+    return "other"
+
 def _iso8601s(dt: datetime) -> str:
     """ISO8601 in UTC mit Sekundenpräzision (keine Mikrosekunden)."""
     if dt.tzinfo is None:
@@ -51,26 +126,50 @@ def _get_lwa_access_token(account_id: int, encrypted_refresh_token: str) -> str:
     refresh_token = decrypt(encrypted_refresh_token)
     data = {"grant_type":"refresh_token","refresh_token":refresh_token,
             "client_id":LWA_CLIENT_ID,"client_secret":LWA_CLIENT_SECRET}
-    with httpx.Client(timeout=30) as c:
-        r = c.post("https://api.amazon.com/auth/o2/token",
-                   data=data,
-                   headers={"Content-Type":"application/x-www-form-urlencoded;charset=UTF-8"})
-    r.raise_for_status()
-    j = r.json()
+    j = _lwa_post(data).json()
     _LWA_CACHE[account_id] = (j["access_token"], now + int(j.get("expires_in",3600)))
     return j["access_token"]
 
+def _on_account_event(ev: cache_bus.Event) -> None:
+    # Refresh-Token/Credentials des Accounts geändert: Access-Token nicht weiterverwenden
+    # (andere Stammdaten wie order_source lassen den Token stehen)
+    if ev.kind == "reset":
+        _LWA_CACHE.clear()
+    elif ev.account_id is not None and ev.table in (None, cache_bus.CREDENTIALS):
+        _LWA_CACHE.pop(ev.account_id, None)
+
+cache_bus.subscribe(("account",), _on_account_event)
+
+_GRANTLESS_CACHE: Dict[str, Tuple[str, float]] = {}
+
+def _get_grantless_token(scope: str) -> str:
+    """LWA client_credentials (z.B. scope sellingpartnerapi::notifications)."""
+    tok, exp = _GRANTLESS_CACHE.get(scope, (None, 0))
+    now = time.time()
+    if tok and now < exp - 60:
+        return tok
+    data = {"grant_type": "client_credentials", "scope": scope,
+            "client_id": LWA_CLIENT_ID, "client_secret": LWA_CLIENT_SECRET}
+    j = _lwa_post(data).json()
+    _GRANTLESS_CACHE[scope] = (j["access_token"], now + int(j.get("expires_in", 3600)))
+    return j["access_token"]
+
 def _sign_if_needed(method: str, url: str, body: bytes|None, base_headers: Dict[str,str]) -> Dict[str,str]:
     if NO_AWS_MODE or not (AWS_ACCESS_KEY and AWS_SECRET_KEY):
         return base_headers  # LWA-only (ohne SigV4)
+    from botocore.auth import SigV4Auth
+    from botocore.awsrequest import AWSRequest
+    from botocore.credentials import Credentials as BotoCreds
     creds = BotoCreds(AWS_ACCESS_KEY, AWS_SECRET_KEY)
     req = AWSRequest(method=method, url=url, data=body or b"", headers=base_headers.copy())
     SigV4Auth(creds, "execute-api", AWS_EXEC_REGION).add_auth(req)
     return dict(req.headers.items())
 
 def _sp_request(account_id:int, enc_rtok:str, method:str, path:str,
-                params:Dict[str,Any]|None=None, body:Any|None=None) -> httpx.Response:
-    at = _get_lwa_access_token(account_id, enc_rtok)
+                params:Dict[str,Any]|None=None, body:Any|None=None,
+                access_token:str|None=None) -> httpx.Response:
+    # access_token: z.B. Grantless-Token (Notifications-Destinations) statt Seller-Refresh-Token
+    at = access_token or _get_lwa_access_token(account_id, enc_rtok)
     q = f"?{urllib.parse.urlencode(params, doseq=True)}" if params else ""
     url = f"{BASE_URL}{path}{q}"
     # --- normalize reportType if present (fix MWS-style names like _GET_..._) ---
@@ -88,8 +187,25 @@ def _sp_request(account_id:int, enc_rtok:str, method:str, path:str,
     }
     headers = _sign_if_needed(method, url, body_bytes, base_headers)
 
-    with httpx.Client(timeout=60) as c:
-        r = c.request(method, url, headers=headers, content=body_bytes)
+    op = _operation(method, path)
+    b = circuit.breaker(SP_REGION, op)
+    b.before()  # bei Störung sofort CircuitOpen statt Timeout abwarten
+    count_sp_api_call()
+    t0 = time.perf_counter()
+    import httpx
+    try:
+        r = _client().request(method, url, headers=headers, content=body_bytes)
+    except Exception as e:
+        if isinstance(e, httpx.TransportError):
+            b.record(False, f"{type(e).__name__}: {e}")
+        else:
+            b.release()
+        metrics.SP_API_LATENCY.labels(op, "error").observe(time.perf_counter() - t0)
+        raise
+    b.record(not circuit.is_failure(r.status_code), f"HTTP {r.status_code}")
+    metrics.SP_API_LATENCY.labels(op, str(r.status_code)).observe(time.perf_counter() - t0)
+    if r.status_code == 429:
+        metrics.SP_API_THROTTLED.labels(op).inc()
 
     # Klare Fehlermeldung bei 4xx/5xx, inkl. Body
     if r.status_code >= 400:
@@ -100,10 +216,22 @@ def _sp_request(account_id:int, enc_rtok:str, method:str, path:str,
         msg = json.dumps(detail)
         # Hilfreicher Hinweis, falls Signatur fehlt.
         if r.status_code in (401,403) and ("Signature" in msg or "MissingAuthenticationToken" in msg):
-            raise RuntimeError("Amazon lehnt ohne AWS SigV4 ab. Bitte AWS_ACCESS_KEY/AWS_SECRET_KEY in .env setzen.")
-        raise RuntimeError(f"SP-API {r.status_code} {url} -> {msg}")
+            raise SpApiError(r.status_code, "Amazon lehnt ohne AWS SigV4 ab. Bitte AWS_ACCESS_KEY/AWS_SECRET_KEY in .env setzen.")
+        raise SpApiError(r.status_code, f"SP-API {r.status_code} {url} -> {msg}")
     return r
 
+def _sp_get_throttled(account_id:int, enc_rtok:str, path:str, params:Dict[str,Any]|None=None) -> dict:
+    """GET mit Backoff bei 429 (getOrderItems: 0,5 req/s) – bis SP_API_THROTTLE_RETRIES Versuche."""
+    retries = get_settings().SP_API_THROTTLE_RETRIES
+    for attempt in range(retries + 1):
+        try:
+            return _sp_request(account_id, enc_rtok, "GET", path, params=params).json()
+        except SpApiError as e:
+            if e.status_code != 429 or attempt == retries:
+                raise
+            time.sleep(min(2.0 ** attempt, 30.0))
+    raise AssertionError("unreachable")
+
 def pull_orders(account_cfg:dict, account_id:int, enc_refresh_token:str,
                 date_from:datetime, date_to:datetime) -> List[dict]:
     # 1) Zeiten: CreatedBefore muss mind. ~2 Minuten zurückliegen, keine Mikrosekunden.
@@ -123,23 +251,39 @@ def pull_orders(account_cfg:dict, account_id:int, enc_refresh_token:str,
         "CreatedBefore": _iso8601s(safe_to),
     }
 
-    data = _sp_request(account_id, enc_refresh_token, "GET", "/orders/v0/orders", params=params).json()
-    orders = data.get("payload", {}).get("Orders", [])
+    # 3) alle Seiten (NextToken; MarketplaceIds muss mit)
+    orders: List[dict] = []
+    while True:
+        payload = _sp_get_throttled(account_id, enc_refresh_token, "/orders/v0/orders", params).get("payload", {})
+        orders.extend(payload.get("Orders", []))
+        token = payload.get("NextToken")
+        if not token:
+            break
+        params = {"MarketplaceIds": params["MarketplaceIds"], "NextToken": token}
+    progress.emit("orders_fetched", orders=len(orders))
 
     out=[]
-    for o in orders[:20]:
+    for o in orders:
         oid = o.get("AmazonOrderId")
-        try:
-            items = _sp_request(account_id, enc_refresh_token, "GET",
-                                f"/orders/v0/orders/{oid}/orderItems").json().get("payload",{}).get("OrderItems",[])
-        except Exception:
-            items=[]
+        # Fehler (auch CircuitOpen) brechen ab: eine Order ohne Items würde als "keine Items" gespeichert
+        items: List[dict] = []
+        item_params = None
+        while True:  # große Orders: Items über mehrere Seiten (NextToken)
+            payload = _sp_get_throttled(account_id, enc_refresh_token,
+                                        f"/orders/v0/orders/{oid}/orderItems", item_params).get("payload", {})
+            items.extend(payload.get("OrderItems", []))
+            token = payload.get("NextToken")
+            if not token:
+                break
+            item_params = {"NextToken": token}
         out.append({
             "orderId": oid,
             "purchaseDate": o.get("PurchaseDate"),
+            "lastUpdateDate": o.get("LastUpdateDate"),
             "status": o.get("OrderStatus"),
             "marketplaceId": o.get("MarketplaceId"),
-            "items": [{"asin":it.get("ASIN"),"sku":it.get("SellerSKU"),
+            "items": [{"orderItemId":it.get("OrderItemId"),
+                       "asin":it.get("ASIN"),"sku":it.get("SellerSKU"),
                        "qty":it.get("QuantityOrdered"),
                        "price":(it.get("ItemPrice",{}) or {}).get("Amount"),
                        "currency":(it.get("ItemPrice",{}) or {}).get("CurrencyCode")} for it in items],
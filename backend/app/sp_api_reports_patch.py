@@ -1,11 +1,18 @@
 from __future__ import annotations
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 from datetime import datetime
-import time, io, csv, gzip, httpx
+from decimal import Decimal, InvalidOperation
+import time, os, gzip, logging
 
 # wir nutzen die vorhandenen SP-API Hilfen
-from .sp_api import _sp_request, _iso8601s, EU_MK_IDS
+from .sp_api import SP_REGION, _client, _sp_request, _iso8601s, EU_MK_IDS
+from . import circuit, progress, report_parse
+from .core import metrics
+from .report_parse import map_adjustments, map_orders, map_reimbursements, map_removals, map_returns
+from .report_sourcing import SourcedReport, normalize_report_type, source_report
+
+log = logging.getLogger(__name__)
 
 # Fallback auf alle EU-Marketplaces, falls Amazon welche fordert
 EU_DEFAULT_MIDS = list(EU_MK_IDS.values())
@@ -15,6 +22,22 @@ R_CUSTOMER_RETURNS   = "GET_FBA_FULFILLMENT_CUSTOMER_RETURNS_DATA"
 R_REMOVALS           = "GET_FBA_FULFILLMENT_REMOVALS_ORDER_DETAIL_DATA"
 R_ADJUSTMENTS        = "GET_LEDGER_DETAIL_VIEW_DATA"
 R_REIMBURSEMENTS     = "GET_FBA_REIMBURSEMENTS_DATA"
+# Orders in Bulk (eine Zeile je Position, Fenster nach last-updated-date, max. 30 Tage)
+R_ORDERS             = "GET_FLAT_FILE_ALL_ORDERS_DATA_BY_LAST_UPDATE_GENERAL"
+
+# Rohzeile -> Spalten je Report-Typ (app/report_parse.py, dort auch für die Worker-Prozesse)
+MAPPERS = {
+    R_CUSTOMER_RETURNS: map_returns,
+    R_REMOVALS: map_removals,
+    R_ADJUSTMENTS: map_adjustments,
+    R_REIMBURSEMENTS: map_reimbursements,
+    R_ORDERS: map_orders,
+}
+
+# sales-channel im Orders-Report -> MarketplaceId
+_SALES_CHANNELS = {f"amazon.{tld}": EU_MK_IDS[code] for code, tld in (
+    ("DE", "de"), ("FR", "fr"), ("IT", "it"), ("ES", "es"), ("NL", "nl"),
+    ("SE", "se"), ("PL", "pl"), ("BE", "com.be"), ("UK", "co.uk"))}
 
 def _create_report(account_id:int, enc_refresh_token:str, report_type:str,
                    start:datetime, end:datetime, marketplace_ids: List[str] | None = None) -> str:
@@ -34,30 +57,135 @@ def _create_report(account_id:int, enc_refresh_token:str, report_type:str,
         raise RuntimeError(f"Create report failed: {j}")
     return rep_id
 
+def _get_report(account_id:int, enc_refresh_token:str, report_id:str) -> Dict[str, Any]:
+    j = _sp_request(account_id, enc_refresh_token, "GET", f"/reports/2021-06-30/reports/{report_id}").json()
+    return j.get("payload") or j
+
+def _report_result(p: Dict[str, Any]) -> str | None:
+    """reportDocumentId bei DONE, None solange in Arbeit; Fehler bei FATAL/CANCELLED."""
+    st = p.get("processingStatus")
+    if st == "DONE":
+        _observe_report_timings(p)
+        doc_id = p.get("reportDocumentId")
+        if not doc_id:
+            raise RuntimeError(f"Missing document id: {p}")
+        return doc_id
+    if st in ("FATAL", "CANCELLED"):
+        raise RuntimeError(f"Report ended with status={st}: {p}")
+    return None
+
 def _wait_report_done(account_id:int, enc_refresh_token:str, report_id:str,
-                      timeout:int = 360, sleep_s:int = 5) -> str:
-    deadline = time.time() + timeout
+                      timeout:float | None = None, report_type:str | None = None,
+                      window_days:float | None = None) -> str:
+    """Bis DONE warten. Plan (erster Check, Backoff, Timeout) aus der Laufzeit-Historie (report_eta)."""
+    from .core.config import get_settings
+    from . import report_eta
+    s = get_settings()
+    t0 = time.time()
+    if report_type and window_days is not None:
+        eta = report_eta.predict(account_id, report_type, window_days)
+    else:
+        eta = report_eta.Eta(None, None, 0, "default", float(s.REPORT_TIMEOUT_MIN_S))
+    timeout = timeout or eta.timeout_s
+    log.info("[reports] %s: waiting (eta p50=%s p90=%s from %s/%d, timeout=%.0fs)", report_id,
+             _fmt_s(eta.p50_s), _fmt_s(eta.p90_s), eta.scope, eta.samples, timeout)
+    progress.emit("report_waiting", report_id=report_id, eta_s=eta.p50_s, timeout_s=round(timeout))
+    if s.REPORT_NOTIFICATIONS:
+        return _wait_report_event(account_id, enc_refresh_token, report_id, timeout, s.REPORT_POLL_FALLBACK_S,
+                                  t0, window_days)
+    deadline = t0 + timeout
+    delays = eta.delays()
     while True:
-        r = _sp_request(account_id, enc_refresh_token, "GET", f"/reports/2021-06-30/reports/{report_id}")
-        j = r.json()
-        p = j.get("payload") or j
-        st = p.get("processingStatus")
-        if st == "DONE":
-            doc_id = p.get("reportDocumentId")
-            if not doc_id:
-                raise RuntimeError(f"Missing document id: {j}")
+        time.sleep(max(0.0, min(next(delays), deadline - time.time())))
+        p = _get_report(account_id, enc_refresh_token, report_id)
+        metrics.REPORT_STATUS_CHECKS.labels(p.get("reportType") or "unknown").inc()
+        progress.emit("report_status", report_id=report_id, status=p.get("processingStatus"))
+        doc_id = _report_result(p)
+        if doc_id:
+            metrics.REPORT_COMPLETION.labels(p.get("reportType") or "unknown", "poll").inc()
+            _record_timing(account_id, p, window_days)
             return doc_id
-        if st in ("FATAL", "CANCELLED"):
-            raise RuntimeError(f"Report ended with status={st}: {j}")
-        if time.time() > deadline:
-            raise TimeoutError(f"Report not DONE within {timeout}s (last={st})")
-        time.sleep(sleep_s)
-
-def _download_document(url: str, compression: str | None = None) -> bytes:
-    with httpx.Client(timeout=60) as c:
-        r = c.get(url)
-        r.raise_for_status()
-        data = r.content
+        if time.time() >= deadline:
+            raise TimeoutError(f"Report not DONE within {timeout:.0f}s (last={p.get('processingStatus')})")
+
+def _wait_report_event(account_id:int, enc_refresh_token:str, report_id:str,
+                       timeout:float, fallback_s:int, t0:float, window_days:float | None = None) -> str:
+    """Auf REPORT_PROCESSING_FINISHED warten; getReport nur alle `fallback_s` als Sicherheitsnetz."""
+    from .report_events import wait_for_report
+    from . import report_eta
+    deadline = t0 + timeout
+    while True:
+        ev = wait_for_report(report_id, max(0.0, min(fallback_s, deadline - time.time())))
+        if ev:
+            progress.emit("report_status", report_id=report_id, status=ev["status"], via="event")
+        if ev and ev["status"] == "DONE" and ev["document_id"]:
+            metrics.REPORT_COMPLETION.labels(ev["report_type"] or "unknown", "event").inc()
+            if ev["report_type"] and window_days is not None:
+                # keine Amazon-Zeitstempel im Event: lokale Dauer seit createReport
+                report_eta.record(account_id, ev["report_type"], window_days, time.time() - t0, source="event")
+            return ev["document_id"]
+        if ev and ev["status"] in ("FATAL", "CANCELLED"):
+            raise RuntimeError(f"Report {report_id} ended with status={ev['status']}")
+        # keine (verwertbare) Notification im Fenster -> einmal nachsehen
+        p = _get_report(account_id, enc_refresh_token, report_id)
+        metrics.REPORT_STATUS_CHECKS.labels(p.get("reportType") or "unknown").inc()
+        progress.emit("report_status", report_id=report_id, status=p.get("processingStatus"))
+        doc_id = _report_result(p)
+        if doc_id:
+            log.info("[reports] %s: DONE via fallback poll (no notification)", report_id)
+            metrics.REPORT_COMPLETION.labels(p.get("reportType") or "unknown", "poll").inc()
+            _record_timing(account_id, p, window_days)
+            return doc_id
+        if time.time() >= deadline:
+            raise TimeoutError(f"Report not DONE within {timeout:.0f}s (last={p.get('processingStatus')})")
+
+def _fmt_s(v: float | None) -> str:
+    return f"{v:.0f}s" if v is not None else "-"
+
+def _record_timing(account_id:int, p: Dict[str, Any], window_days: float | None = None) -> None:
+    """Laufzeit aus den Amazon-Zeitstempeln in die Historie (unabhängig vom Poll-Raster)."""
+    from . import report_eta
+    created, started, ended = (_parse_ts(p.get(k)) for k in ("createdTime", "processingStartTime", "processingEndTime"))
+    ds, de = _parse_ts(p.get("dataStartTime")), _parse_ts(p.get("dataEndTime"))
+    if ds and de:
+        window_days = (de - ds).total_seconds() / 86400
+    if not (p.get("reportType") and created and ended) or window_days is None:
+        return
+    report_eta.record(account_id, p["reportType"], window_days, max(0.0, (ended - created).total_seconds()),
+                      queue_s=(started - created).total_seconds() if started else None,
+                      processing_s=(ended - started).total_seconds() if started else None)
+
+def _parse_ts(v: str | None) -> datetime | None:
+    try:
+        return datetime.fromisoformat(v.replace("Z", "+00:00")) if v else None
+    except ValueError:
+        return None
+
+def _observe_report_timings(p: Dict[str, Any]) -> None:
+    """Queue- und Processing-Zeit aus den Report-Zeitstempeln (Amazon-seitig) in die Metriken."""
+    rt = p.get("reportType") or "unknown"
+    created, started, ended = (_parse_ts(p.get(k)) for k in ("createdTime", "processingStartTime", "processingEndTime"))
+    if created and started:
+        metrics.REPORT_QUEUE_WAIT.labels(rt).observe(max(0.0, (started - created).total_seconds()))
+    if started and ended:
+        metrics.REPORT_PROCESSING.labels(rt).observe(max(0.0, (ended - started).total_seconds()))
+
+def _download_document(url: str, compression: str | None = None, report_type: str = "unknown") -> bytes:
+    import httpx
+    b = circuit.breaker(SP_REGION, "downloadReportDocument")
+    b.before()
+    try:
+        r = _client().get(url)
+    except httpx.TransportError as e:
+        b.record(False, f"{type(e).__name__}: {e}")
+        raise
+    except Exception:
+        b.release()
+        raise
+    b.record(not circuit.is_failure(r.status_code), f"HTTP {r.status_code}")
+    r.raise_for_status()
+    data = r.content
+    metrics.REPORT_DOC_BYTES.labels(report_type).inc(len(data))
     # Viele FBA-Flatfiles sind GZIP-komprimiert
     if compression and compression.upper() == "GZIP":
         try:
@@ -66,108 +194,168 @@ def _download_document(url: str, compression: str | None = None) -> bytes:
             pass
     return data
 
-def _get_document_and_rows(account_id:int, enc_refresh_token:str, document_id:str) -> List[Dict[str, Any]]:
-    r = _sp_request(account_id, enc_refresh_token, "GET", f"/reports/2021-06-30/documents/{document_id}")
-    j = r.json()
+def _download_to_file(url: str, compression: str | None = None, report_type: str = "unknown") -> Tuple[str, int]:
+    """Dokument gestreamt in eine Temp-Datei (GZIP unterwegs entpackt). Rückgabe: (Pfad, geladene Bytes)."""
+    import httpx, tempfile, zlib
+    fd, path = tempfile.mkstemp(prefix="sp-report-", suffix=".txt")
+    b = circuit.breaker(SP_REGION, "downloadReportDocument")
+    loaded = 0
+    try:
+        b.before()
+        with os.fdopen(fd, "wb") as out:
+            try:
+                with _client().stream("GET", url) as r:
+                    b.record(not circuit.is_failure(r.status_code), f"HTTP {r.status_code}")
+                    r.raise_for_status()
+                    gz = zlib.decompressobj(16 + zlib.MAX_WBITS) if compression and compression.upper() == "GZIP" else None
+                    for chunk in r.iter_bytes(1 << 20):
+                        if gz is not None and not loaded and not chunk.startswith(b"\x1f\x8b"):
+                            gz = None  # als GZIP deklariert, aber unkomprimiert (wie gzip.decompress-Fallback)
+                        loaded += len(chunk)
+                        out.write(gz.decompress(chunk) if gz is not None else chunk)
+                    if gz is not None:
+                        out.write(gz.flush())
+            except httpx.TransportError as e:
+                b.record(False, f"{type(e).__name__}: {e}")
+                raise
+            except Exception:
+                b.release()  # ohne Aussage über die Gegenstelle (nach record() ohne Wirkung)
+                raise
+    except BaseException:
+        os.unlink(path)
+        raise
+    metrics.REPORT_DOC_BYTES.labels(report_type).inc(loaded)
+    return path, loaded
+
+def _document_url(account_id:int, enc_refresh_token:str, document_id:str) -> Tuple[str, str | None]:
+    j = _sp_request(account_id, enc_refresh_token, "GET", f"/reports/2021-06-30/documents/{document_id}").json()
     p = j.get("payload") or j
-    url = p["url"]
-    compression = p.get("compressionAlgorithm")
-    raw = _download_document(url, compression)
+    return p["url"], p.get("compressionAlgorithm")
 
-    text = raw.decode("utf-8", errors="replace")
-    sample = text[:2000]
-    try:
-        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
-    except Exception:
-        # einfache Heuristik für Tab vs. Komma
-        dialect = csv.excel_tab if sample.count("\t") > sample.count(",") else csv.excel
+def _get_document_and_rows(account_id:int, enc_refresh_token:str, document_id:str,
+                           report_type: str = "unknown") -> List[Dict[str, Any]]:
+    url, compression = _document_url(account_id, enc_refresh_token, document_id)
+    raw = _download_document(url, compression, report_type)
+    progress.emit("document_downloaded", report_type=report_type, bytes=len(raw))
 
-    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
-    rows = [dict(r) for r in reader]
-    print(f"[reports] doc rows={len(rows)} head={rows[:2]}")
+    rows = report_parse.parse_text(raw.decode("utf-8", errors="replace"))
+    metrics.REPORT_ROWS_PARSED.labels(report_type).inc(len(rows))
+    progress.emit("rows_parsed", report_type=report_type, rows=len(rows))
+    log.info("[reports] %s doc rows=%d bytes=%d", report_type, len(rows), len(raw))
+    log.debug("[reports] head=%s", rows[:2])
     return rows
 
-def _fetch_generic(account_id:int, enc_refresh_token:str, report_type:str,
-                   start:datetime, end:datetime, mk_ids: List[str] | None = None) -> List[Dict[str, Any]]:
-    rep_id = _create_report_tolerant(account_id, enc_refresh_token, report_type, start, end, mk_ids)
-    if not rep_id:
-        print(f"[reports] {report_type}: not allowed at this time – skipping.")
-        return []
-    doc_id = _wait_report_done(account_id, enc_refresh_token, rep_id)
-    rows = _get_document_and_rows(account_id, enc_refresh_token, doc_id)
-    return rows
+def _document_batches(account_id:int, enc_refresh_token:str, document_id:str,
+                      report_type: str) -> Iterator[List[Dict[str, Any]]]:
+    """Gemappte Zeilen in Batches, mit row_seq je Rohzeile (report_parse.number_duplicates)."""
+    return report_parse.number_duplicates(_parsed_batches(account_id, enc_refresh_token, document_id, report_type))
+
+def _parsed_batches(account_id:int, enc_refresh_token:str, document_id:str,
+                    report_type: str) -> Iterator[List[Dict[str, Any]]]:
+    """REPORT_PARSE_WORKERS > 1: große TSV-Dokumente parallel parsen."""
+    from .core.config import get_settings
+    s = get_settings()
+    mapper = MAPPERS[report_type]
+    batch = s.REPORT_PARSE_BATCH_ROWS
+    if s.REPORT_PARSE_WORKERS <= 1:
+        rows = _get_document_and_rows(account_id, enc_refresh_token, document_id, report_type)
+        for i in range(0, len(rows), batch):
+            yield [mapper(r) for r in rows[i:i + batch]]
+        return
+    url, compression = _document_url(account_id, enc_refresh_token, document_id)
+    path, loaded = _download_to_file(url, compression, report_type)
+    try:
+        size = os.path.getsize(path)
+        progress.emit("document_downloaded", report_type=report_type, bytes=loaded)
+        workers = s.REPORT_PARSE_WORKERS if size >= s.REPORT_PARSE_PARALLEL_MIN_MB << 20 else 0
+        total = 0
+        for part in report_parse.iter_file(path, mapper, workers, s.REPORT_PARSE_CHUNK_MB << 20, batch):
+            total += len(part)
+            metrics.REPORT_ROWS_PARSED.labels(report_type).inc(len(part))
+            yield part
+        progress.emit("rows_parsed", report_type=report_type, rows=total)
+        log.info("[reports] %s doc rows=%d bytes=%d unpacked=%d workers=%d", report_type, total, loaded, size, workers)
+    finally:
+        os.unlink(path)
+
+def iter_report_batches(account_id:int, enc_refresh_token:str, report_type:str,
+                        start:datetime, end:datetime, mk_ids: List[str] | None = None,
+                        sourced: List[SourcedReport] | None = None) -> Iterator[List[Dict[str, Any]]]:
+    """Gemappte Report-Zeilen (wie fetch_*_rows) in Batches, in Dokumentreihenfolge – zum Speichern je Batch.
+
+    sourced: jedes vollständig gelieferte Dokument wird mit seinem Datenfenster angehängt
+    (report_sourcing.covered_until() -> wie weit das Wasserzeichen vorrücken darf).
+    """
+    # Vorhandenen DONE-Report wiederverwenden (+ fehlende Ränder), sonst erzeugen (app/report_sourcing.py)
+    reports = source_report(account_id, enc_refresh_token, report_type, start, end, mk_ids)
+    if not reports:
+        log.warning("[reports] %s: not allowed at this time – skipping.", report_type)
+        return
+    for rep in reports:
+        yield from _document_batches(account_id, enc_refresh_token, rep.document_id, report_type)
+        if sourced is not None:
+            sourced.append(rep)
+
+def _fetch_mapped(account_id:int, enc_refresh_token:str, report_type:str,
+                  start:datetime, end:datetime) -> List[Dict[str, Any]]:
+    return [r for part in iter_report_batches(account_id, enc_refresh_token, report_type, start, end) for r in part]
 
 # ---------- Public helpers (werden in main.py genutzt) ----------
 
 def fetch_returns_rows(account_id:int, enc_refresh_token:str, start:datetime, end:datetime):
-    rows = _fetch_generic(account_id, enc_refresh_token, R_CUSTOMER_RETURNS, start, end)
-    out = []
-    for r in rows:
-        out.append({
-            "return_date": r.get("return-date") or r.get("return_date") or r.get("ReturnDate"),
-            "order_id": r.get("order-id") or r.get("order_id") or r.get("OrderId"),
-            "asin": r.get("asin") or r.get("ASIN"),
-            "sku": r.get("sku") or r.get("seller-sku") or r.get("SellerSKU"),
-            "disposition": r.get("disposition") or r.get("Disposition"),
-            "reason": r.get("reason") or r.get("Reason"),
-            "quantity": _to_int(r.get("quantity") or r.get("Quantity")),
-            "fc": r.get("fulfillment-center-id") or r.get("fc"),
-            "raw": r,
-        })
-    return out
+    return _fetch_mapped(account_id, enc_refresh_token, R_CUSTOMER_RETURNS, start, end)
 
 def fetch_removals_rows(account_id:int, enc_refresh_token:str, start:datetime, end:datetime):
-    rows = _fetch_generic(account_id, enc_refresh_token, R_REMOVALS, start, end)
-    out = []
-    for r in rows:
-        out.append({
-            "request_date": r.get("request-date") or r.get("request_date"),
-            "order_id": r.get("order-id") or r.get("order_id"),
-            "asin": r.get("asin") or r.get("ASIN"),
-            "sku": r.get("sku") or r.get("seller-sku") or r.get("SellerSKU"),
-            "quantity": _to_int(r.get("quantity")),
-            "disposition": r.get("disposition") or r.get("removal-disposition"),
-            "fc": r.get("fulfillment-center") or r.get("fc"),
-            "raw": r,
-        })
-    return out
+    return _fetch_mapped(account_id, enc_refresh_token, R_REMOVALS, start, end)
 
 def fetch_adjustments_rows(account_id:int, enc_refresh_token:str, start:datetime, end:datetime):
-    rows = _fetch_generic(account_id, enc_refresh_token, R_ADJUSTMENTS, start, end)
-    out = []
-    for r in rows:
-        out.append({
-            "date": r.get("date") or r.get("posted-date") or r.get("adjusted-date"),
-            "fnsku": r.get("fnsku"),
-            "sku": r.get("sku") or r.get("seller-sku"),
-            "asin": r.get("asin"),
-            "quantity": _to_int(r.get("quantity") or r.get("quantity-adjusted") or r.get("quantity_total")),
-            "reason": r.get("reason") or r.get("adjustment-type"),
-            "raw": r,
-        })
-    return out
+    return _fetch_mapped(account_id, enc_refresh_token, R_ADJUSTMENTS, start, end)
 
 def fetch_reimbursements_rows(account_id:int, enc_refresh_token:str, start:datetime, end:datetime):
-    rows = _fetch_generic(account_id, enc_refresh_token, R_REIMBURSEMENTS, start, end)
-    out = []
-    for r in rows:
-        out.append({
-            "reimbursed_date": r.get("reimbursed-date") or r.get("posted-date"),
-            "reason": r.get("reason-code") or r.get("reason"),
-            "amount": r.get("amount-per-unit") or r.get("amount-total") or r.get("amount"),
-            "currency": r.get("currency"),
-            "order_id": r.get("order-id") or r.get("order_id"),
-            "asin": r.get("asin"),
-            "sku": r.get("sku") or r.get("seller-sku"),
-            "raw": r,
-        })
-    return out
-
-def _to_int(v: Any) -> int | None:
+    return _fetch_mapped(account_id, enc_refresh_token, R_REIMBURSEMENTS, start, end)
+
+def _add_money(a: str | None, b: str | None) -> str | None:
     try:
-        return int(str(v).strip()) if v not in (None, "", "NA", "N/A") else None
-    except Exception:
-        return None
+        return str(Decimal(a) + Decimal(b)) if a and b else (a or b)
+    except InvalidOperation:
+        return a
+
+def group_order_rows(orders: Dict[str, dict], rows: Iterable[Dict[str, Any]]) -> None:
+    """Gemappte Orders-Report-Zeilen in `orders` einsortieren – Form wie sp_api.pull_orders."""
+    for r in rows:
+        oid = r["order_id"]
+        if not oid:
+            continue
+        o = orders.get(oid)
+        if o is None:
+            o = orders[oid] = {
+                "orderId": oid,
+                "purchaseDate": r["purchase_date"],
+                "lastUpdateDate": r["last_update_date"],
+                "status": r["status"],
+                "marketplaceId": _SALES_CHANNELS.get((r["sales_channel"] or "").lower()),
+                "items": [],
+            }
+        item = {"orderItemId": r["order_item_id"], "asin": r["asin"], "sku": r["sku"],
+                "qty": r["qty"], "price": r["price"], "currency": r["currency"]}
+        if item["orderItemId"] is None:
+            # ohne Positions-ID: gleiche SKU/ASIN zusammenfassen (sonst gewinnt beim Upsert die letzte Zeile)
+            same = next((it for it in o["items"] if it["orderItemId"] is None
+                         and (it["sku"], it["asin"]) == (item["sku"], item["asin"])), None)
+            if same is not None:
+                same["qty"] = (same["qty"] or 0) + (item["qty"] or 0)
+                same["price"] = _add_money(same["price"], item["price"])
+                continue
+        o["items"].append(item)
+
+def fetch_orders_report(account_id:int, enc_refresh_token:str, start:datetime, end:datetime,
+                        mk_ids: List[str] | None = None) -> List[Dict[str, Any]]:
+    """Orders (inkl. Items) eines Fensters aus einem Flatfile-Report statt getOrders/getOrderItems je Order."""
+    orders: Dict[str, dict] = {}
+    for batch in iter_report_batches(account_id, enc_refresh_token, R_ORDERS, start, end, mk_ids):
+        group_order_rows(orders, batch)
+    progress.emit("orders_fetched", orders=len(orders), via="report")
+    return list(orders.values())
 
 
 def _create_report_tolerant(account_id, enc_refresh_token, report_type, start, end, mk_ids=None):
@@ -178,29 +366,8 @@ def _create_report_tolerant(account_id, enc_refresh_token, report_type, start, e
     from datetime import timezone
     from .sp_api import EU_MK_IDS, _sp_request
 
-    # MWS-Style -> SP-API Style Mapping (inkl. pluraler Fehlvariante)
-    TYPE_MAP = {
-        "GET_LEDGER_DETAIL_VIEW_DATA": "GET_LEDGER_DETAIL_VIEW_DATA",
-        "GET_LEDGER_DETAIL_VIEW_DATA": "GET_LEDGER_DETAIL_VIEW_DATA",
-        "_GET_FBA_FULFILLMENT_CUSTOMER_RETURNS_DATA_": "GET_FBA_FULFILLMENT_CUSTOMER_RETURNS_DATA",
-        "_GET_FBA_FULFILLMENT_REMOVAL_ORDER_DETAIL_DATA_": "GET_FBA_FULFILLMENT_REMOVAL_ORDER_DETAIL_DATA",
-        "_GET_FBA_FULFILLMENT_REMOVALS_ORDER_DETAIL_DATA_": "GET_FBA_FULFILLMENT_REMOVAL_ORDER_DETAIL_DATA",  # fix plural
-        "_GET_FBA_REIMBURSEMENTS_DATA_": "GET_FBA_REIMBURSEMENTS_DATA",
-        "GET_LEDGER_DETAIL_VIEW_DATA": "GET_LEDGER_DETAIL_VIEW_DATA",
-    }
-
-    # Normalisieren
-    rt = TYPE_MAP.get(str(report_type).strip(), str(report_type).strip())
-    # „REMOVALS“ Tippfehler → „REMOVAL“
-    rt = rt.replace("REMOVALS_ORDER_DETAIL_DATA", "REMOVAL_ORDER_DETAIL_DATA")
-    # Führende/abschließende Unterstriche entfernen
-    if rt.startswith("_") and rt.endswith("_"):
-        rt = rt.strip("_")
-    # Sicherheitshalber upper-case
-    rt = rt.upper()
-
-    if rt == "GET_LEDGER_DETAIL_VIEW_DATA":
-        rt = "GET_LEDGER_DETAIL_VIEW_DATA"
+    # MWS-Style / Plural-Tippfehler -> SP-API-Typ
+    rt = normalize_report_type(report_type)
     def _iso(dt):
         if dt.tzinfo is None:
             dt = dt.replace(tzinfo=timezone.utc)
@@ -219,7 +386,13 @@ def _create_report_tolerant(account_id, enc_refresh_token, report_type, start, e
         "dataEndTime": _iso(end),
     }
 
-    resp = _sp_request(account_id, enc_refresh_token, "POST", "/reports/2021-06-30/reports", body=body)
+    try:
+        resp = _sp_request(account_id, enc_refresh_token, "POST", "/reports/2021-06-30/reports", body=body)
+    except RuntimeError as e:
+        # _sp_request wirft bei 4xx – "not allowed at this time" ist aber kein Fehler, nur Überspringen
+        if "not allowed at this time" in str(e).lower():
+            return None
+        raise
     try:
         j = resp.json()
     except Exception:
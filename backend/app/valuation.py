@@ -0,0 +1,131 @@
+"""Bewertung je SKU für offene Recon-Fälle: Verkaufs- und Erstattungswerte, inkrementell gepflegt.
+
+sku_valuations hält je (Account, SKU, Währung, Monat) Summen verkaufter bzw. erstatteter
+Einheiten und Beträge. Ingest trägt nur Deltas ein (store_orders: Items vorher/nachher der
+geänderten Orders, store_report_rows: neu eingefügte Erstattungen), Recon liest per
+PK-Lookup den rollierenden Durchschnitt der letzten SKU_VALUATION_MONTHS Monate:
+
+    Wert je Einheit = Ø Erstattung je Einheit, sonst Ø Verkaufspreis je Einheit
+
+rebuild() rechnet aus order_items/fba_reimbursements neu (Erstbefüllung, COPY-Importe).
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from .core.config import get_settings
+from .models import SkuValuation
+
+# (sku, currency, month) -> [sold_units, sold_amount, reimbursed_units, reimbursed_amount]
+Key = Tuple[str, str, date]
+Deltas = Dict[Key, List]
+
+_ITEM_TOTALS_SQL = text("""
+SELECT i.sku, i.currency, date_trunc('month', o.purchase_date)::date AS month,
+       sum(i.qty) AS units, sum(i.price_amount) AS amount
+FROM order_items i
+JOIN orders o ON o.account_id = i.account_id AND o.order_id = i.order_id
+WHERE i.account_id = :acc AND i.order_id = ANY(:ids)
+  AND i.sku IS NOT NULL AND i.currency IS NOT NULL AND i.qty > 0 AND i.price_amount IS NOT NULL
+  AND o.purchase_date IS NOT NULL
+GROUP BY 1, 2, 3
+""")
+
+def item_totals(db: Session, account_id: int, order_ids: Iterable[str]) -> Dict[Key, Tuple[int, Decimal]]:
+    """Verkaufte Einheiten/Beträge der Items dieser Orders je (SKU, Währung, Monat)."""
+    rows = db.execute(_ITEM_TOTALS_SQL, {"acc": account_id, "ids": list(order_ids)}).all()
+    return {(r.sku, r.currency, r.month): (int(r.units), r.amount) for r in rows}
+
+def sales_deltas(before: Dict[Key, Tuple[int, Decimal]], after: Dict[Key, Tuple[int, Decimal]]) -> Deltas:
+    out: Deltas = {}
+    for key in before.keys() | after.keys():
+        u0, a0 = before.get(key, (0, Decimal(0)))
+        u1, a1 = after.get(key, (0, Decimal(0)))
+        if u0 != u1 or a0 != a1:
+            out[key] = [u1 - u0, a1 - a0, 0, Decimal(0)]
+    return out
+
+def reimbursement_deltas(rows: Iterable) -> Deltas:
+    """Neu eingefügte fba_reimbursements-Zeilen (sku, currency, posted_date, quantity, amount)."""
+    out: Deltas = {}
+    for sku, currency, posted, qty, amount in rows:
+        if not (sku and currency and posted and qty and qty > 0):
+            continue  # reine Geld-Erstattungen ohne Einheiten taugen nicht für den Stückwert
+        d = out.setdefault((sku, currency, posted.date().replace(day=1)), [0, Decimal(0), 0, Decimal(0)])
+        d[2] += qty
+        d[3] += amount or 0
+    return out
+
+def apply(db: Session, account_id: int, deltas: Deltas) -> None:
+    """Deltas aufaddieren (Upsert). Sortiert, damit parallele Writer (Backfill) nicht verklemmen."""
+    if not deltas:
+        return
+    t = SkuValuation.__table__
+    rows = [dict(account_id=account_id, sku=sku, currency=cur, month=month,
+                 sold_units=d[0], sold_amount=d[1], reimbursed_units=d[2], reimbursed_amount=d[3])
+            for (sku, cur, month), d in sorted(deltas.items())]
+    stmt = pg_insert(t).values(rows)
+    ex = stmt.excluded
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[t.c.account_id, t.c.sku, t.c.currency, t.c.month],
+        set_={c: t.c[c] + ex[c] for c in ("sold_units", "sold_amount", "reimbursed_units", "reimbursed_amount")}
+             | {"updated_at": text("now()")},
+    ))
+
+_REBUILD_SQL = """
+INSERT INTO sku_valuations (account_id, sku, currency, month, sold_units, sold_amount, reimbursed_units, reimbursed_amount)
+SELECT account_id, sku, currency, month, sum(su), sum(sa), sum(ru), sum(ra) FROM (
+  SELECT i.account_id, i.sku, i.currency, date_trunc('month', o.purchase_date)::date AS month,
+         sum(i.qty) AS su, sum(i.price_amount) AS sa, 0 AS ru, 0 AS ra
+  FROM order_items i JOIN orders o ON o.account_id = i.account_id AND o.order_id = i.order_id
+  WHERE i.sku IS NOT NULL AND i.currency IS NOT NULL AND i.qty > 0 AND i.price_amount IS NOT NULL
+    AND o.purchase_date IS NOT NULL {acc_i}
+  GROUP BY 1, 2, 3, 4
+  UNION ALL
+  SELECT account_id, sku, currency, date_trunc('month', posted_date)::date, 0, 0, sum(quantity), sum(amount)
+  FROM fba_reimbursements
+  WHERE sku IS NOT NULL AND currency IS NOT NULL AND quantity > 0 AND posted_date IS NOT NULL {acc}
+  GROUP BY 1, 2, 3, 4
+) s
+GROUP BY 1, 2, 3, 4
+"""
+
+def rebuild(db: Session, account_id: Optional[int] = None) -> int:
+    """Bewertung (eines Accounts) komplett aus den Quelltabellen neu aufbauen. Rückgabe: Zeilen."""
+    where = "" if account_id is None else "AND account_id = :acc"
+    params = {} if account_id is None else {"acc": account_id}
+    db.execute(text(f"DELETE FROM sku_valuations WHERE true {where}"), params)
+    n = db.execute(text(_REBUILD_SQL.format(acc=where, acc_i=where.replace("account_id", "i.account_id"))),
+                   params).rowcount
+    db.commit()
+    return n
+
+_UNIT_VALUES_SQL = text("""
+SELECT DISTINCT ON (sku) sku, currency,
+       CASE WHEN sum(reimbursed_units) > 0 THEN sum(reimbursed_amount) / sum(reimbursed_units)
+            ELSE sum(sold_amount) / NULLIF(sum(sold_units), 0) END AS unit_value
+FROM sku_valuations
+WHERE account_id = :acc AND sku = ANY(:skus) AND month >= :since
+GROUP BY sku, currency
+ORDER BY sku, sum(sold_units) + sum(reimbursed_units) DESC
+""")
+
+class UnitValue(NamedTuple):
+    value: Decimal
+    currency: str
+
+def unit_values(db: Session, account_id: int, skus: Iterable[str], as_of: datetime) -> Dict[str, UnitValue]:
+    """Wert je Einheit für die SKUs, in ihrer Hauptwährung (meiste Einheiten im Fenster)."""
+    skus = [s for s in set(skus) if s]
+    if not skus:
+        return {}
+    months = get_settings().SKU_VALUATION_MONTHS
+    y, m = divmod(as_of.year * 12 + as_of.month - 1 - (months - 1), 12)
+    rows = db.execute(_UNIT_VALUES_SQL, {"acc": account_id, "skus": skus, "since": date(y, m + 1, 1)}).all()
+    return {r.sku: UnitValue(r.unit_value, r.currency) for r in rows if r.unit_value is not None}
@@ -0,0 +1,78 @@
+"""KPI-Abfragen über den Parquet-Export (DuckDB): 12 Monate eines synthetischen Accounts.
+
+Budget je KPI-Abfrage: KPI_BUDGET_MS (Median, Default 250 ms). Außerdem: voller Export,
+inkrementeller Export ohne Änderungen (muss 0 Partitionen schreiben), der
+SKU-Bewertungs-Lookup für open_amount und ein kompletter Recon-Lauf (Aggregation über catalog_id).
+"""
+import argparse
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import analytics, catalog, models, services, valuation
+from app.cli import synthdata
+from app.core.config import get_settings
+from conftest import ACCOUNT_ID, truncate
+
+KPI_BUDGET_MS = float(os.getenv("KPI_BUDGET_MS", "250"))
+DAYS = int(os.getenv("BENCH_ANALYTICS_DAYS", "365"))
+D_TO = date.today()
+D_FROM = D_TO - timedelta(days=DAYS)
+
+@pytest.fixture(scope="module")
+def analytics_data(db_engine, tmp_path_factory):
+    tables = [models.CatalogItem.__table__] + [models.Base.metadata.tables[t] for t in synthdata.COLUMNS] + [
+        models.AnalyticsExport.__table__, models.SkuValuation.__table__]
+    models.Base.metadata.create_all(bind=db_engine, tables=tables)
+    truncate(db_engine, *synthdata.COLUMNS, "analytics_exports", "analytics_export_marks", "sku_valuations")
+    args = argparse.Namespace(seed=1, skus=2000, days=DAYS, end=datetime.utcnow(),
+                              orders_per_day=int(os.getenv("BENCH_ANALYTICS_ORDERS_PER_DAY", "200")),
+                              flush_rows=50_000)
+    written = synthdata._worker([ACCOUNT_ID], {ACCOUNT_ID: ["DE", "FR", "IT"]}, args)
+    with Session(db_engine) as s:
+        catalog.backfill(s, ACCOUNT_ID)
+        valuation.rebuild(s, ACCOUNT_ID)
+    mp = pytest.MonkeyPatch()
+    mp.setattr(get_settings(), "ANALYTICS_DIR", str(tmp_path_factory.mktemp("analytics")))
+    yield written
+    mp.undo()
+    truncate(db_engine, *synthdata.COLUMNS, "analytics_exports", "analytics_export_marks", "sku_valuations")
+
+def test_export_full(benchmark, analytics_data, db):
+    out = benchmark.pedantic(analytics.export, args=(db, ACCOUNT_ID), rounds=1, iterations=1)
+    assert out["order_items"] > 0
+    benchmark.extra_info.update(partitions=out, source_rows=analytics_data)
+
+def test_export_unchanged(benchmark, analytics_data, db):
+    analytics.export(db, ACCOUNT_ID)
+    out = benchmark.pedantic(analytics.export, args=(db, ACCOUNT_ID), rounds=3)
+    assert not any(out.values()), out
+
+@pytest.mark.parametrize("kpi", ["return_rates", "removal_volumes", "reimbursements_by_reason", "trend"])
+def test_kpi_query(benchmark, analytics_data, db, kpi):
+    analytics.export(db, ACCOUNT_ID)
+    fn = getattr(analytics, kpi)
+    rows = benchmark.pedantic(fn, args=(ACCOUNT_ID, D_FROM, D_TO), rounds=10, warmup_rounds=1)
+    assert rows
+    if benchmark.stats:  # None mit --benchmark-disable
+        median_ms = benchmark.stats.stats.median * 1000
+        benchmark.extra_info["median_ms"] = round(median_ms, 2)
+        assert median_ms <= KPI_BUDGET_MS, f"{kpi} took {median_ms:.0f}ms (budget {KPI_BUDGET_MS:.0f}ms)"
+
+def test_unit_value_lookup(benchmark, analytics_data, db):
+    skus = db.execute(select(models.OrderItem.sku).where(models.OrderItem.account_id == ACCOUNT_ID)
+                      .distinct()).scalars().all()
+    values = benchmark.pedantic(valuation.unit_values, args=(db, ACCOUNT_ID, skus, datetime.utcnow()),
+                                rounds=10, warmup_rounds=1)
+    assert values
+    benchmark.extra_info.update(skus=len(skus), valued=len(values))
+
+def test_reconcile_account(benchmark, analytics_data, db):
+    date_to = datetime.utcnow()
+    n = benchmark.pedantic(services.reconcile_account, args=(db, ACCOUNT_ID, date_to - timedelta(days=DAYS), date_to),
+                           rounds=3, warmup_rounds=1)
+    assert n
+    benchmark.extra_info["skus"] = n
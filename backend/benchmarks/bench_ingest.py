@@ -0,0 +1,58 @@
+"""Durchsatz der Ingestion gegen den Mock: SP-API-Pfade und Persistenz in Postgres.
+
+Die Persistenz-Benchmarks laufen nur mit BENCH_DATABASE_URL (sonst skip).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import services, sp_api
+from app import sp_api_reports_patch as reports
+from conftest import ACCOUNT_ID, truncate
+
+END = datetime.utcnow() - timedelta(minutes=5)
+START = END - timedelta(days=30)
+
+FETCHERS = {
+    reports.R_CUSTOMER_RETURNS: reports.fetch_returns_rows,
+    reports.R_REMOVALS: reports.fetch_removals_rows,
+    reports.R_ADJUSTMENTS: reports.fetch_adjustments_rows,
+    reports.R_REIMBURSEMENTS: reports.fetch_reimbursements_rows,
+}
+REPORT_TABLES = {
+    reports.R_CUSTOMER_RETURNS: "fba_returns",
+    reports.R_REMOVALS: "fba_removals",
+    reports.R_ADJUSTMENTS: "fba_inventory_adjustments",
+    reports.R_REIMBURSEMENTS: "fba_reimbursements",
+}
+
+def _pull_orders(refresh_token):
+    return sp_api.pull_orders({"marketplaces": "DE"}, ACCOUNT_ID, refresh_token, START, END)
+
+def test_pull_orders(benchmark, mock_sp_api, refresh_token):
+    orders = benchmark(_pull_orders, refresh_token)
+    assert orders and all(o["items"] for o in orders)
+    benchmark.extra_info["orders"] = len(orders)
+
+@pytest.mark.parametrize("report_type", list(FETCHERS))
+def test_fetch_report_rows(benchmark, mock_sp_api, mock_config, refresh_token, report_type):
+    rows = benchmark.pedantic(FETCHERS[report_type], args=(ACCOUNT_ID, refresh_token, START, END),
+                              rounds=5, warmup_rounds=1)
+    assert len(rows) == mock_config.report_rows
+    benchmark.extra_info["rows"] = len(rows)
+
+def test_store_orders(benchmark, mock_sp_api, refresh_token, db, db_engine):
+    orders = _pull_orders(refresh_token)
+    setup = lambda: truncate(db_engine, "orders", "order_items", "sku_valuations")
+    n = benchmark.pedantic(services.store_orders, args=(db, ACCOUNT_ID, orders), setup=setup, rounds=5)
+    assert n == len(orders)
+    benchmark.extra_info["orders"] = n
+
+@pytest.mark.parametrize("report_type", list(FETCHERS))
+def test_store_report_rows(benchmark, mock_sp_api, refresh_token, db, db_engine, report_type):
+    rows = FETCHERS[report_type](ACCOUNT_ID, refresh_token, START, END)
+    setup = lambda: truncate(db_engine, REPORT_TABLES[report_type], "sku_valuations")
+    n = benchmark.pedantic(services.store_report_rows, args=(db, ACCOUNT_ID, report_type, rows),
+                           setup=setup, rounds=3)
+    assert n == len(rows)
+    benchmark.extra_info["rows"] = n
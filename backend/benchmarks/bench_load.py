@@ -0,0 +1,254 @@
+"""Lasttest der Web-Schicht: virtuelle Nutzer gegen eine laufende Instanz, p50/p95/p99 + Durchsatz, SLO-Check.
+
+Jeder virtuelle Nutzer hat eine eigene Session (Login zu Beginn) und wählt je Iteration
+ein Szenario nach Gewicht (--mix), danach Denkzeit (--think-ms, exponentiell verteilt):
+
+    dashboard  GET /ui, Fragmente accounts/orders und 1–3 Account-Order-Listen (wie der Browser)
+    listing    whoami, Report-Wasserzeichen, SP-API-Status, KPI-Trend
+    login      erneuter POST /api/login (bcrypt unter Last)
+    jobs       POST /api/ops/recon (läuft je Account nur einmal) + Status-Polls bis fertig
+
+Vorbereitung – lokaler Stack mit synthetischen Daten und Lastnutzern load01..loadNN:
+
+    cd backend && python -m app.cli.synthdata --accounts 5 --days 90 --users 20 --user-password load
+    uvicorn app.main:app --port 8088 --workers 1
+
+    python benchmarks/bench_load.py --url http://localhost:8088 --users 20 --duration 60 \\
+        --identifier-prefix load --password load --json load.json
+
+SLOs (Perzentile in ms, Fehlerquote, Mindestdurchsatz) aus --slo (Default: bench_load_slo.json
+daneben), einzeln übersteuerbar: --set ui.shell.p95_ms=50. Exit-Code 1 bei Verletzung.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+DEFAULT_SLO = Path(__file__).with_name("bench_load_slo.json")
+SCENARIOS = ("dashboard", "listing", "login", "jobs")
+_ACCOUNT_ORDERS = re.compile(r'hx-get="(/ui/fragments/accounts/(\d+)/orders)"')
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+class Stats:
+    def __init__(self) -> None:
+        self.lat: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[int, int] = defaultdict(int)
+        self.recording = False
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kw) -> httpx.Response | None:
+        t0 = time.perf_counter()
+        try:
+            r = await client.request(method, url, **kw)
+        except httpx.HTTPError:
+            if self.recording:
+                self.lat[name].append(time.perf_counter() - t0)
+                self.errors[name] += 1
+            return None
+        if self.recording:
+            self.lat[name].append(time.perf_counter() - t0)
+            self.statuses[r.status_code] += 1
+            if r.status_code >= 400:
+                self.errors[name] += 1
+        return r
+
+    def summary(self, wall: float) -> dict[str, dict]:
+        out = {}
+        everything = [v for vs in self.lat.values() for v in vs]
+        for name, lat in sorted(self.lat.items()) + [("_total", everything)]:
+            ms = [v * 1000 for v in lat]
+            err = sum(self.errors.values()) if name == "_total" else self.errors[name]
+            out[name] = {"n": len(ms), "errors": err, "error_rate": err / len(ms) if ms else 0.0,
+                         "rps": len(ms) / wall if wall else 0.0,
+                         "p50_ms": _pct(ms, 50), "p95_ms": _pct(ms, 95), "p99_ms": _pct(ms, 99),
+                         "max_ms": max(ms, default=0.0), "mean_ms": statistics.fmean(ms) if ms else 0.0}
+        return out
+
+# ---------- Szenarien ----------
+
+def keep_session(client: httpx.AsyncClient, login: httpx.Response) -> None:
+    """Session-Cookie ist Secure (https_only) – gegen einen lokalen http://-Stack explizit mitsenden."""
+    if client.base_url.scheme == "http" and "session" in login.cookies:
+        client.headers["Cookie"] = f"session={login.cookies['session']}"
+
+class User:
+    def __init__(self, args: argparse.Namespace, stats: Stats, i: int, accounts: list[int]):
+        self.args, self.stats, self.accounts = args, stats, accounts
+        self.identifier = f"{args.identifier_prefix}{i % args.identities + 1:02d}" if args.identifier_prefix else args.identifier
+        self.client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, follow_redirects=False)
+
+    async def login(self) -> bool:
+        r = await self.stats.call(self.client, "login", "POST", "/api/login",
+                                  json={"identifier": self.identifier, "password": self.args.password})
+        if r is None or r.status_code != 200:
+            return False
+        keep_session(self.client, r)
+        return True
+
+    async def dashboard(self) -> None:
+        await self.stats.call(self.client, "ui.shell", "GET", "/ui")
+        # Browser lädt die load-Fragmente parallel, die revealed-Teile beim Scrollen
+        _, orders = await asyncio.gather(
+            self.stats.call(self.client, "ui.accounts", "GET", "/ui/fragments/accounts"),
+            self.stats.call(self.client, "ui.orders", "GET", "/ui/fragments/orders"))
+        paths = [m.group(1) for m in _ACCOUNT_ORDERS.finditer(orders.text if orders is not None else "")]
+        for path in random.sample(paths, min(len(paths), random.randint(1, 3))):
+            await self.stats.call(self.client, "ui.account_orders", "GET", path)
+
+    async def listing(self) -> None:
+        acc = random.choice(self.accounts)
+        await self.stats.call(self.client, "api.whoami", "GET", "/api/whoami")
+        await self.stats.call(self.client, "api.watermarks", "GET", "/api/reports/watermarks", params={"account_id": acc})
+        await self.stats.call(self.client, "api.sp_status", "GET", "/api/sp-api/status")
+        await self.stats.call(self.client, "api.kpi_trend", "GET", "/api/kpi/trend",
+                              params={"account_id": acc, "grain": "month"})
+
+    async def jobs(self) -> None:
+        r = await self.stats.call(self.client, "ops.start", "POST", f"/api/ops/{self.args.job}",
+                                  params={"account_id": random.choice(self.accounts)})
+        if r is None or r.status_code != 200:
+            return
+        op_id = r.json().get("op_id")
+        deadline = time.monotonic() + self.args.job_wait
+        while op_id and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+            s = await self.stats.call(self.client, "ops.status", "GET", f"/api/ops/{op_id}")
+            if s is None or s.status_code != 200 or s.json().get("status") != "running":
+                return
+
+    async def run(self, stop: asyncio.Event, weights: dict[str, float]) -> None:
+        names, w = list(weights), list(weights.values())
+        try:
+            if not await self.login():
+                return
+            while not stop.is_set():
+                await getattr(self, random.choices(names, w)[0])()
+                think = random.expovariate(1000 / self.args.think_ms) if self.args.think_ms else 0
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=think)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.client.aclose()
+
+# ---------- SLOs ----------
+
+def load_slo(path: Path | None, overrides: list[str]) -> dict[str, dict[str, float]]:
+    slo: dict[str, dict[str, float]] = json.loads(path.read_text()) if path and path.exists() else {}
+    for item in overrides:
+        key, _, value = item.partition("=")
+        name, _, metric = key.rpartition(".")
+        slo.setdefault(name, {})[metric] = float(value)
+    return slo
+
+def check_slo(summary: dict[str, dict], slo: dict[str, dict[str, float]]) -> list[str]:
+    """Verletzungen als Text. '*' gilt für jeden Request-Namen, '_total' für alle zusammen."""
+    out = []
+    for name, res in summary.items():
+        if not res["n"]:
+            continue
+        limits = dict(slo.get("*", {})) if name != "_total" else {}
+        limits.update(slo.get(name, {}))
+        for metric, limit in limits.items():
+            if metric.startswith("min_"):
+                value = res.get(metric[4:])
+                if value is not None and value < limit:
+                    out.append(f"{name}: {metric[4:]}={value:.1f} < {limit:g}")
+                continue
+            value = res.get(metric)
+            if value is not None and value > limit:
+                out.append(f"{name}: {metric}={value:.{1 if metric.endswith('_ms') else 3}f} > {limit:g}")
+    return out
+
+# ---------- Ablauf ----------
+
+async def discover_accounts(args: argparse.Namespace) -> list[int]:
+    if args.account:
+        return args.account
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as c:
+        ident = f"{args.identifier_prefix}01" if args.identifier_prefix else args.identifier
+        r = await c.post("/api/login", json={"identifier": ident, "password": args.password})
+        r.raise_for_status()
+        keep_session(c, r)
+        html = (await c.get("/ui/fragments/orders")).text
+    ids = sorted({int(m.group(2)) for m in _ACCOUNT_ORDERS.finditer(html)})
+    if not ids:
+        raise SystemExit("no active accounts found – seed with app.cli.synthdata or pass --account")
+    return ids
+
+async def main(args: argparse.Namespace) -> int:
+    weights = {k: float(v) for k, _, v in (p.partition("=") for p in args.mix.split(",")) if float(v) > 0}
+    unknown = set(weights) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    accounts = await discover_accounts(args)
+    stats, stop = Stats(), asyncio.Event()
+    users = [User(args, stats, i, accounts) for i in range(args.users)]
+
+    async def start(i: int, u: User) -> None:
+        await asyncio.sleep(args.ramp_up * i / max(1, args.users))  # gestaffelter Start
+        await u.run(stop, weights)
+
+    tasks = [asyncio.create_task(start(i, u)) for i, u in enumerate(users)]
+    await asyncio.sleep(args.ramp_up)
+    stats.recording = True   # erst nach dem Ramp-up messen
+    t0 = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    wall = time.perf_counter() - t0
+    stats.recording = False
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    summary = stats.summary(wall)
+    print(f"{args.users} users, {wall:.0f}s, accounts={accounts}, mix={weights}")
+    print(f"{'request':<18} {'n':>6} {'err':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, s in summary.items():
+        print(f"{name:<18} {s['n']:>6} {s['errors']:>5} {s['rps']:>7.1f} {s['p50_ms']:>6.1f}ms "
+              f"{s['p95_ms']:>6.1f}ms {s['p99_ms']:>6.1f}ms {s['max_ms']:>6.1f}ms")
+    print("status:", dict(sorted(stats.statuses.items())))
+
+    slo = load_slo(args.slo, args.set)
+    violations = check_slo(summary, slo)
+    for v in violations:
+        print("SLO violated:", v)
+    if not violations and slo:
+        print("SLOs met")
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "users": args.users, "duration_s": wall, "mix": weights, "results": summary,
+            "slo": slo, "violations": violations}, indent=2))
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://localhost:8088")
+    ap.add_argument("--identifier", default="admin", help="ein Login für alle Nutzer")
+    ap.add_argument("--identifier-prefix", help="je Nutzer eigener Login <prefix>01..NN (synthdata --users)")
+    ap.add_argument("--identities", type=int, default=20, help="Anzahl Logins bei --identifier-prefix")
+    ap.add_argument("--password", required=True)
+    ap.add_argument("--users", type=int, default=20, help="gleichzeitige virtuelle Nutzer")
+    ap.add_argument("--duration", type=float, default=60, help="Messdauer in s (nach dem Ramp-up)")
+    ap.add_argument("--ramp-up", type=float, default=5)
+    ap.add_argument("--think-ms", type=float, default=500, help="mittlere Denkzeit zwischen Szenarien")
+    ap.add_argument("--mix", default="dashboard=6,listing=3,login=1,jobs=0.5")
+    ap.add_argument("--job", default="recon", choices=["recon", "reports-pull", "orders-sync"])
+    ap.add_argument("--job-wait", type=float, default=30, help="max. Sekunden Status-Polling je Job")
+    ap.add_argument("--account", type=int, action="append", help="Account-IDs (Default: alle aktiven)")
+    ap.add_argument("--timeout", type=float, default=30)
+    ap.add_argument("--slo", type=Path, default=DEFAULT_SLO)
+    ap.add_argument("--set", action="append", default=[], metavar="NAME.METRIC=VALUE")
+    ap.add_argument("--json", help="Ergebnis + SLO-Check als JSON (Vergleich zwischen Läufen)")
+    raise SystemExit(asyncio.run(main(ap.parse_args())))
@@ -0,0 +1,75 @@
+"""Login-Latenz unter paralleler Last (p50/p95/p99).
+
+Feuert N parallele POST /api/login gegen eine laufende Instanz und misst
+gleichzeitig die Latenz eines billigen Endpoints (GET /login). Bleibt diese
+niedrig, blockiert bcrypt den Event-Loop nicht mehr.
+
+Das Login-Throttling zählt jeden Versuch je Identifier – für den Lauf entweder
+mehrere --identifier angeben oder den Server mit hohem LOGIN_MAX_ATTEMPTS starten.
+
+    python benchmarks/bench_login.py --url http://localhost:8088 \
+        --identifier admin --password secret --concurrency 50 --requests 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+def _report(name: str, lat: list[float], wall: float) -> None:
+    ms = [v * 1000 for v in lat]
+    print(f"{name:<8} n={len(ms):<5} rps={len(ms) / wall:7.1f}  "
+          f"p50={_pct(ms, 50):7.1f}ms  p95={_pct(ms, 95):7.1f}ms  p99={_pct(ms, 99):7.1f}ms  "
+          f"max={max(ms, default=0):7.1f}ms  mean={statistics.fmean(ms) if ms else 0:7.1f}ms")
+
+async def main(args: argparse.Namespace) -> None:
+    login_lat: list[float] = []
+    probe_lat: list[float] = []
+    statuses: dict[int, int] = {}
+    sem = asyncio.Semaphore(args.concurrency)
+    done = asyncio.Event()
+
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30, limits=limits) as client:
+        async def one(i: int) -> None:
+            async with sem:
+                ident = args.identifier[i % len(args.identifier)]
+                t0 = time.perf_counter()
+                r = await client.post("/api/login", json={"identifier": ident, "password": args.password})
+                login_lat.append(time.perf_counter() - t0)
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        async def probe() -> None:
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await client.get("/login")
+                probe_lat.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.05)
+
+        probe_task = asyncio.create_task(probe())
+        t_start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        wall = time.perf_counter() - t_start
+        done.set()
+        await probe_task
+
+    _report("login", login_lat, wall)
+    _report("probe", probe_lat, wall)
+    print("status:", dict(sorted(statuses.items())))
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://localhost:8088")
+    ap.add_argument("--identifier", action="append", required=True)
+    ap.add_argument("--password", required=True)
+    ap.add_argument("--concurrency", type=int, default=50)
+    ap.add_argument("--requests", type=int, default=500)
+    asyncio.run(main(ap.parse_args()))
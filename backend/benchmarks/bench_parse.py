@@ -0,0 +1,41 @@
+"""Parsing großer Report-Dokumente: sequentiell vs. Prozess-Pool (app/report_parse.py).
+
+Läuft ohne Mock-Server und Datenbank auf einem entpackten Ledger-Dokument mit
+PARSE_BENCH_ROWS Zeilen. Der Speedup hängt an den verfügbaren Kernen
+(PARSE_BENCH_WORKERS, Default: alle, mindestens 2); geprüft wird immer, dass beide
+Pfade dieselben Zeilen in derselben Reihenfolge liefern.
+"""
+import gzip
+import os
+
+import pytest
+
+from app import report_parse
+from app.sp_api_reports_patch import R_ADJUSTMENTS
+from mock_sp_api import build_document
+
+ROWS = int(os.getenv("PARSE_BENCH_ROWS", "200000"))
+WORKERS = int(os.getenv("PARSE_BENCH_WORKERS", str(max(2, os.cpu_count() or 1))))
+CHUNK = 1 << 20
+
+@pytest.fixture(scope="module")
+def document(tmp_path_factory):
+    path = tmp_path_factory.mktemp("parse") / "ledger.tsv"
+    path.write_bytes(gzip.decompress(build_document(R_ADJUSTMENTS, ROWS)))
+    return str(path)
+
+def _parse(path, workers):
+    return [r for batch in report_parse.iter_file(path, report_parse.map_adjustments, workers, CHUNK) for r in batch]
+
+@pytest.fixture(scope="module")
+def expected(document):
+    return _parse(document, 0)
+
+@pytest.mark.parametrize("workers", [0, WORKERS], ids=["sequential", "parallel"])
+def test_parse_document(benchmark, document, expected, workers):
+    if workers:
+        _parse(document, workers)  # Pool starten (spawn) – nicht Teil der Messung
+    rows = benchmark.pedantic(_parse, args=(document, workers), rounds=3)
+    assert rows == expected
+    assert len(rows) == ROWS
+    benchmark.extra_info.update(rows=len(rows), workers=workers, mb=round(os.path.getsize(document) / 2**20, 1))
@@ -0,0 +1,52 @@
+"""Kaltstart-Budget: `import app.main` in einem frischen Interpreter.
+
+Gemessen wird getrennt: Framework (FastAPI/SQLAlchemy, nicht beeinflussbar) und der
+Anteil der App selbst. Budgets: STARTUP_APP_IMPORT_BUDGET_MS (App-Anteil) und
+STARTUP_IMPORT_BUDGET_MS (gesamt). Außerdem: keine schweren Module beim Import und
+Import ohne erreichbare Datenbank (kein DDL/Connect).
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+APP_BUDGET_MS = float(os.getenv("STARTUP_APP_IMPORT_BUDGET_MS", "300"))
+TOTAL_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1000"))
+# Dürfen erst beim ersten Gebrauch geladen werden
+DEFERRED = ("botocore", "boto3", "sp_api", "httpx", "passlib", "bcrypt", "cryptography.fernet", "duckdb", "pyarrow",
+            "asyncpg", "jinja2", "concurrent.futures.process")
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import fastapi, fastapi.routing, starlette.middleware.sessions, sqlalchemy.orm, sqlalchemy.ext.asyncio, pydantic_settings
+t1 = time.perf_counter()
+import app.main
+t2 = time.perf_counter()
+print(json.dumps({"framework_ms": (t1 - t0) * 1000, "app_ms": (t2 - t1) * 1000,
+                  "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+def _cold_import() -> dict:
+    env = dict(os.environ,
+               # Port 1: jede Verbindung beim Import würde sofort fehlschlagen
+               DATABASE_URL="postgresql+psycopg2://nobody@127.0.0.1:1/none",
+               SESSION_SECRET="bench", STARTUP_PREWARM="0")
+    env.pop("ASYNC_DATABASE_URL", None)
+    out = subprocess.run([sys.executable, "-c", _PROBE % (DEFERRED,)], cwd=BACKEND, env=env,
+                         capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def test_import_time_budget(benchmark):
+    _cold_import()  # .pyc schreiben, Page-Cache füllen
+    runs = []
+    benchmark.pedantic(lambda: runs.append(_cold_import()), rounds=5)
+    app_ms = min(r["app_ms"] for r in runs)
+    total_ms = min(r["app_ms"] + r["framework_ms"] for r in runs)
+    benchmark.extra_info.update(app_import_ms=round(app_ms, 1), total_import_ms=round(total_ms, 1))
+    assert not runs[-1]["loaded"], f"imported at startup: {runs[-1]['loaded']}"
+    assert app_ms <= APP_BUDGET_MS, f"app import took {app_ms:.0f}ms (budget {APP_BUDGET_MS:.0f}ms)"
+    assert total_ms <= TOTAL_BUDGET_MS, f"import app.main took {total_ms:.0f}ms (budget {TOTAL_BUDGET_MS:.0f}ms)"
@@ -0,0 +1,101 @@
+"""Fixtures für die Benchmark-Suite: Mock-SP-API im Hintergrund-Thread, optional Postgres.
+
+    cd backend && BENCH_DATABASE_URL=postgresql+psycopg2://... pytest benchmarks
+"""
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Vor dem ersten app-Import: Pflicht-Env setzen (crypto/config lesen beim Import)
+if not os.getenv("SECRET_KEY") or len(os.environ["SECRET_KEY"]) != 44:
+    from cryptography.fernet import Fernet
+    os.environ["SECRET_KEY"] = Fernet.generate_key().decode()
+os.environ.setdefault("SESSION_SECRET", "bench")
+if os.getenv("BENCH_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://bench@localhost/bench")
+# Mock-Reports sind sofort fertig: erster getReport-Check ohne Historie nicht künstlich verzögern
+os.environ.setdefault("REPORT_POLL_MIN_S", "0.05")
+
+import uvicorn
+
+from benchmarks.mock_sp_api import MockConfig, create_app
+
+ACCOUNT_ID = 1
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.fixture(scope="session")
+def mock_config() -> MockConfig:
+    return MockConfig(
+        orders=int(os.getenv("MOCK_ORDERS", "200")),
+        report_rows=int(os.getenv("MOCK_REPORT_ROWS", "10000")),
+    )
+
+@pytest.fixture(scope="session")
+def mock_sp_api(mock_config):
+    """Startet den Mock auf einem freien Port und biegt sp_api darauf um."""
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(mock_config), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("mock SP-API did not start")
+        time.sleep(0.05)
+
+    from app import sp_api
+    base = f"http://127.0.0.1:{port}"
+    mp = pytest.MonkeyPatch()
+    mp.setattr(sp_api, "BASE_URL", base)
+    mp.setattr(sp_api, "LWA_TOKEN_URL", f"{base}/auth/o2/token")
+    mp.setattr(sp_api, "NO_AWS_MODE", True)
+    yield base
+    mp.undo()
+    server.should_exit = True
+    thread.join(timeout=5)
+
+@pytest.fixture(scope="session")
+def refresh_token() -> str:
+    from app.crypto import encrypt
+    return encrypt("Atzr|bench-refresh-token")
+
+@pytest.fixture(scope="session")
+def db_engine():
+    if not os.getenv("BENCH_DATABASE_URL"):
+        pytest.skip("BENCH_DATABASE_URL not set")
+    from app import models
+    from app.db.session import engine
+    tables = [models.SellerAccount.__table__, models.CatalogItem.__table__,
+              models.Order.__table__, models.OrderItem.__table__,
+              models.FbaReturn.__table__, models.FbaRemoval.__table__,
+              models.FbaInventoryAdjustment.__table__, models.FbaReimbursement.__table__,
+              models.SkuValuation.__table__]
+    models.Base.metadata.create_all(bind=engine, tables=tables)
+    from app.db.session import SessionLocal
+    with SessionLocal() as s:
+        s.merge(models.SellerAccount(id=ACCOUNT_ID, name="bench", refresh_token=""))
+        s.commit()
+    return engine
+
+@pytest.fixture
+def db(db_engine):
+    from app.db.session import SessionLocal
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def truncate(engine, *tables: str) -> None:
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"TRUNCATE {', '.join(tables)}")
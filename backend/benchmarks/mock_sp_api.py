@@ -0,0 +1,305 @@
+"""Lokaler SP-API-Stand-in (LWA, Orders, Reports-Lifecycle, GZIP-Dokumente, Notifications).
+
+    uvicorn benchmarks.mock_sp_api:app --port 9100
+    SP_API_BASE_URL=http://localhost:9100 LWA_TOKEN_URL=http://localhost:9100/auth/o2/token NO_AWS_MODE=1 ...
+
+Größen/Verzögerungen per Env (MOCK_*) oder über create_app(MockConfig(...)).
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import io
+import itertools
+import json
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+@dataclass
+class MockConfig:
+    orders: int = int(os.getenv("MOCK_ORDERS", "200"))
+    orders_page_size: int = int(os.getenv("MOCK_ORDERS_PAGE_SIZE", "100"))
+    items_per_order: int = int(os.getenv("MOCK_ITEMS_PER_ORDER", "2"))
+    items_page_size: int = int(os.getenv("MOCK_ITEMS_PAGE_SIZE", "0"))  # 0 = alle Items auf einer Seite
+    report_rows: int = int(os.getenv("MOCK_REPORT_ROWS", "10000"))
+    # Sekunden bis IN_PROGRESS bzw. DONE (je Report)
+    queue_delay_s: float = float(os.getenv("MOCK_QUEUE_DELAY_S", "0"))
+    processing_delay_s: float = float(os.getenv("MOCK_PROCESSING_DELAY_S", "0"))
+    seed: int = 42
+    # Report-Typ -> Anzahl Zeilen (überschreibt report_rows)
+    rows_by_type: dict[str, int] = field(default_factory=dict)
+    # REPORT_PROCESSING_FINISHED bei DONE: POST an notify_url (Bearer notify_token) und/oder Datei in notify_dir
+    notify_url: str | None = os.getenv("MOCK_NOTIFY_URL") or None
+    notify_token: str | None = os.getenv("MOCK_NOTIFY_TOKEN") or None
+    notify_dir: str | None = os.getenv("MOCK_NOTIFY_DIR") or None
+
+def _iso(dt: datetime) -> str:
+    return dt.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+# Spalten so, wie die fetch_*_rows-Mappings sie lesen
+_COLUMNS = {
+    "GET_FBA_FULFILLMENT_CUSTOMER_RETURNS_DATA": [
+        "return-date", "order-id", "sku", "asin", "fnsku", "quantity",
+        "fulfillment-center-id", "disposition", "reason", "status"],
+    "GET_FBA_FULFILLMENT_REMOVAL_ORDER_DETAIL_DATA": [
+        "request-date", "order-id", "order-type", "order-status", "sku", "fnsku", "asin",
+        "disposition", "quantity", "fulfillment-center"],
+    "GET_LEDGER_DETAIL_VIEW_DATA": [
+        "date", "fnsku", "asin", "sku", "event-type", "reference-id", "quantity",
+        "fulfillment-center", "disposition", "reason"],
+    "GET_FBA_REIMBURSEMENTS_DATA": [
+        "reimbursed-date", "reimbursement-id", "case-id", "order-id", "reason", "sku", "fnsku", "asin",
+        "currency", "amount-per-unit", "amount-total", "quantity-reimbursed-total"],
+    "GET_FLAT_FILE_ALL_ORDERS_DATA_BY_LAST_UPDATE_GENERAL": [
+        "amazon-order-id", "purchase-date", "last-updated-date", "order-status", "sales-channel",
+        "sku", "asin", "item-status", "quantity", "currency", "item-price"],
+}
+
+def _row(rt: str, i: int, rnd: random.Random, base: datetime) -> list[str]:
+    sku = f"SKU-{rnd.randrange(2000):05d}"
+    asin = f"B0{rnd.randrange(10**8):08d}"
+    fnsku = f"X00{rnd.randrange(10**7):07d}"
+    ts = _iso(base - timedelta(minutes=rnd.randrange(60 * 24 * 30)))
+    qty = str(rnd.randint(1, 5))
+    if rt == "GET_FBA_FULFILLMENT_CUSTOMER_RETURNS_DATA":
+        return [ts, f"302-{i:07d}-{rnd.randrange(10**7):07d}", sku, asin, fnsku, qty, "LEJ1",
+                rnd.choice(["SELLABLE", "CUSTOMER_DAMAGED", "DEFECTIVE"]), "UNWANTED_ITEM", "Unit returned to inventory"]
+    if rt == "GET_FBA_FULFILLMENT_REMOVAL_ORDER_DETAIL_DATA":
+        return [ts, f"RMV{i:08d}", rnd.choice(["Return", "Disposal"]), "Completed", sku, fnsku, asin,
+                "Unsellable", qty, "DTM2"]
+    if rt == "GET_LEDGER_DETAIL_VIEW_DATA":
+        return [ts, fnsku, asin, sku, rnd.choice(["Adjustments", "Receipts", "Shipments"]), str(i),
+                str(rnd.choice([-1, 1]) * int(qty)), "WRO5", "SELLABLE", rnd.choice(["M", "E", "F", "D"])]
+    if rt == "GET_FBA_REIMBURSEMENTS_DATA":
+        amt = rnd.randint(300, 9000) / 100
+        return [ts, f"R{i:09d}", f"C{i:09d}", f"302-{i:07d}-0000000", "Lost_Warehouse", sku, fnsku, asin,
+                "EUR", f"{amt:.2f}", f"{amt * int(qty):.2f}", qty]
+    if rt == "GET_FLAT_FILE_ALL_ORDERS_DATA_BY_LAST_UPDATE_GENERAL":
+        oid = f"302-{i // 2:07d}-0000000"
+        return [oid, ts, ts, "Shipped", "Amazon.de", sku, asin, "Shipped", qty, "EUR",
+                f"{rnd.randint(500, 9000) / 100:.2f}"]
+    return [ts, str(i)]
+
+def build_document(rt: str, rows: int, seed: int = 42) -> bytes:
+    """TSV-Flatfile (GZIP) mit `rows` Zeilen – deterministisch über `seed`."""
+    rnd = random.Random(seed)
+    base = datetime.now(timezone.utc)
+    buf = io.StringIO()
+    buf.write("\t".join(_COLUMNS.get(rt, ["date", "id"])) + "\n")
+    for i in range(rows):
+        buf.write("\t".join(_row(rt, i, rnd, base)) + "\n")
+    return gzip.compress(buf.getvalue().encode("utf-8"), compresslevel=5)
+
+def create_app(cfg: MockConfig | None = None) -> FastAPI:
+    cfg = cfg or MockConfig()
+    app = FastAPI(title="SP-API mock")
+    app.state.cfg = cfg
+    app.state.reports: dict[str, dict] = {}
+    app.state.docs: dict[str, tuple[str, int]] = {}
+    app.state.schedules: dict[str, dict] = {}
+    app.state.doc_cache: dict[tuple[str, int], bytes] = {}
+    app.state.subscriptions: dict[str, dict] = {}
+    app.state.notify_tasks: set[asyncio.Task] = set()
+    app.state.calls = itertools.count()
+    ids = itertools.count(1)
+
+    @app.middleware("http")
+    async def _count(request: Request, call_next):
+        next(app.state.calls)
+        return await call_next(request)
+
+    # --- LWA ---
+    @app.post("/auth/o2/token")
+    async def token():
+        return {"access_token": f"Atza|mock-{uuid.uuid4().hex}", "token_type": "bearer", "expires_in": 3600}
+
+    # --- Orders ---
+    @app.get("/orders/v0/orders")
+    async def get_orders(NextToken: str | None = None, MarketplaceIds: str = ""):
+        start = int(NextToken or 0)
+        end = min(cfg.orders, start + cfg.orders_page_size)
+        now = datetime.now(timezone.utc)
+        orders = [{
+            "AmazonOrderId": f"302-{n:07d}-{n % 9999999:07d}",
+            "PurchaseDate": _iso(now - timedelta(minutes=n)),
+            "LastUpdateDate": _iso(now - timedelta(minutes=n // 2)),
+            "OrderStatus": "Shipped",
+            "MarketplaceId": (MarketplaceIds.split(",") or ["A1PA6795UKMFR9"])[0] or "A1PA6795UKMFR9",
+        } for n in range(start, end)]
+        payload = {"Orders": orders}
+        if end < cfg.orders:
+            payload["NextToken"] = str(end)
+        return {"payload": payload}
+
+    @app.get("/orders/v0/orders/{order_id}/orderItems")
+    async def get_order_items(order_id: str, NextToken: str | None = None):
+        rnd = random.Random(order_id)
+        items = [{
+            "ASIN": f"B0{rnd.randrange(10**8):08d}",
+            "SellerSKU": f"SKU-{rnd.randrange(2000):05d}",
+            "OrderItemId": f"{rnd.randrange(10**13):014d}",
+            "QuantityOrdered": rnd.randint(1, 3),
+            "ItemPrice": {"CurrencyCode": "EUR", "Amount": f"{rnd.randint(500, 9000) / 100:.2f}"},
+        } for _ in range(cfg.items_per_order)]
+        payload = {"AmazonOrderId": order_id, "OrderItems": items}
+        if cfg.items_page_size:
+            start = int(NextToken or 0)
+            end = start + cfg.items_page_size
+            payload["OrderItems"] = items[start:end]
+            if end < len(items):
+                payload["NextToken"] = str(end)
+        return {"payload": payload}
+
+    # --- Reports ---
+    def _status(rep: dict) -> dict:
+        age = time.time() - rep["t0"]
+        out = {k: v for k, v in rep.items() if k != "t0"}
+        if age < cfg.queue_delay_s:
+            out["processingStatus"] = "IN_QUEUE"
+        elif age < cfg.queue_delay_s + cfg.processing_delay_s:
+            out["processingStatus"] = "IN_PROGRESS"
+            out["processingStartTime"] = _iso(rep["created"] + timedelta(seconds=cfg.queue_delay_s))
+        else:
+            out["processingStatus"] = "DONE"
+            out["processingStartTime"] = _iso(rep["created"] + timedelta(seconds=cfg.queue_delay_s))
+            out["processingEndTime"] = _iso(rep["created"] + timedelta(seconds=cfg.queue_delay_s + cfg.processing_delay_s))
+            out["reportDocumentId"] = rep["doc_id"]
+        out["createdTime"] = _iso(rep["created"])
+        out.pop("created", None)
+        out.pop("doc_id", None)
+        return out
+
+    def _new_report(rt: str, start: str | None, end: str | None, mids: list, t0: float | None = None) -> str:
+        rid = str(next(ids))
+        doc_id = f"amzn1.spdoc.1.4.eu.{uuid.uuid4()}"
+        app.state.reports[rid] = {
+            "reportId": rid, "reportType": rt, "dataStartTime": start, "dataEndTime": end,
+            "marketplaceIds": mids or [],
+            "created": datetime.now(timezone.utc), "t0": t0 or time.time(), "doc_id": doc_id,
+        }
+        app.state.docs[doc_id] = (rt, cfg.rows_by_type.get(rt, cfg.report_rows))
+        return rid
+
+    async def _notify_done(rid: str) -> None:
+        await asyncio.sleep(cfg.queue_delay_s + cfg.processing_delay_s)
+        rep = app.state.reports[rid]
+        msg = {
+            "NotificationVersion": "2020-09-04", "NotificationType": "REPORT_PROCESSING_FINISHED",
+            "PayloadVersion": "2020-09-04", "EventTime": _iso(datetime.now(timezone.utc)),
+            "Payload": {"reportProcessingFinishedNotification": {
+                "sellerId": "AMOCKSELLER", "reportId": rid, "reportType": rep["reportType"],
+                "processingStatus": "DONE", "reportDocumentId": rep["doc_id"]}},
+            "NotificationMetadata": {"notificationId": str(uuid.uuid4())},
+        }
+        if cfg.notify_dir:
+            d = Path(cfg.notify_dir)
+            d.mkdir(parents=True, exist_ok=True)
+            (d / f"{rid}.tmp").write_text(json.dumps(msg))
+            (d / f"{rid}.tmp").rename(d / f"{rid}.json")  # atomar für den Datei-Consumer
+        if cfg.notify_url:
+            import httpx
+            headers = {"Authorization": f"Bearer {cfg.notify_token}"} if cfg.notify_token else {}
+            async with httpx.AsyncClient(timeout=10) as c:
+                await c.post(cfg.notify_url, json=msg, headers=headers)
+
+    @app.post("/reports/2021-06-30/reports")
+    async def create_report(request: Request):
+        body = await request.json()
+        rid = _new_report(body.get("reportType"), body.get("dataStartTime"), body.get("dataEndTime"),
+                          body.get("marketplaceIds"))
+        if cfg.notify_url or cfg.notify_dir:
+            app.state.notify_tasks.add(t := asyncio.create_task(_notify_done(rid)))
+            t.add_done_callback(app.state.notify_tasks.discard)
+        return JSONResponse({"reportId": rid}, status_code=202)
+
+    @app.get("/reports/2021-06-30/reports")
+    async def get_reports(reportTypes: str = "", processingStatuses: str = "", createdSince: str = ""):
+        types = set(filter(None, reportTypes.split(",")))
+        states = set(filter(None, processingStatuses.split(",")))
+        reps = [_status(r) for r in app.state.reports.values() if not types or r["reportType"] in types]
+        reps = [r for r in reps if (not states or r["processingStatus"] in states)
+                and (not createdSince or r["createdTime"] >= createdSince)]
+        return {"reports": sorted(reps, key=lambda r: r["createdTime"], reverse=True)}
+
+    # --- Report-Schedules: neuer Schedule liefert sofort einen fertigen Report (90 Tage bis jetzt) ---
+    @app.post("/reports/2021-06-30/schedules")
+    async def create_schedule(request: Request):
+        body = await request.json()
+        sid = f"sch-{next(ids)}"
+        app.state.schedules[sid] = {"reportScheduleId": sid, "reportType": body.get("reportType"),
+                                    "marketplaceIds": body.get("marketplaceIds") or [], "period": body.get("period")}
+        now = datetime.now(timezone.utc)
+        _new_report(body.get("reportType"), _iso(now - timedelta(days=90)), _iso(now), body.get("marketplaceIds"),
+                    t0=time.time() - cfg.queue_delay_s - cfg.processing_delay_s)
+        return JSONResponse({"reportScheduleId": sid}, status_code=201)
+
+    @app.get("/reports/2021-06-30/schedules")
+    async def get_schedules(reportTypes: str = ""):
+        types = set(filter(None, reportTypes.split(",")))
+        return {"reportSchedules": [s for s in app.state.schedules.values() if not types or s["reportType"] in types]}
+
+    @app.delete("/reports/2021-06-30/schedules/{schedule_id}")
+    async def cancel_schedule(schedule_id: str):
+        app.state.schedules.pop(schedule_id, None)
+        return Response(status_code=200)
+
+    # --- Notifications (Destination/Subscription-Verwaltung) ---
+    @app.get("/notifications/v1/destinations")
+    async def get_destinations():
+        return {"payload": [{"destinationId": "dest-mock", "name": "mock",
+                             "resource": {"sqs": {"arn": "arn:aws:sqs:eu-west-1:000000000000:mock"}}}]}
+
+    @app.get("/notifications/v1/subscriptions/{ntype}")
+    async def get_subscription(ntype: str):
+        if ntype not in app.state.subscriptions:
+            raise HTTPException(404, "subscription not found")
+        return {"payload": app.state.subscriptions[ntype]}
+
+    @app.post("/notifications/v1/subscriptions/{ntype}")
+    async def create_subscription(ntype: str, request: Request):
+        body = await request.json()
+        sub = {"subscriptionId": f"sub-{next(ids)}", "payloadVersion": body.get("payloadVersion"),
+               "destinationId": body.get("destinationId")}
+        app.state.subscriptions[ntype] = sub
+        return {"payload": sub}
+
+    @app.delete("/notifications/v1/subscriptions/{ntype}/{subscription_id}")
+    async def delete_subscription(ntype: str, subscription_id: str):
+        app.state.subscriptions.pop(ntype, None)
+        return {}
+
+    @app.get("/reports/2021-06-30/reports/{report_id}")
+    async def get_report(report_id: str):
+        rep = app.state.reports.get(report_id)
+        if not rep:
+            raise HTTPException(404, "report not found")
+        return _status(rep)
+
+    @app.get("/reports/2021-06-30/documents/{document_id}")
+    async def get_document(document_id: str, request: Request):
+        if document_id not in app.state.docs:
+            raise HTTPException(404, "document not found")
+        return {"reportDocumentId": document_id, "compressionAlgorithm": "GZIP",
+                "url": str(request.base_url).rstrip("/") + f"/_documents/{document_id}"}
+
+    @app.get("/_documents/{document_id}")
+    async def download(document_id: str):
+        key = app.state.docs.get(document_id)
+        if not key:
+            raise HTTPException(404, "document not found")
+        data = app.state.doc_cache.get(key)
+        if data is None:
+            data = app.state.doc_cache[key] = build_document(*key, seed=cfg.seed)
+        return Response(data, media_type="application/octet-stream")
+
+    return app
+
+app = create_app()
@@ -0,0 +1,87 @@
+-- Tabellen, die bisher per create_all beim App-Import angelegt wurden
+CREATE TABLE IF NOT EXISTS users (
+  id SERIAL PRIMARY KEY,
+  email VARCHAR(320) NOT NULL,
+  username VARCHAR(64) NOT NULL,
+  password_hash VARCHAR(255) NOT NULL,
+  is_admin BOOLEAN NOT NULL DEFAULT FALSE,
+  CONSTRAINT uq_users_email UNIQUE (email)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users(email);
+CREATE INDEX IF NOT EXISTS ix_users_username ON users(username);
+
+CREATE TABLE IF NOT EXISTS fba_returns (
+  id SERIAL PRIMARY KEY,
+  account_id INTEGER NOT NULL REFERENCES seller_accounts(id),
+  return_date TIMESTAMP,
+  order_id VARCHAR(40),
+  asin VARCHAR(20),
+  sku VARCHAR(100),
+  disposition VARCHAR(30),
+  reason VARCHAR(120),
+  quantity INTEGER,
+  fc VARCHAR(20),
+  raw JSON
+);
+CREATE INDEX IF NOT EXISTS ix_fba_returns_account_id ON fba_returns(account_id);
+CREATE INDEX IF NOT EXISTS ix_fba_returns_return_date ON fba_returns(return_date);
+CREATE INDEX IF NOT EXISTS ix_fba_returns_order_id ON fba_returns(order_id);
+CREATE INDEX IF NOT EXISTS ix_fba_returns_asin ON fba_returns(asin);
+CREATE INDEX IF NOT EXISTS ix_fba_returns_sku ON fba_returns(sku);
+
+CREATE TABLE IF NOT EXISTS fba_removals (
+  id SERIAL PRIMARY KEY,
+  account_id INTEGER NOT NULL REFERENCES seller_accounts(id),
+  removal_order_id VARCHAR(40),
+  order_type VARCHAR(30),
+  status VARCHAR(30),
+  request_date TIMESTAMP,
+  shipped_date TIMESTAMP,
+  received_date TIMESTAMP,
+  asin VARCHAR(20),
+  sku VARCHAR(100),
+  quantity INTEGER,
+  disposition VARCHAR(30),
+  raw JSON
+);
+CREATE INDEX IF NOT EXISTS ix_fba_removals_account_id ON fba_removals(account_id);
+CREATE INDEX IF NOT EXISTS ix_fba_removals_removal_order_id ON fba_removals(removal_order_id);
+CREATE INDEX IF NOT EXISTS ix_fba_removals_request_date ON fba_removals(request_date);
+CREATE INDEX IF NOT EXISTS ix_fba_removals_asin ON fba_removals(asin);
+CREATE INDEX IF NOT EXISTS ix_fba_removals_sku ON fba_removals(sku);
+
+CREATE TABLE IF NOT EXISTS fba_inventory_adjustments (
+  id SERIAL PRIMARY KEY,
+  account_id INTEGER NOT NULL REFERENCES seller_accounts(id),
+  adjustment_date TIMESTAMP,
+  asin VARCHAR(20),
+  sku VARCHAR(100),
+  quantity INTEGER,
+  reason VARCHAR(40),
+  fc VARCHAR(20),
+  raw JSON
+);
+CREATE INDEX IF NOT EXISTS ix_fba_inventory_adjustments_account_id ON fba_inventory_adjustments(account_id);
+CREATE INDEX IF NOT EXISTS ix_fba_inventory_adjustments_adjustment_date ON fba_inventory_adjustments(adjustment_date);
+CREATE INDEX IF NOT EXISTS ix_fba_inventory_adjustments_reason ON fba_inventory_adjustments(reason);
+CREATE INDEX IF NOT EXISTS ix_fba_inventory_adjustments_asin ON fba_inventory_adjustments(asin);
+CREATE INDEX IF NOT EXISTS ix_fba_inventory_adjustments_sku ON fba_inventory_adjustments(sku);
+
+CREATE TABLE IF NOT EXISTS fba_reimbursements (
+  id SERIAL PRIMARY KEY,
+  account_id INTEGER NOT NULL REFERENCES seller_accounts(id),
+  posted_date TIMESTAMP,
+  case_id VARCHAR(40),
+  asin VARCHAR(20),
+  sku VARCHAR(100),
+  quantity INTEGER,
+  amount NUMERIC(12,2),
+  currency VARCHAR(3),
+  reason VARCHAR(120),
+  raw JSON
+);
+CREATE INDEX IF NOT EXISTS ix_fba_reimbursements_account_id ON fba_reimbursements(account_id);
+CREATE INDEX IF NOT EXISTS ix_fba_reimbursements_posted_date ON fba_reimbursements(posted_date);
+CREATE INDEX IF NOT EXISTS ix_fba_reimbursements_case_id ON fba_reimbursements(case_id);
+CREATE INDEX IF NOT EXISTS ix_fba_reimbursements_asin ON fba_reimbursements(asin);
+CREATE INDEX IF NOT EXISTS ix_fba_reimbursements_sku ON fba_reimbursements(sku);
@@ -0,0 +1,20 @@
+-- Orders/Items eindeutig je Account: Upsert statt Duplikat pro Sync
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS last_update_date TIMESTAMP;
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32);
+ALTER TABLE order_items ADD COLUMN IF NOT EXISTS order_item_id VARCHAR(40);
+
+-- Bestehende Duplikate: jeweils die jüngste Zeile behalten
+DELETE FROM orders o
+ USING orders newer
+ WHERE newer.account_id = o.account_id AND newer.order_id = o.order_id AND newer.id > o.id;
+
+DELETE FROM order_items i
+ USING order_items newer
+ WHERE newer.account_id = i.account_id AND newer.order_id = i.order_id
+   AND newer.asin IS NOT DISTINCT FROM i.asin AND newer.sku IS NOT DISTINCT FROM i.sku
+   AND newer.order_item_id IS NOT DISTINCT FROM i.order_item_id
+   AND newer.id > i.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_orders_account_order ON orders(account_id, order_id);
+-- Alt-Zeilen ohne order_item_id (NULL) kollidieren nicht; store_orders ersetzt sie beim nächsten Update
+CREATE UNIQUE INDEX IF NOT EXISTS uq_order_items_account_order_item ON order_items(account_id, order_id, order_item_id);
@@ -0,0 +1,11 @@
+-- REPORT_PROCESSING_FINISHED-Notifications (HTTP-Endpoint / SQS- oder Datei-Consumer)
+CREATE TABLE IF NOT EXISTS sp_report_events (
+  report_id VARCHAR(40) PRIMARY KEY,
+  report_type VARCHAR(80),
+  status VARCHAR(20) NOT NULL,
+  document_id VARCHAR(200),
+  seller_id VARCHAR(40),
+  payload JSON,
+  received_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS ix_sp_report_events_received_at ON sp_report_events(received_at);
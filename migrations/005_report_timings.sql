@@ -0,0 +1,13 @@
+-- Laufzeiten abgeschlossener Reports (Basis für die ETA-/Polling-Planung)
+CREATE TABLE IF NOT EXISTS sp_report_timings (
+  id BIGSERIAL PRIMARY KEY,
+  account_id INTEGER NOT NULL,
+  report_type VARCHAR(80) NOT NULL,
+  window_days DOUBLE PRECISION NOT NULL,
+  queue_s DOUBLE PRECISION,
+  processing_s DOUBLE PRECISION,
+  total_s DOUBLE PRECISION NOT NULL,
+  source VARCHAR(10) NOT NULL DEFAULT 'poll',
+  created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS ix_sp_report_timings_type_window ON sp_report_timings(report_type, window_days, id);
@@ -0,0 +1,40 @@
+-- Backfill: Jobs + Chunks (Checkpoints je Teilfenster) und Dedupe der fba_*-Zeilen über row_hash
+
+CREATE TABLE IF NOT EXISTS backfill_jobs (
+  id SERIAL PRIMARY KEY,
+  account_id INTEGER NOT NULL REFERENCES seller_accounts(id),
+  sources VARCHAR(200) NOT NULL,
+  range_from TIMESTAMP NOT NULL,
+  range_to TIMESTAMP NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  finished_at TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_backfill_jobs_account_id ON backfill_jobs(account_id);
+
+CREATE TABLE IF NOT EXISTS backfill_chunks (
+  id SERIAL PRIMARY KEY,
+  job_id INTEGER NOT NULL REFERENCES backfill_jobs(id) ON DELETE CASCADE,
+  source VARCHAR(40) NOT NULL,
+  window_start TIMESTAMP NOT NULL,
+  window_end TIMESTAMP NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  rows INTEGER,
+  error TEXT,
+  started_at TIMESTAMP,
+  finished_at TIMESTAMP
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_backfill_chunks_job_source_window ON backfill_chunks(job_id, source, window_start);
+CREATE INDEX IF NOT EXISTS ix_backfill_chunks_job_status ON backfill_chunks(job_id, status);
+
+-- Überlappende Chunk-Ränder liefern dieselben Report-Zeilen doppelt: Hash über die Rohzeile
+DO $$
+DECLARE t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['fba_returns', 'fba_removals', 'fba_inventory_adjustments', 'fba_reimbursements'] LOOP
+    EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS row_hash CHAR(32) GENERATED ALWAYS AS (md5(raw::text)) STORED', t);
+    EXECUTE format('DELETE FROM %I a USING %I b WHERE a.account_id = b.account_id AND a.row_hash = b.row_hash AND a.id > b.id', t, t);
+    EXECUTE format('CREATE UNIQUE INDEX IF NOT EXISTS %I ON %I(account_id, row_hash)', 'uq_' || t || '_account_row_hash', t);
+  END LOOP;
+END $$;
@@ -0,0 +1,10 @@
+-- Parquet-Export: Fingerprint je (Dataset, Account, Monat) -> nur geänderte Partitionen neu schreiben
+CREATE TABLE IF NOT EXISTS analytics_exports (
+  dataset VARCHAR(40) NOT NULL,
+  account_id INTEGER NOT NULL,
+  month DATE NOT NULL,
+  fingerprint VARCHAR(80) NOT NULL,
+  rows INTEGER NOT NULL,
+  exported_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (dataset, account_id, month)
+);
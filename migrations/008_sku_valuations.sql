@@ -0,0 +1,31 @@
+-- Bewertung offener Recon-Fälle: Summen je (Account, SKU, Währung, Monat), beim Ingest per Delta gepflegt
+CREATE TABLE IF NOT EXISTS sku_valuations (
+  account_id INTEGER NOT NULL REFERENCES seller_accounts(id),
+  sku VARCHAR(100) NOT NULL,
+  currency VARCHAR(3) NOT NULL,
+  month DATE NOT NULL,
+  sold_units BIGINT NOT NULL DEFAULT 0,
+  sold_amount NUMERIC(14,2) NOT NULL DEFAULT 0,
+  reimbursed_units BIGINT NOT NULL DEFAULT 0,
+  reimbursed_amount NUMERIC(14,2) NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (account_id, sku, currency, month)
+);
+
+-- Erstbefüllung aus dem Bestand (gleiche Logik wie app.valuation.rebuild)
+INSERT INTO sku_valuations (account_id, sku, currency, month, sold_units, sold_amount, reimbursed_units, reimbursed_amount)
+SELECT account_id, sku, currency, month, sum(su), sum(sa), sum(ru), sum(ra) FROM (
+  SELECT i.account_id, i.sku, i.currency, date_trunc('month', o.purchase_date)::date AS month,
+         sum(i.qty) AS su, sum(i.price_amount) AS sa, 0 AS ru, 0 AS ra
+  FROM order_items i JOIN orders o ON o.account_id = i.account_id AND o.order_id = i.order_id
+  WHERE i.sku IS NOT NULL AND i.currency IS NOT NULL AND i.qty > 0 AND i.price_amount IS NOT NULL
+    AND o.purchase_date IS NOT NULL
+  GROUP BY 1, 2, 3, 4
+  UNION ALL
+  SELECT account_id, sku, currency, date_trunc('month', posted_date)::date, 0, 0, sum(quantity), sum(amount)
+  FROM fba_reimbursements
+  WHERE sku IS NOT NULL AND currency IS NOT NULL AND quantity > 0 AND posted_date IS NOT NULL
+  GROUP BY 1, 2, 3, 4
+) s
+GROUP BY 1, 2, 3, 4
+ON CONFLICT DO NOTHING;
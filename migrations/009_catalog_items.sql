@@ -0,0 +1,36 @@
+-- Katalog-Dimension: (Account, SKU, ASIN) -> int-ID. Fakten referenzieren catalog_id statt
+-- je eigener asin-/sku-Indizes; Joins/Aggregationen (Recon) laufen über Integer.
+CREATE TABLE IF NOT EXISTS catalog_items (
+  id SERIAL PRIMARY KEY,
+  account_id INTEGER NOT NULL REFERENCES seller_accounts(id),
+  sku VARCHAR(100) NOT NULL DEFAULT '',
+  asin VARCHAR(20) NOT NULL DEFAULT '',
+  fnsku VARCHAR(20),
+  created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_catalog_items_account_sku_asin ON catalog_items(account_id, sku, asin);
+
+DO $$
+DECLARE t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['order_items', 'fba_returns', 'fba_removals', 'fba_inventory_adjustments',
+                           'fba_reimbursements', 'inventory_ledger', 'reimbursements', 'recon_results'] LOOP
+    EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS catalog_id INTEGER REFERENCES catalog_items(id)', t);
+    EXECUTE format('INSERT INTO catalog_items (account_id, sku, asin)
+                    SELECT DISTINCT account_id, coalesce(sku, ''''), coalesce(asin, '''') FROM %I
+                    WHERE account_id IS NOT NULL ON CONFLICT DO NOTHING', t);
+    EXECUTE format('UPDATE %I f SET catalog_id = c.id FROM catalog_items c
+                    WHERE f.catalog_id IS NULL AND c.account_id = f.account_id
+                      AND c.sku = coalesce(f.sku, '''') AND c.asin = coalesce(f.asin, '''')', t);
+    EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I(account_id, catalog_id)', 'ix_' || t || '_account_catalog', t);
+    -- Einzelindizes auf den Strings ersetzt der catalog_id-Index
+    EXECUTE format('DROP INDEX IF EXISTS %I', 'ix_' || t || '_asin');
+    EXECUTE format('DROP INDEX IF EXISTS %I', 'ix_' || t || '_sku');
+  END LOOP;
+END $$;
+
+-- FNSKU aus den FBA-Rohzeilen übernehmen, soweit vorhanden
+UPDATE catalog_items c SET fnsku = f.fnsku
+FROM (SELECT DISTINCT ON (catalog_id) catalog_id, raw->>'fnsku' AS fnsku
+      FROM fba_returns WHERE catalog_id IS NOT NULL AND raw->>'fnsku' <> '') f
+WHERE c.id = f.catalog_id AND c.fnsku IS NULL;
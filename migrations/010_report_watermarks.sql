@@ -0,0 +1,10 @@
+-- Inkrementelle Report-Pulls: Ende des zuletzt vollständig importierten Fensters je (Account, Report-Typ)
+CREATE TABLE IF NOT EXISTS report_watermarks (
+  account_id INTEGER NOT NULL REFERENCES seller_accounts(id),
+  report_type VARCHAR(80) NOT NULL,
+  data_end TIMESTAMP NOT NULL,
+  last_start TIMESTAMP,
+  last_rows INTEGER,
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (account_id, report_type)
+);
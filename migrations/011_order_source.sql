@@ -0,0 +1,2 @@
+-- Order-Quelle je Account: 'api' (getOrders/getOrderItems), 'report' (Flatfile-Report), NULL = ORDER_SOURCE
+ALTER TABLE seller_accounts ADD COLUMN IF NOT EXISTS order_source VARCHAR(10);
@@ -0,0 +1,2 @@
+-- Dashboard: letzte Orders je Account (ORDER BY purchase_date DESC LIMIT n) ohne Sort über alle Orders
+CREATE INDEX IF NOT EXISTS ix_orders_account_purchase ON orders(account_id, purchase_date DESC NULLS LAST);
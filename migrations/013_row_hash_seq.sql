@@ -0,0 +1,15 @@
+-- row_hash: identische Rohzeilen eines Dokuments (z.B. zwei gleiche Erstattungen) zählen einzeln.
+-- row_seq = wievielte gleiche Zeile im Dokument (0 = erste); erste Vorkommen behalten ihren Hash,
+-- Überlappungen zwischen Fenstern deduplizieren weiter. Typ wie im Modell (String(32) statt CHAR(32)).
+DO $$
+DECLARE t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['fba_returns', 'fba_removals', 'fba_inventory_adjustments', 'fba_reimbursements'] LOOP
+    EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS row_seq INTEGER NOT NULL DEFAULT 0', t);
+    -- Ausdruck einer generierten Spalte lässt sich erst ab PG 17 ändern: neu anlegen (Index fällt mit)
+    EXECUTE format('ALTER TABLE %I DROP COLUMN IF EXISTS row_hash', t);
+    EXECUTE format('ALTER TABLE %I ADD COLUMN row_hash VARCHAR(32) GENERATED ALWAYS AS '
+                   '(md5(CASE WHEN row_seq = 0 THEN raw::text ELSE raw::text || ''#'' || row_seq::text END)) STORED', t);
+    EXECUTE format('CREATE UNIQUE INDEX IF NOT EXISTS %I ON %I(account_id, row_hash)', 'uq_' || t || '_account_row_hash', t);
+  END LOOP;
+END $$;
@@ -0,0 +1,14 @@
+-- Parquet-Export: nur seit dem letzten Lauf berührte Partitionen fingerprinten
+-- Orders: Änderungszeit (Items ändern sich nur zusammen mit ihrer Order, s. services.store_orders)
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS ix_orders_updated_at ON orders(updated_at);
+
+-- Hochwassermarke je Dataset und Export-Umfang (account_id 0 = alle Accounts)
+CREATE TABLE IF NOT EXISTS analytics_export_marks (
+  dataset VARCHAR(40) NOT NULL,
+  account_id INTEGER NOT NULL,
+  last_id BIGINT NOT NULL DEFAULT 0,
+  last_updated TIMESTAMP,
+  full_scan_at TIMESTAMP,
+  PRIMARY KEY (dataset, account_id)
+);
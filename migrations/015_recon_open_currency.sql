@@ -0,0 +1,2 @@
+-- Währung, in der open_amount bewertet ist (Hauptwährung der SKU in sku_valuations)
+ALTER TABLE recon_results ADD COLUMN IF NOT EXISTS open_currency VARCHAR(3);
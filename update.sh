@@ -32,10 +32,7 @@ fi
 # 3) Build & Start (mit Cache, ohne No-Cache-Zwang)
 docker compose up -d --build --remove-orphans
 
-# Optional: DB-Migration, wenn Alembic vorhanden ist (fehler-tolerant)
-if docker compose exec -T api sh -lc 'command -v alembic >/dev/null 2>&1'; then
-  docker compose exec -T api alembic upgrade head || true
-fi
+# DB-Migrationen laufen als eigener One-Shot-Service (migrate) vor dem API-Start
 
 # Logs followen (blockiert bewusst, bis STRG+C)
 exec docker compose logs -f